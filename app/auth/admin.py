@@ -14,7 +14,7 @@ async def admin_login(email: str = Form(...), password: str = Form(...)):
     supabase = get_supabase_admin()
     
     # 사용자 조회
-    response = supabase.table("users")\
+    response = await supabase.table("users")\
         .select("*")\
         .eq("email", email)\
         .eq("role", "admin")\
@@ -6,7 +6,7 @@ from fastapi.responses import RedirectResponse
 import httpx
 import secrets
 from datetime import datetime, timedelta
-from app.database import supabase_admin
+from app.database import get_supabase_admin
 from app.config import get_settings
 from app.auth.utils import create_access_token
 
@@ -20,9 +20,10 @@ oauth_states = {}
 @router.get("/invite/verify")
 async def verify_invite_token(token: str = Query(...)):
     """Step 1: Verify invite token before OAuth"""
+    supabase = get_supabase_admin()
     
     # Query student_invites table
-    response = supabase_admin.table("student_invites")\
+    response = await supabase.table("student_invites")\
         .select("*, students!inner(id, name, academy_id, status)")\
         .eq("token", token)\
         .execute()
@@ -94,6 +95,7 @@ async def kakao_callback(
     state: str = Query(...)
 ):
     """Step 3: Kakao OAuth callback - Exchange code for token, link student account"""
+    supabase = get_supabase_admin()
     
     # Verify state
     if state not in oauth_states:
@@ -167,7 +169,7 @@ async def kakao_callback(
         kakao_name = user_info.get("kakao_account", {}).get("profile", {}).get("nickname")
     
     # Step 4: Upsert user_account
-    user_account_response = supabase_admin.table("user_accounts")\
+    user_account_response = await supabase.table("user_accounts")\
         .select("id")\
         .eq("provider", "KAKAO")\
         .eq("provider_user_id", kakao_user_id)\
@@ -177,7 +179,7 @@ async def kakao_callback(
         user_account_id = user_account_response.data[0]["id"]
     else:
         # Create new user_account
-        new_account = supabase_admin.table("user_accounts")\
+        new_account = await supabase.table("user_accounts")\
             .insert({
                 "provider": "KAKAO",
                 "provider_user_id": kakao_user_id,
@@ -195,7 +197,7 @@ async def kakao_callback(
         user_account_id = new_account.data[0]["id"]
     
     # Step 5: Get student_id from invite
-    invite_response = supabase_admin.table("student_invites")\
+    invite_response = await supabase.table("student_invites")\
         .select("student_id, students!inner(id, name, academy_id)")\
         .eq("token", invite_token)\
         .execute()
@@ -210,7 +212,7 @@ async def kakao_callback(
     academy_id = invite_response.data[0]["students"]["academy_id"]
     
     # Step 6: Create student_link
-    supabase_admin.table("student_links")\
+    await supabase.table("student_links")\
         .insert({
             "student_id": student_id,
             "user_account_id": user_account_id
@@ -218,7 +220,7 @@ async def kakao_callback(
         .execute()
     
     # Step 7: Update student status to ACTIVE
-    supabase_admin.table("students")\
+    await supabase.table("students")\
         .update({
             "status": "active",
             "is_linked": True,
@@ -228,7 +230,7 @@ async def kakao_callback(
         .execute()
     
     # Step 8: Mark invite as used
-    supabase_admin.table("student_invites")\
+    await supabase.table("student_invites")\
         .update({
             "used_at": datetime.utcnow().isoformat(),
             "used_by_user_account_id": user_account_id
@@ -285,6 +287,7 @@ async def kakao_callback_existing(
     state: str = Query(...)
 ):
     """Step 11: Kakao callback for existing student login"""
+    supabase = get_supabase_admin()
     
     # Verify state
     if state not in oauth_states:
@@ -335,7 +338,7 @@ async def kakao_callback_existing(
         kakao_user_id = str(user_info["id"])
     
     # Find user_account
-    user_account_response = supabase_admin.table("user_accounts")\
+    user_account_response = await supabase.table("user_accounts")\
         .select("id")\
         .eq("provider", "KAKAO")\
         .eq("provider_user_id", kakao_user_id)\
@@ -350,7 +353,7 @@ async def kakao_callback_existing(
     user_account_id = user_account_response.data[0]["id"]
     
     # Find linked student
-    student_link_response = supabase_admin.table("student_links")\
+    student_link_response = await supabase.table("student_links")\
         .select("student_id, students!inner(id, name, academy_id, status)")\
         .eq("user_account_id", user_account_id)\
         .execute()
@@ -0,0 +1,143 @@
+"""
+References and garbage collection for content-addressed uploads
+
+Every stored blob (see app.uploads) has an ``upload_blobs`` row. Its
+``ref_count`` is maintained by a trigger on ``submission_files``: rows
+inserted by submit_homework add a reference, and rows deleted on resubmit
+or by cascades release it. Blobs with no references whose last upload is
+older than UPLOAD_GC_GRACE_SECONDS (uploaded but never submitted,
+replaced on resubmit) are removed by ``sweep``, together with their image
+derivatives, from whichever storage backend is configured (app.storage).
+Run it from ``scripts/sweep_uploads.py`` (cron).
+
+Uploading the same bytes again refreshes ``uploaded_at``, so a blob that is
+about to be submitted is not collected from under the submission.
+
+``file_size`` is only written from bytes the server has seen (``register_blob``
+after app.uploads stored them). A presign only reserves the key with
+``reserve_blob``: it refreshes ``uploaded_at`` or adds a row with
+``file_size`` null, and never takes the client's claimed size. Such rows are
+unverified until the object is checked in storage (homework submit).
+
+An upload can still race a sweep that already claimed the blob's row. To
+make that safe, uploads register the blob *before* they look for or place
+the file (app.uploads, homework presign), and the sweeper never deletes
+in place: it moves the files under ``.trash/``, then checks
+``upload_blobs`` again. Blobs that were registered again in the meantime
+are moved back; only the rest are deleted. An upload that registers after
+that check finds the file gone and stores it anew. A sweep that dies
+between the two steps leaves its files under ``.trash`` (safe to delete).
+
+See supabase/migrations/*_upload_blobs.sql.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.database import get_supabase_admin
+from app.derivatives import derivative_key
+from app.storage import get_storage
+from app.uploads import purge_expired_sessions
+
+logger = logging.getLogger("app.blobstore")
+
+DERIVATIVE_VARIANTS = ("thumb", "review")
+
+# Key prefix files are moved under before they are deleted
+TRASH_PREFIX = ".trash"
+
+
+async def register_blob(blob: dict):
+    """Record an uploaded blob (or refresh uploaded_at of an existing one); ref_count is kept"""
+    supabase = get_supabase_admin()
+    await supabase.table("upload_blobs").upsert({
+        "file_key": blob["file_key"],
+        "sha256": blob["sha256"],
+        "file_size": blob["file_size"],
+        "uploaded_at": datetime.now(timezone.utc).isoformat(),
+    }, on_conflict="file_key").execute()
+
+
+async def reserve_blob(blob: dict):
+    """Presign: refresh uploaded_at, or add an unverified row (file_size null) if there is none"""
+    supabase = get_supabase_admin()
+    now = datetime.now(timezone.utc).isoformat()
+    response = await supabase.table("upload_blobs")\
+        .update({"uploaded_at": now})\
+        .eq("file_key", blob["file_key"])\
+        .execute()
+    if response.data:
+        return
+    await supabase.table("upload_blobs").upsert({
+        "file_key": blob["file_key"],
+        "sha256": blob["sha256"],
+        "uploaded_at": now,
+    }, on_conflict="file_key", ignore_duplicates=True).execute()
+
+
+def _trash(file_keys: List[str]) -> Dict[str, List[Tuple[str, str]]]:
+    """Move each blob and its derivatives under the trash prefix: file_key -> [(key, trash_key)]"""
+    storage = get_storage()
+    moved = {}
+    for file_key in file_keys:
+        pairs = []
+        for key in [file_key, *(derivative_key(file_key, v) for v in DERIVATIVE_VARIANTS)]:
+            trash_key = f"{TRASH_PREFIX}/{key}"
+            if storage.move(key, trash_key):
+                pairs.append((key, trash_key))
+        moved[file_key] = pairs
+    return moved
+
+
+def _restore(pairs: List[Tuple[str, str]]):
+    storage = get_storage()
+    for key, trash_key in pairs:
+        storage.move(trash_key, key)
+
+
+async def _registered(file_keys: List[str]) -> Set[str]:
+    """Keys that have an upload_blobs row (again)"""
+    supabase = get_supabase_admin()
+    response = await supabase.table("upload_blobs")\
+        .select("file_key")\
+        .in_("file_key", file_keys)\
+        .execute()
+    return {row["file_key"] for row in (response.data or [])}
+
+
+async def sweep(grace_seconds: float, batch_size: int = 500) -> dict:
+    """
+    Delete unreferenced blobs older than ``grace_seconds`` (in batches)
+
+    Rows are claimed and deleted by the database first (claim_unreferenced_blobs,
+    which also re-checks submission_files). The files are moved to the trash,
+    blobs registered again by a concurrent upload are moved back, and the
+    rest are deleted.
+    """
+    supabase = get_supabase_admin()
+    uploaded_before = (datetime.now(timezone.utc) - timedelta(seconds=grace_seconds)).isoformat()
+
+    blobs = files = 0
+    while True:
+        response = await supabase.rpc("claim_unreferenced_blobs", {
+            "p_uploaded_before": uploaded_before,
+            "p_limit": batch_size,
+        }).execute()
+        claimed = response.data or []
+        if not claimed:
+            break
+        moved = await run_in_threadpool(_trash, claimed)
+        live = await _registered(claimed)
+        await run_in_threadpool(_restore, [p for key in live for p in moved[key]])
+
+        doomed = [trash_key for key in claimed if key not in live for _, trash_key in moved[key]]
+        blobs += len(claimed) - len(live)
+        files += await run_in_threadpool(get_storage().delete, doomed)
+        if len(claimed) < batch_size:
+            break
+
+    await purge_expired_sessions()
+    logger.info("upload sweep: %d blobs, %d files removed", blobs, files)
+    return {"blobs": blobs, "files": files}
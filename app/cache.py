@@ -0,0 +1,175 @@
+"""
+In-process read-through cache for tenant reference data
+
+Academy names and class names are read on almost every dashboard, profile
+and homework-list request but change rarely. They are cached per process
+with a per-entry TTL, LRU eviction and an approximate memory cap.
+
+Every entry is tagged with its tenant (academy_id), so one academy's data
+can be dropped at once. Writes that change cached data must invalidate
+explicitly (see ``classes.update_class``/``delete_class``); other workers
+converge within the TTL.
+"""
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from app.config import get_settings
+from app.database import get_supabase_admin
+
+# Fixed per-entry overhead added to the serialized size estimate
+ENTRY_OVERHEAD_BYTES = 200
+
+
+class _Entry:
+    __slots__ = ("value", "tenant", "expires_at", "size")
+
+    def __init__(self, value: Any, tenant: Optional[str], expires_at: float, size: int):
+        self.value = value
+        self.tenant = tenant
+        self.expires_at = expires_at
+        self.size = size
+
+
+class TTLCache:
+    """LRU cache with per-entry TTL, bounded by entry count and approximate bytes"""
+
+    def __init__(self, default_ttl: float, max_entries: int, max_bytes: int):
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, tenant: Optional[str] = None, ttl: Optional[float] = None):
+        size = len(json.dumps(value, default=str)) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+
+        self._remove(key)
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        self._entries[key] = _Entry(value, tenant, expires_at, size)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def invalidate(self, key: Hashable):
+        self._remove(key)
+
+    def invalidate_tenant(self, tenant: str):
+        """Drop every entry tagged with this academy"""
+        for key in [k for k, e in self._entries.items() if e.tenant == tenant]:
+            self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+
+settings = get_settings()
+reference_cache = TTLCache(
+    default_ttl=settings.reference_cache_ttl_seconds,
+    max_entries=settings.reference_cache_max_entries,
+    max_bytes=settings.reference_cache_max_bytes,
+)
+
+
+def academy_key(academy_id) -> Tuple[str, str]:
+    return ("academy", str(academy_id))
+
+
+def class_key(class_id) -> Tuple[str, str]:
+    return ("class", str(class_id))
+
+
+# ============================================
+# Read-through accessors
+# ============================================
+
+async def get_academy_name(academy_id) -> Optional[str]:
+    """Academy name (cached); None if the academy does not exist"""
+    key = academy_key(academy_id)
+    name = reference_cache.get(key)
+    if name is not None:
+        return name
+
+    supabase = get_supabase_admin()
+    response = await supabase.table("academies")\
+        .select("name")\
+        .eq("id", str(academy_id))\
+        .execute()
+
+    if not response.data:
+        return None
+
+    name = response.data[0]["name"]
+    reference_cache.set(key, name, tenant=str(academy_id))
+    return name
+
+
+async def get_classes(class_ids: Iterable) -> Dict[str, dict]:
+    """class id -> {id, name, academy_id} (cached); misses are fetched in one query"""
+    result: Dict[str, dict] = {}
+    missing: List[str] = []
+
+    for class_id in {str(cid) for cid in class_ids}:
+        cached = reference_cache.get(class_key(class_id))
+        if cached is not None:
+            result[class_id] = cached
+        else:
+            missing.append(class_id)
+
+    if missing:
+        supabase = get_supabase_admin()
+        response = await supabase.table("classes")\
+            .select("id, name, academy_id")\
+            .in_("id", missing)\
+            .execute()
+
+        for row in (response.data or []):
+            reference_cache.set(class_key(row["id"]), row, tenant=row.get("academy_id"))
+            result[row["id"]] = row
+
+    return result
+
+
+def invalidate_class(class_id):
+    """Call after a class is renamed or deleted"""
+    reference_cache.invalidate(class_key(class_id))
+
+
+def invalidate_academy(academy_id):
+    """Call after academy data changes; drops every cached entry of the tenant"""
+    reference_cache.invalidate_tenant(str(academy_id))
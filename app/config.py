@@ -16,7 +16,77 @@ class Settings(BaseSettings):
     supabase_url: str
     supabase_key: str
     supabase_service_key: str
-    
+
+    # Backend HTTP connection pool (per worker)
+    db_pool_max_connections: int = 20
+    db_pool_max_keepalive: int = 10
+    db_pool_keepalive_expiry: float = 30.0
+    db_pool_timeout: float = 5.0
+    db_timeout: float = 10.0
+    db_connect_retries: int = 1
+    db_http2: bool = False
+    # Share one round trip among identical concurrent reads (app.singleflight)
+    db_singleflight: bool = True
+    # Per-request query accounting: slow-query log threshold (app.instrumentation)
+    slow_query_threshold_ms: float = 200.0
+
+    # Reference data cache: academy/class names (app.cache)
+    reference_cache_ttl_seconds: float = 300.0
+    reference_cache_max_entries: int = 10000
+    reference_cache_max_bytes: int = 8 * 1024 * 1024
+
+    # List endpoints: keyset pagination page size (app.pagination)
+    page_size_default: int = 50
+    page_size_max: int = 200
+
+    # Student portal profile: timeout for each non-critical query
+    profile_query_timeout_seconds: float = 2.0
+
+    # Student CSV/XLSX import (students.import_students)
+    student_import_batch_size: int = 500
+    student_import_max_rows: int = 10000
+
+    # create_homework: rows per homework_targets insert
+    homework_target_chunk_size: int = 1000
+
+    # Student homework feed: ?filter=due_soon covers today .. today + N days
+    homework_due_soon_days: int = 3
+
+    # Homework file uploads: cap per uploaded file and per submission (sum of its files)
+    upload_max_file_bytes: int = 20 * 1024 * 1024
+    upload_max_submission_bytes: int = 100 * 1024 * 1024
+
+    # Resumable uploads: chunk size, how long an unfinished session is kept and
+    # how many unfinished sessions one user may hold
+    upload_chunk_bytes: int = 1024 * 1024
+    upload_session_ttl_seconds: float = 24 * 3600
+    upload_max_open_sessions: int = 5
+
+    # Upload sweeper: unreferenced blobs older than this are deleted
+    upload_gc_grace_seconds: float = 2 * 24 * 3600
+
+    # Upload storage: "local" (static/uploads) or "s3" (S3/R2/MinIO, needs boto3)
+    storage_backend: str = "local"
+    s3_bucket: str = ""
+    s3_endpoint_url: str = ""  # empty = AWS; e.g. http://localhost:9000 for MinIO
+    s3_region: str = "us-east-1"
+    s3_access_key_id: str = ""
+    s3_secret_access_key: str = ""
+    # Lifetime of presigned upload/download URLs
+    storage_url_ttl_seconds: int = 900
+
+    # Image derivatives (needs Pillow): worker processes and longest side in px
+    image_derivative_workers: int = 2
+    image_thumbnail_px: int = 480
+    image_review_px: int = 1600
+
+    # Backend selection: "supabase" or "memory" (in-process stand-in for
+    # benchmarks and tests, see app.memory_backend)
+    db_backend: str = "supabase"
+    db_memory_latency_ms: float = 0.0
+    db_memory_jitter_ms: float = 0.0
+    db_memory_seed_file: str = ""
+
     # JWT
     secret_key: str
     algorithm: str = "HS256"
@@ -0,0 +1,110 @@
+"""
+Incrementally maintained per-academy dashboard summary
+
+The admin dashboard reads one ``academy_dashboard_summary`` row instead of
+counting students, attendance and revenue on every load. Write paths apply
+their effect with ``apply_delta`` (one RPC, row-locked in the database):
+
+- students.create_student / import_students / delete_student, and
+  update_student when ``status`` changes: active student count
+- attendance.create_attendance / bulk_create_attendance: today's present count
+- billing.create_payment: this month's completed revenue
+
+Each delta also pushes a recent-activity entry. Day/month counters reset
+when the period rolls over. ``recompute`` rebuilds the row from the base
+tables; it runs automatically when no summary exists yet and can be
+triggered via ``POST /api/dashboard/summary/recompute`` or
+``scripts/recompute_dashboard.py`` to repair drift.
+
+See supabase/migrations/*_dashboard_summary.sql.
+"""
+import logging
+from datetime import date, datetime
+from typing import Iterable, Optional, Tuple
+
+from app.database import get_supabase_admin
+
+logger = logging.getLogger("app.dashboard_summary")
+
+
+def local_today() -> date:
+    """Today on the server's local clock
+
+    The one date basis for attendance dates and the dashboard periods, so
+    a write's "today" and the summary's "today" never straddle midnight.
+    """
+    return datetime.now().date()
+
+
+def _period() -> Tuple[str, str]:
+    """(today, first day of this month) as used by the dashboard counters"""
+    today = local_today()
+    return today.isoformat(), today.replace(day=1).isoformat()
+
+
+def activity(kind: str, student_id, at: Optional[str] = None) -> dict:
+    """Recent-activity entry; kind is 'student', 'attendance' or 'payment'"""
+    return {
+        "kind": kind,
+        "student_id": str(student_id),
+        "at": at or datetime.utcnow().isoformat(),
+    }
+
+
+async def apply_delta(
+    academy_id,
+    students: int = 0,
+    attendance: int = 0,
+    revenue: int = 0,
+    activities: Iterable[dict] = (),
+):
+    """Apply one write's effect to the summary
+
+    Errors are logged rather than raised: the write itself has already
+    succeeded, and ``recompute`` repairs any drift.
+    """
+    today, month_start = _period()
+    supabase = get_supabase_admin()
+    try:
+        await supabase.rpc("apply_dashboard_delta", {
+            "p_academy_id": str(academy_id),
+            "p_today": today,
+            "p_month_start": month_start,
+            "p_students": students,
+            "p_attendance": attendance,
+            "p_revenue": revenue,
+            "p_activity": list(activities),
+        }).execute()
+    except Exception:
+        logger.exception("dashboard summary delta failed (academy_id=%s)", academy_id)
+
+
+async def recompute(academy_id) -> dict:
+    """Rebuild the summary from the base tables and return it"""
+    today, month_start = _period()
+    supabase = get_supabase_admin()
+    response = await supabase.rpc("recompute_dashboard_summary", {
+        "p_academy_id": str(academy_id),
+        "p_today": today,
+        "p_month_start": month_start,
+    }).execute()
+    return response.data
+
+
+async def get_summary(academy_id) -> dict:
+    """Current summary (recomputed if missing); stale day/month counters read as 0"""
+    supabase = get_supabase_admin()
+    response = await supabase.table("academy_dashboard_summary")\
+        .select("*")\
+        .eq("academy_id", str(academy_id))\
+        .execute()
+
+    summary = response.data[0] if response.data else await recompute(academy_id)
+
+    today, month_start = _period()
+    if str(summary.get("attendance_date")) != today:
+        summary["today_attendance"] = 0
+    if str(summary.get("revenue_month")) != month_start:
+        summary["monthly_revenue"] = 0
+
+    return summary
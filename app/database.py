@@ -1,21 +1,104 @@
 """
 Database configuration and Supabase client initialization
+
+The admin client is async and shares one bounded keep-alive HTTP connection
+pool per worker. It is created in the app lifespan (see ``app.main``) and
+closed on shutdown; routers obtain it with ``get_supabase_admin()`` and
+``await`` every ``.execute()``.
 """
-import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
+from typing import Optional
+
+import httpx
+from supabase import AsyncClient, AsyncClientOptions, acreate_client
 
-# Load environment variables
-load_dotenv()
+from app.config import get_settings
+from app.memory_backend import MemoryPostgrestTransport, get_memory_database
+from app.singleflight import SingleFlightTransport
+from app.instrumentation import InstrumentedTransport
 
 # Supabase client with service role (admin) for backend operations
-supabase_admin: Client = create_client(
-    os.getenv("SUPABASE_URL"),
-    os.getenv("SUPABASE_SERVICE_KEY")
-)
+supabase_admin: Optional[AsyncClient] = None
+_http_client: Optional[httpx.AsyncClient] = None
 
 
-def get_supabase_admin() -> Client:
-    """Get Supabase admin client"""
+def _build_transport(settings) -> httpx.AsyncBaseTransport:
+    """Network transport to Supabase, or the in-process stand-in"""
+    if settings.db_backend == "memory":
+        db = get_memory_database()
+        if settings.db_memory_seed_file:
+            db.load_json(settings.db_memory_seed_file)
+        return MemoryPostgrestTransport(
+            db,
+            latency_ms=settings.db_memory_latency_ms,
+            jitter_ms=settings.db_memory_jitter_ms,
+        )
+
+    if settings.db_backend != "supabase":
+        raise ValueError(f"Unknown DB_BACKEND: {settings.db_backend}")
+
+    limits = httpx.Limits(
+        max_connections=settings.db_pool_max_connections,
+        max_keepalive_connections=settings.db_pool_max_keepalive,
+        keepalive_expiry=settings.db_pool_keepalive_expiry,
+    )
+    return httpx.AsyncHTTPTransport(
+        limits=limits,
+        http2=settings.db_http2,
+        retries=settings.db_connect_retries,
+    )
+
+
+def _build_http_client(settings) -> httpx.AsyncClient:
+    """Build the pooled HTTP client shared by every backend query"""
+    transport = _build_transport(settings)
+    if settings.db_singleflight:
+        transport = SingleFlightTransport(transport)
+    # Outermost, so coalesced reads are still counted for each request
+    transport = InstrumentedTransport(transport)
+
+    timeout = httpx.Timeout(
+        settings.db_timeout,
+        pool=settings.db_pool_timeout,
+    )
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=timeout,
+        follow_redirects=True,
+    )
+
+
+async def init_supabase_admin() -> AsyncClient:
+    """Create the admin client and its connection pool (app startup)"""
+    global supabase_admin, _http_client
+
+    if supabase_admin is not None:
+        return supabase_admin
+
+    settings = get_settings()
+    _http_client = _build_http_client(settings)
+    supabase_admin = await acreate_client(
+        settings.supabase_url,
+        settings.supabase_service_key,
+        options=AsyncClientOptions(httpx_client=_http_client),
+    )
     return supabase_admin
 
+
+async def close_supabase_admin() -> None:
+    """Close the connection pool (app shutdown)"""
+    global supabase_admin, _http_client
+
+    if _http_client is not None:
+        await _http_client.aclose()
+
+    supabase_admin = None
+    _http_client = None
+
+
+def get_supabase_admin() -> AsyncClient:
+    """Get Supabase admin client"""
+    if supabase_admin is None:
+        raise RuntimeError(
+            "Supabase client is not initialized; call init_supabase_admin() first"
+        )
+    return supabase_admin
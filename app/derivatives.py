@@ -0,0 +1,186 @@
+"""
+Thumbnail / review-size WebP derivatives of uploaded images
+
+Grading views show a grid of phone photos; serving the originals (often
+4-8 MB each) for that is wasteful. After an upload completes, each image
+is rendered into two WebP variants stored as ``derived/<file key>.<variant>.webp``
+in the configured storage backend (app.storage):
+
+- thumb:  longest side IMAGE_THUMBNAIL_PX (grid)
+- review: longest side IMAGE_REVIEW_PX (full-screen grading)
+
+Decoding and encoding are CPU bound, so rendering runs in a process pool
+(IMAGE_DERIVATIVE_WORKERS) and never on the event loop or the thread pool
+that serves requests. EXIF orientation is applied before resizing, and
+metadata is not copied. With a remote backend the original is downloaded
+to a scratch file first and the variants are uploaded back.
+
+Derivative paths are derived from the file key, so a variant rendered at
+upload time is reused when the submission is saved; ``record_derivatives``
+then stores the URLs on the ``submission_files`` rows
+(thumbnail_url / preview_url), which the submission APIs return.
+
+Pillow is listed in requirements.txt; if it is missing anyway, uploads work
+as before and no variants are produced.
+"""
+import asyncio
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.database import get_supabase_admin
+from app.storage import get_storage
+from app.uploads import UPLOAD_ROOT
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # optional: only needed for thumbnails
+    Image = None
+
+logger = logging.getLogger("app.derivatives")
+settings = get_settings()
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff"}
+
+WEBP_QUALITY = 80
+
+_executor: Optional[ProcessPoolExecutor] = None
+_pending: Dict[str, "asyncio.Future[Optional[dict]]"] = {}
+
+
+def derivative_key(file_key: str, variant: str) -> str:
+    """``homework/abc.jpg`` -> ``derived/homework/abc.thumb.webp``"""
+    stem, _ = os.path.splitext(file_key)
+    return f"derived/{stem}.{variant}.webp"
+
+
+def _variants() -> Dict[str, int]:
+    return {"thumb": settings.image_thumbnail_px, "review": settings.image_review_px}
+
+
+def _urls(file_key: str) -> dict:
+    storage = get_storage()
+    return {
+        "thumbnail_url": storage.public_url(derivative_key(file_key, "thumb")),
+        "preview_url": storage.public_url(derivative_key(file_key, "review")),
+    }
+
+
+def _render(source: str, targets: Dict[str, tuple]):
+    """Process-pool worker: write every (path, max side) variant of ``source``"""
+    with Image.open(source) as image:
+        largest = max(size for _, size in targets.values())
+        # JPEG: let the decoder downscale while decoding (much less work for big photos)
+        image.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+            image = image.convert("RGBA" if alpha else "RGB")
+
+        for path, size in sorted(targets.values(), key=lambda t: -t[1]):
+            variant = image.copy()
+            variant.thumbnail((size, size), Image.LANCZOS)
+            variant.save(path, "WEBP", quality=WEBP_QUALITY, method=4)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.image_derivative_workers)
+    return _executor
+
+
+def shutdown():
+    """Stop the worker processes (app shutdown)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def is_image(file_key: str) -> bool:
+    return os.path.splitext(file_key)[1].lower() in IMAGE_EXTENSIONS
+
+
+def _exists(file_keys: Iterable[str]) -> bool:
+    storage = get_storage()
+    return all(storage.exists(key) for key in file_keys)
+
+
+def _scratch_dir() -> tempfile.TemporaryDirectory:
+    # Under UPLOAD_ROOT so storing a local variant is a rename
+    UPLOAD_ROOT.mkdir(parents=True, exist_ok=True)
+    return tempfile.TemporaryDirectory(dir=UPLOAD_ROOT, prefix=".derive-")
+
+
+async def _generate(file_key: str) -> Optional[dict]:
+    storage = get_storage()
+    keys = {variant: derivative_key(file_key, variant) for variant in _variants()}
+    if await run_in_threadpool(_exists, keys.values()):
+        return _urls(file_key)
+    if not await run_in_threadpool(storage.exists, file_key):
+        return None
+
+    scratch = await run_in_threadpool(_scratch_dir)
+    try:
+        source = await run_in_threadpool(
+            storage.fetch, file_key, os.path.join(scratch.name, "source")
+        )
+        targets = {
+            variant: (os.path.join(scratch.name, f"{variant}.webp"), size)
+            for variant, size in _variants().items()
+        }
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(_get_executor(), _render, source, targets)
+        for variant, (path, _) in targets.items():
+            await run_in_threadpool(storage.store, path, keys[variant], "image/webp")
+    finally:
+        await run_in_threadpool(scratch.cleanup)
+    return _urls(file_key)
+
+
+def ensure_derivatives(file_key: str) -> "asyncio.Future[Optional[dict]]":
+    """
+    Start (or join) rendering of ``file_key``; resolves to its URLs, or None
+    when Pillow is missing, the file is not an image or rendering failed
+    """
+    future = _pending.get(file_key)
+    if future is not None:
+        return future
+
+    async def run() -> Optional[dict]:
+        if Image is None or not is_image(file_key):
+            return None
+        try:
+            return await _generate(file_key)
+        except Exception:
+            logger.exception("image derivatives failed (file_key=%s)", file_key)
+            return None
+
+    future = asyncio.ensure_future(run())
+    _pending[file_key] = future
+    future.add_done_callback(lambda _: _pending.pop(file_key, None))
+    return future
+
+
+async def record_derivatives(file_keys: Iterable[str]):
+    """Wait for the variants of ``file_keys`` and store their URLs on submission_files"""
+    file_keys = list(dict.fromkeys(file_keys))
+    results = await asyncio.gather(*(ensure_derivatives(key) for key in file_keys))
+
+    supabase = get_supabase_admin()
+    for file_key, urls in zip(file_keys, results):
+        if not urls:
+            continue
+        try:
+            await supabase.table("submission_files")\
+                .update(urls)\
+                .eq("file_key", file_key)\
+                .execute()
+        except Exception:
+            logger.exception("recording image derivatives failed (file_key=%s)", file_key)
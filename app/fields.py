@@ -0,0 +1,145 @@
+"""
+Sparse fieldsets (``?fields=``) for list/detail endpoints
+
+A ``FieldSet`` describes which response fields an endpoint may return and how
+they map to the backend query: plain columns, embedded relations
+(e.g. ``students`` -> ``students(name, student_number)``) and computed
+fields that need other columns to be fetched.
+
+Usage:
+    projection = STUDENT_FIELDS.parse(fields)
+    query = supabase.table("students").select(projection.select)
+    ...
+    return projection.render(response.data)
+
+Without ``fields`` the endpoint behaves exactly as before (full rows,
+validated by its response_model). With ``fields`` only the requested
+columns are selected in PostgREST and returned.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Type
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.pagination import NEXT_CURSOR_HEADER, PageParams
+
+
+class Projection:
+    """The parsed ``fields`` parameter of one request"""
+
+    def __init__(self, fields: Optional[List[str]], select: str):
+        self.fields = fields
+        self.select = select
+
+    @property
+    def sparse(self) -> bool:
+        return self.fields is not None
+
+    def wants(self, field: str) -> bool:
+        """Whether a (computed) field has to be produced for this response"""
+        return self.fields is None or field in self.fields
+
+    def shape(self, row: dict) -> dict:
+        """Drop columns fetched only to compute other fields"""
+        if self.fields is None:
+            return row
+        return {k: v for k, v in row.items() if k in self.fields}
+
+    def render(self, data):
+        """Return full data unchanged, or the trimmed rows bypassing response_model"""
+        if self.fields is None:
+            return data
+        if isinstance(data, list):
+            return JSONResponse(jsonable_encoder([self.shape(row) for row in data]))
+        return JSONResponse(jsonable_encoder(self.shape(data)))
+
+    def render_page(self, items: List[dict], next_cursor: Optional[str], page: PageParams):
+        """Same as ``render`` for a ``Page`` envelope ``{items, next_cursor}``
+
+        A request without ``cursor``/``limit`` keeps the bare list these
+        endpoints returned before paging was added; its next cursor goes in
+        the ``X-Next-Cursor`` header.
+        """
+        if not page.paged:
+            if next_cursor and page.response is not None:
+                page.response.headers[NEXT_CURSOR_HEADER] = next_cursor
+            rendered = self.render(items)
+            if next_cursor and isinstance(rendered, JSONResponse):
+                rendered.headers[NEXT_CURSOR_HEADER] = next_cursor
+            return rendered
+        if self.fields is None:
+            return {"items": items, "next_cursor": next_cursor}
+        return JSONResponse(jsonable_encoder({
+            "items": [self.shape(row) for row in items],
+            "next_cursor": next_cursor,
+        }))
+
+
+class FieldSet:
+    """Fields an endpoint can return and their backend projection"""
+
+    def __init__(
+        self,
+        columns: Iterable[str],
+        relations: Optional[Dict[str, str]] = None,
+        computed: Optional[Dict[str, Sequence[str]]] = None,
+        always: Sequence[str] = ("id",),
+    ):
+        self.columns = list(columns)
+        self.relations = relations or {}
+        self.computed = computed or {}
+        self.always = list(always)
+
+    @classmethod
+    def from_model(
+        cls,
+        model: Type[BaseModel],
+        relations: Optional[Dict[str, str]] = None,
+        computed: Optional[Dict[str, Sequence[str]]] = None,
+        always: Sequence[str] = ("id",),
+    ) -> "FieldSet":
+        """Columns are the response model's fields minus relations and computed ones"""
+        relations = relations or {}
+        computed = computed or {}
+        columns = [
+            name for name in model.model_fields
+            if name not in relations and name not in computed
+        ]
+        return cls(columns, relations=relations, computed=computed, always=always)
+
+    @property
+    def allowed(self) -> List[str]:
+        return self.columns + list(self.relations) + list(self.computed)
+
+    def default_select(self) -> str:
+        return ", ".join(["*"] + list(self.relations.values()))
+
+    def parse(self, fields: Optional[str], require: Sequence[str] = ()) -> Projection:
+        """Validate ``fields`` and build the select; ``require`` adds columns the endpoint needs"""
+        if not fields:
+            return Projection(None, self.default_select())
+
+        requested = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in requested if f not in self.allowed]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"알 수 없는 필드입니다: {', '.join(unknown)} "
+                       f"(사용 가능: {', '.join(self.allowed)})"
+            )
+
+        wanted = list(dict.fromkeys(list(self.always) + requested))
+
+        columns: List[str] = []
+        for field in wanted + list(require):
+            if field in self.relations:
+                columns.append(self.relations[field])
+            elif field in self.computed:
+                columns.extend(self.computed[field])
+            else:
+                columns.append(field)
+
+        select = ", ".join(dict.fromkeys(columns))
+        return Projection(wanted, select)
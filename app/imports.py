@@ -0,0 +1,138 @@
+"""
+Streaming readers for uploaded CSV/XLSX files
+
+Rows are yielded one at a time as ``(row_number, {column: value})`` without
+loading the whole file: CSV is decoded line by line from the spooled upload
+(UTF-8, or CP949 as saved by Korean Excel; the encoding is settled in one
+pass before the first row so a mixed file fails before anything is
+inserted), XLSX is read with openpyxl in read-only mode (listed in requirements.txt; if
+it is missing, XLSX uploads are rejected with a 400 asking for CSV).
+
+Header cells are normalized through ``aliases`` (e.g. Korean column titles
+to model field names); unknown columns are passed through unchanged.
+"""
+import codecs
+import csv
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile, status
+
+try:
+    import openpyxl
+except ImportError:  # only needed for .xlsx uploads
+    openpyxl = None
+
+Row = Tuple[int, Dict[str, Optional[str]]]
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _normalize_header(cells, aliases: Dict[str, str]) -> List[str]:
+    header = []
+    for cell in cells:
+        name = str(cell).strip() if cell is not None else ""
+        header.append(aliases.get(name, aliases.get(name.lower(), name.lower())))
+    return header
+
+
+def _clean(value) -> Optional[str]:
+    """Empty cells become None; numbers from XLSX are kept as text (e.g. 학번 0012)"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).strip()
+    return text or None
+
+
+def _bad_csv(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def _csv_encoding(file) -> str:
+    """utf-8-sig if the whole file decodes as UTF-8 (BOM 허용), otherwise cp949"""
+    for encoding in ("utf-8-sig", "cp949"):
+        decoder = codecs.getincrementaldecoder(encoding)()
+        file.seek(0)
+        try:
+            for chunk in iter(lambda: file.read(64 * 1024), b""):
+                decoder.decode(chunk)
+            decoder.decode(b"", final=True)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+        finally:
+            file.seek(0)
+    raise _bad_csv("CSV 파일 인코딩을 읽을 수 없습니다. UTF-8 또는 CP949(엑셀 기본)로 저장해주세요.")
+
+
+def _iter_csv(upload: UploadFile, aliases: Dict[str, str]) -> Iterator[Row]:
+    # 한글 엑셀은 CP949로 저장하는 경우가 많아 UTF-8이 아니면 CP949로 읽음
+    encoding = _csv_encoding(upload.file)
+    lines = codecs.iterdecode(upload.file, encoding)
+    reader = csv.reader(lines)
+
+    header = None
+    try:
+        for cells in reader:
+            if header is None:
+                header = _normalize_header(cells, aliases)
+                continue
+            if not any(c.strip() for c in cells):
+                continue
+            yield reader.line_num, {
+                column: _clean(value) for column, value in zip(header, cells) if column
+            }
+    except csv.Error as e:
+        raise _bad_csv(f"{reader.line_num}행: CSV 형식 오류 ({e})")
+
+
+def _iter_xlsx(upload: UploadFile, aliases: Dict[str, str]) -> Iterator[Row]:
+    if openpyxl is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="XLSX 파일을 읽으려면 서버에 openpyxl 패키지가 필요합니다. CSV로 업로드해주세요."
+        )
+
+    upload.file.seek(0)
+    workbook = openpyxl.load_workbook(upload.file, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        header = None
+        for row_number, cells in enumerate(sheet.iter_rows(values_only=True), start=1):
+            if header is None:
+                header = _normalize_header(cells, aliases)
+                continue
+            if all(c is None or str(c).strip() == "" for c in cells):
+                continue
+            yield row_number, {
+                column: _clean(value) for column, value in zip(header, cells) if column
+            }
+    finally:
+        workbook.close()
+
+
+def iter_rows(upload: UploadFile, aliases: Optional[Dict[str, str]] = None) -> Iterator[Row]:
+    """Rows of an uploaded .csv or .xlsx file (chosen by extension / content type)"""
+    aliases = aliases or {}
+    filename = (upload.filename or "").lower()
+
+    if filename.endswith(".xlsx") or upload.content_type == XLSX_CONTENT_TYPE:
+        return _iter_xlsx(upload, aliases)
+    if filename.endswith(".csv") or (upload.content_type or "").startswith("text/"):
+        return _iter_csv(upload, aliases)
+
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="CSV 또는 XLSX 파일만 업로드할 수 있습니다"
+    )
+
+
+def take(rows: Iterator[Row], size: int) -> List[Row]:
+    """Next ``size`` rows (fewer at the end of the file)"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            break
+    return batch
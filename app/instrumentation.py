@@ -0,0 +1,158 @@
+"""
+Per-request backend round-trip accounting
+
+Every backend query passes through ``InstrumentedTransport``, which records
+its duration, table and filters in the stats of the HTTP request currently
+being served (a context variable set by ``QueryStatsMiddleware``).
+
+For each request the middleware then:
+- adds ``Server-Timing: db;dur=<ms>;desc="<n> queries", db-slowest;dur=<ms>;desc="<table>"``
+- logs a structured ``slow_query`` record to the ``app.slow_query`` logger
+  when the slowest query exceeds ``SLOW_QUERY_THRESHOLD_MS``
+"""
+import json
+import logging
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger("app.slow_query")
+
+REST_PREFIX = "/rest/v1/"
+
+# Query parameters that are not filters
+_NON_FILTER_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+class QueryRecord:
+    def __init__(self, method: str, table: str, filters: Dict[str, str], duration_ms: float, status_code: int):
+        self.method = method
+        self.table = table
+        self.filters = filters
+        self.duration_ms = duration_ms
+        self.status_code = status_code
+
+    def to_dict(self) -> dict:
+        return {
+            "method": self.method,
+            "table": self.table,
+            "filters": self.filters,
+            "duration_ms": round(self.duration_ms, 2),
+            "status": self.status_code,
+        }
+
+
+class QueryStats:
+    """Backend queries issued while serving one HTTP request"""
+
+    def __init__(self):
+        self.queries: List[QueryRecord] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(q.duration_ms for q in self.queries)
+
+    @property
+    def slowest(self) -> Optional[QueryRecord]:
+        return max(self.queries, key=lambda q: q.duration_ms, default=None)
+
+    def server_timing(self) -> str:
+        parts = [f'db;dur={self.total_ms:.1f};desc="{self.count} queries"']
+        slowest = self.slowest
+        if slowest is not None:
+            parts.append(f'db-slowest;dur={slowest.duration_ms:.1f};desc="{slowest.table}"')
+        return ", ".join(parts)
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def get_query_stats() -> Optional[QueryStats]:
+    """Stats for the HTTP request being served (None outside a request)"""
+    return _current_stats.get()
+
+
+def _describe(request: httpx.Request):
+    path = request.url.path
+    table = path.split(REST_PREFIX, 1)[1] if REST_PREFIX in path else path
+    filters = {
+        k: v for k, v in request.url.params.multi_items() if k not in _NON_FILTER_PARAMS
+    }
+    return table, filters
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Times every backend round trip and records it in the current request's stats"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        stats = _current_stats.get()
+        if stats is None:
+            return await self._transport.handle_async_request(request)
+
+        start = time.perf_counter()
+        status_code = 0
+        try:
+            response = await self._transport.handle_async_request(request)
+            status_code = response.status_code
+            return response
+        finally:
+            table, filters = _describe(request)
+            stats.queries.append(QueryRecord(
+                request.method, table, filters,
+                (time.perf_counter() - start) * 1000, status_code
+            ))
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware: collects QueryStats per request, adds Server-Timing, logs slow queries"""
+
+    def __init__(self, app, slow_query_threshold_ms: float = 200.0):
+        self.app = app
+        self.slow_query_threshold_ms = slow_query_threshold_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and stats.count:
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            self._log_slow(scope, stats)
+
+    def _log_slow(self, scope, stats: QueryStats):
+        slowest = stats.slowest
+        if slowest is None or slowest.duration_ms < self.slow_query_threshold_ms:
+            return
+
+        logger.warning(json.dumps({
+            "event": "slow_query",
+            "path": scope.get("path"),
+            "http_method": scope.get("method"),
+            "query_count": stats.count,
+            "db_total_ms": round(stats.total_ms, 2),
+            "slowest": slowest.to_dict(),
+        }, ensure_ascii=False))
@@ -0,0 +1,123 @@
+"""
+Request-scoped batched loaders (DataLoader pattern)
+
+Per-row lookups made while building one response are queued and merged into
+a single ``in_()`` query per loader, so list endpoints issue a constant
+number of backend queries however many rows they return.
+
+Usage:
+    loaders: Loaders = Depends(get_loaders)
+    files = await loaders.submission_files.load(submission_id)
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set
+
+from app.database import get_supabase_admin
+from app.cache import get_classes
+
+# Keep the in_() filter well under common URL length limits
+MAX_BATCH_SIZE = 100
+
+BatchFn = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+
+class DataLoader:
+    """Collects keys requested in the same event-loop tick and loads them in one batch"""
+
+    def __init__(self, batch_fn: BatchFn, default: Any = None, max_batch_size: int = MAX_BATCH_SIZE):
+        self._batch_fn = batch_fn
+        self._default = default
+        self._max_batch_size = max_batch_size
+        self._cache: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Hashable] = []
+        # The loop only keeps weak references to tasks; hold them until they finish
+        self._tasks: Set[asyncio.Task] = set()
+
+    def load(self, key: Hashable) -> Awaitable[Any]:
+        """Load one key; identical keys within a request share the same result"""
+        key = str(key)
+
+        if key in self._cache:
+            return self._cache[key]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._cache[key] = future
+        self._queue.append(key)
+
+        if len(self._queue) == 1:
+            loop.call_soon(self._dispatch)
+
+        return future
+
+    async def load_many(self, keys: Iterable[Hashable]) -> List[Any]:
+        """Load several keys, preserving order"""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _dispatch(self):
+        keys, self._queue = self._queue, []
+
+        for start in range(0, len(keys), self._max_batch_size):
+            chunk = keys[start:start + self._max_batch_size]
+            task = asyncio.ensure_future(self._run_batch(chunk))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, keys: List[Hashable]):
+        try:
+            results = await self._batch_fn(keys)
+        except Exception as exc:
+            for key in keys:
+                future = self._cache.pop(key)
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for key in keys:
+            future = self._cache[key]
+            if not future.done():
+                future.set_result(results.get(key, self._default))
+
+
+# ============================================
+# Batch functions
+# ============================================
+
+async def _batch_classes(class_ids: List[str]) -> Dict[str, dict]:
+    """class id -> class row (id, name, academy_id), via the reference cache"""
+    return await get_classes(class_ids)
+
+
+async def _batch_submission_files(submission_ids: List[str]) -> Dict[str, List[dict]]:
+    """submission_id -> submission_files rows ordered by upload_order"""
+    supabase = get_supabase_admin()
+
+    response = await supabase.table("submission_files")\
+        .select("*")\
+        .in_("submission_id", submission_ids)\
+        .order("upload_order")\
+        .execute()
+
+    files: Dict[str, List[dict]] = {}
+    for file in (response.data or []):
+        files.setdefault(file["submission_id"], []).append(file)
+
+    return files
+
+
+class Loaders:
+    """One set of loaders per request; results are cached for the request only"""
+
+    def __init__(self):
+        self.classes = DataLoader(_batch_classes)
+        self.submission_files = DataLoader(_batch_submission_files)
+
+    async def class_names(self, class_ids: Optional[Iterable[Hashable]]) -> List[str]:
+        """Names for a list of class ids (unknown ids are skipped)"""
+        classes = await self.classes.load_many(class_ids or [])
+        return [c["name"] for c in classes if c]
+
+
+def get_loaders() -> Loaders:
+    """FastAPI dependency: fresh loaders for each request"""
+    return Loaders()
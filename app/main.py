@@ -2,6 +2,8 @@
 FastAPI Main Application
 Academy Management System
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
@@ -23,14 +25,33 @@ from app.routers import (
     dashboard
 )
 from app.config import get_settings
+from app.database import init_supabase_admin, close_supabase_admin
+from app.instrumentation import QueryStatsMiddleware
+from app import derivatives
+from app.storage import get_storage
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the backend connection pool on startup, close it on shutdown"""
+    await init_supabase_admin()
+    # Fail fast on a misconfigured STORAGE_BACKEND
+    get_storage()
+    try:
+        yield
+    finally:
+        derivatives.shutdown()
+        await close_supabase_admin()
+
+
 # FastAPI app
 app = FastAPI(
     title="Academy Management System",
     description="멀티테넌트 SaaS 학원 관리 시스템",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -40,6 +61,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cursor of the next page for bare-list responses (app.pagination)
+    expose_headers=["X-Next-Cursor"],
+)
+
+# Backend round-trip accounting (Server-Timing header + slow-query log)
+app.add_middleware(
+    QueryStatsMiddleware,
+    slow_query_threshold_ms=settings.slow_query_threshold_ms
 )
 
 # Static files and templates
@@ -0,0 +1,147 @@
+"""
+In-process class -> student membership index (per academy)
+
+Class-targeted homework (``target_mode = 'class'``) stores only its
+``class_ids``; the audience is resolved at read time from this index
+instead of per-student ``homework_targets`` rows, so students who join a
+class later see its existing homework.
+
+Per academy, student ids are interned to small ordinals and each class is a
+bitset (a Python int) over those ordinals: the audience of a homework is the
+OR of its classes' bitsets and its size a popcount.
+
+The index is loaded with one paged ``class_members`` scan per academy
+(concurrent loads share it), expires after ``REFERENCE_CACHE_TTL_SECONDS``
+and is dropped by ``invalidate_membership`` when this process changes a
+roster (every ``class_members`` write goes through the classes API's
+``apply_class_roster`` call) or renames a student; other workers converge
+within the TTL.
+"""
+import asyncio
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.config import get_settings
+from app.database import get_supabase_admin
+
+settings = get_settings()
+
+# Rows per class_members page (PostgREST caps responses at max-rows)
+LOAD_PAGE_SIZE = 1000
+
+
+def _ordinals(bits: int) -> Iterator[int]:
+    """Positions of the set bits, lowest first"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class AcademyMembership:
+    """Class -> student bitsets of one academy"""
+
+    __slots__ = ("student_ids", "student_names", "ordinals", "classes", "loaded_at")
+
+    def __init__(self, rows: Iterable[dict]):
+        self.student_ids: List[str] = []
+        self.student_names: List[Optional[str]] = []
+        self.ordinals: Dict[str, int] = {}
+        self.classes: Dict[str, int] = {}
+        self.loaded_at = time.monotonic()
+
+        for row in rows:
+            student_id = row["student_id"]
+            ordinal = self.ordinals.get(student_id)
+            if ordinal is None:
+                ordinal = self.ordinals[student_id] = len(self.student_ids)
+                self.student_ids.append(student_id)
+                self.student_names.append((row.get("students") or {}).get("name"))
+            class_id = row["class_id"]
+            self.classes[class_id] = self.classes.get(class_id, 0) | (1 << ordinal)
+
+    def members(self, class_ids: Iterable) -> int:
+        """Bitset of the students in any of the classes"""
+        bits = 0
+        for class_id in class_ids or []:
+            bits |= self.classes.get(str(class_id), 0)
+        return bits
+
+    def count(self, class_ids: Iterable) -> int:
+        return bin(self.members(class_ids)).count("1")
+
+    def students(self, class_ids: Iterable) -> List[Tuple[str, Optional[str], str]]:
+        """(student_id, name, class_id) per student, attributed to the first listed class"""
+        result = []
+        seen = 0
+        for class_id in class_ids or []:
+            class_id = str(class_id)
+            new = self.classes.get(class_id, 0) & ~seen
+            seen |= new
+            result.extend(
+                (self.student_ids[o], self.student_names[o], class_id) for o in _ordinals(new)
+            )
+        return result
+
+    def classes_of(self, student_id: str) -> List[str]:
+        ordinal = self.ordinals.get(str(student_id))
+        if ordinal is None:
+            return []
+        return [cid for cid, bits in self.classes.items() if bits >> ordinal & 1]
+
+
+_entries: Dict[str, AcademyMembership] = {}
+_loading: Dict[str, "asyncio.Future[AcademyMembership]"] = {}
+# Bumped by invalidate_membership so a load that raced a roster change is not cached
+_generations: Dict[str, int] = {}
+
+
+async def _load(academy_id: str) -> AcademyMembership:
+    generation = _generations.get(academy_id, 0)
+    supabase = get_supabase_admin()
+    rows: List[dict] = []
+    offset = 0
+    while True:
+        response = await supabase.table("class_members")\
+            .select("class_id, student_id, students(name), classes!inner(academy_id)")\
+            .eq("classes.academy_id", academy_id)\
+            .is_("left_at", "null")\
+            .order("class_id")\
+            .order("student_id")\
+            .range(offset, offset + LOAD_PAGE_SIZE - 1)\
+            .execute()
+        page = response.data or []
+        rows.extend(page)
+        if len(page) < LOAD_PAGE_SIZE:
+            break
+        offset += LOAD_PAGE_SIZE
+
+    entry = AcademyMembership(rows)
+    if _generations.get(academy_id, 0) == generation:
+        _entries[academy_id] = entry
+    return entry
+
+
+async def get_membership(academy_id) -> AcademyMembership:
+    """The academy's index, loaded on first use and after expiry/invalidation"""
+    academy_id = str(academy_id)
+    entry = _entries.get(academy_id)
+    if entry is not None and time.monotonic() - entry.loaded_at < settings.reference_cache_ttl_seconds:
+        return entry
+
+    loading = _loading.get(academy_id)
+    if loading is None:
+        loading = asyncio.ensure_future(_load(academy_id))
+        _loading[academy_id] = loading
+        loading.add_done_callback(lambda _: _loading.pop(academy_id, None))
+
+    return await asyncio.shield(loading)
+
+
+def invalidate_membership(academy_id=None):
+    """Call after class rosters change; None drops every academy"""
+    academy_ids = list(_entries) + list(_loading) if academy_id is None else [str(academy_id)]
+    for key in academy_ids:
+        _generations[key] = _generations.get(key, 0) + 1
+        _entries.pop(key, None)
+        _loading.pop(key, None)
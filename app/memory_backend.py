@@ -0,0 +1,915 @@
+"""
+In-process PostgREST stand-in backend
+
+An httpx transport that answers the PostgREST requests issued by the
+Supabase query builder from in-memory tables, so the whole app can run,
+be profiled and be load-tested without a live Supabase project.
+
+Supported subset (what the routers use):
+- select with column lists and embedded relations, e.g.
+  ``*, students(name), class_students(count)``, ``students!inner(name)``
+- filters: eq, neq, gt, gte, lt, lte, in, is, like, ilike (and ``not.``),
+  including nested ``or=(...)`` / ``and=(...)`` logical filters and filters
+  on embedded resources (``homework.academy_id=eq.X`` with ``homework!inner(...)``)
+- order, limit, offset, ``count="exact"``, ``single()``
+- insert (incl. upsert with ``on_conflict``), update, delete
+- rpc calls to functions registered with ``@rpc("name")``
+
+Enable with ``DB_BACKEND=memory``; ``DB_MEMORY_LATENCY_MS`` and
+``DB_MEMORY_JITTER_MS`` inject a per-request round-trip delay and
+``DB_MEMORY_SEED_FILE`` loads ``{"table": [rows...]}`` JSON at startup.
+"""
+import asyncio
+import fnmatch
+import json
+import random
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+REST_PREFIX = "/rest/v1/"
+
+# Query parameters that are not column filters
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+# Logical filter parameters, e.g. ``or=(a.lt.1,and(a.eq.1,id.lt.5))``
+LOGICAL_PARAMS = ("and", "or", "not.and", "not.or")
+
+# Explicit embedded relations: (table, relation) -> (kind, local column, remote column)
+# Anything not listed is resolved by naming convention (see _resolve_relation)
+RELATIONS: Dict[Tuple[str, str], Tuple[str, str, str]] = {}
+
+# Column defaults applied on insert, mirroring the Postgres schema closely
+# enough that ``select("*")`` returns every column the response models expect
+SCHEMA: Dict[str, Dict[str, Any]] = {
+    "students": {
+        "student_number": None, "phone": None, "email": None, "grade": None,
+        "parent_phone": None, "parent_name": None, "memo": None,
+        "is_linked": False, "invite_token": None, "status": "active",
+    },
+    "classes": {"description": None, "grade_level": None, "subject": None, "is_active": True},
+    "homework": {
+        "description": None, "due_date": None, "subject": None, "grade_level": None,
+        "class_ids": [], "created_by": None, "target_mode": "snapshot",
+    },
+    "homework_submissions": {
+        "content": None, "status": "pending", "submitted_at": None,
+        "grade": None, "feedback": None, "graded_at": None, "graded_by": None,
+    },
+    "submission_files": {
+        "file_size": None, "mime_type": None, "upload_order": 0,
+        "thumbnail_url": None, "preview_url": None,
+    },
+    "upload_blobs": {"file_size": None, "ref_count": 0},
+    "attendance": {"check_in_time": None, "check_out_time": None, "notes": None, "marked_by": None},
+    "payments": {"notes": None, "status": "completed", "paid_at": None},
+    "notices": {"is_important": False, "target_classes": None, "created_by": None},
+    "counseling": {"follow_up_required": False, "created_by": None},
+    "class_members": {"left_at": None},
+}
+
+_rpc_functions: Dict[str, Callable[["MemoryDatabase", dict], Any]] = {}
+
+
+def rpc(name: str):
+    """Register a Python implementation of a database function for ``.rpc(name)``"""
+    def decorator(fn):
+        _rpc_functions[name] = fn
+        return fn
+    return decorator
+
+
+class PostgrestError(Exception):
+    """Error answered to the client in PostgREST's JSON error format"""
+
+    def __init__(self, status_code: int, code: str, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+        self.message = message
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _singular(name: str) -> str:
+    if name.endswith("ies"):
+        return name[:-3] + "y"
+    if name.endswith("sses"):
+        return name[:-2]
+    if name.endswith("s"):
+        return name[:-1]
+    return name
+
+
+def _split_top_level(text: str, sep: str = ",") -> List[str]:
+    """Split on ``sep`` outside parentheses and double quotes"""
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, char in enumerate(text):
+        if char == '"':
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    if start < len(text):
+        parts.append(text[start:])
+    return parts
+
+
+# ============================================
+# Select parsing
+# ============================================
+
+class SelectItem:
+    def __init__(self, name: str, alias: Optional[str] = None,
+                 children: Optional[List["SelectItem"]] = None, inner: bool = False):
+        self.name = name
+        self.alias = alias or name
+        self.children = children
+        self.inner = inner
+
+    @property
+    def is_embed(self) -> bool:
+        return self.children is not None
+
+
+def parse_select(select: str) -> List[SelectItem]:
+    items = []
+    for part in _split_top_level(select or "*"):
+        part = part.strip()
+        if not part:
+            continue
+
+        alias = None
+        head = part.split("(", 1)[0]
+        if ":" in head and "::" not in head:
+            alias, part = part.split(":", 1)
+
+        if "(" in part and part.endswith(")"):
+            name, inner_select = part.split("(", 1)
+            inner = False
+            if "!" in name:
+                name, hint = name.split("!", 1)
+                inner = hint == "inner"
+            items.append(SelectItem(name, alias, parse_select(inner_select[:-1]), inner))
+        else:
+            items.append(SelectItem(part.split("::", 1)[0].strip('"'), alias))
+    return items
+
+
+# ============================================
+# Filters
+# ============================================
+
+def _parse_list(text: str) -> List[str]:
+    inner = text[1:-1] if text.startswith("(") and text.endswith(")") else text
+    return [v.strip('"') for v in _split_top_level(inner)]
+
+
+def _coerce(row_value: Any, literal: str) -> Tuple[Any, Any]:
+    """Make a row value and a filter literal comparable"""
+    if isinstance(row_value, bool):
+        return row_value, literal.lower() == "true"
+    if isinstance(row_value, (int, float)):
+        try:
+            return row_value, float(literal)
+        except ValueError:
+            return str(row_value), literal
+    return str(row_value), literal
+
+
+_COMPARISONS = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+}
+
+
+def compile_filter(op: str, literal: str) -> Callable[[Any], bool]:
+    """Build a predicate over a row value for one PostgREST operator"""
+    if op == "is":
+        if literal == "null":
+            return lambda value: value is None
+        expected = literal == "true"
+        return lambda value: value is expected
+
+    if op == "in":
+        values = _parse_list(literal)
+        as_text = set(values)
+
+        def match_in(value):
+            if value is None:
+                return False
+            if isinstance(value, (bool, int, float)):
+                return any(a == b for a, b in (_coerce(value, v) for v in values))
+            return str(value) in as_text
+        return match_in
+
+    if op in ("ov", "cs", "cd"):
+        # Array operators; the literal is ``{a,b}``
+        values = {v.strip('"') for v in _split_top_level(literal.strip("{}"))} - {""}
+        test = {
+            "ov": lambda row: bool(row & values),
+            "cs": lambda row: row >= values,
+            "cd": lambda row: row <= values,
+        }[op]
+        return lambda value: value is not None and test({str(v) for v in value})
+
+    if op in ("like", "ilike"):
+        pattern = literal.replace("%", "*")
+        if op == "ilike":
+            pattern = pattern.lower()
+            return lambda value: value is not None and \
+                fnmatch.fnmatchcase(str(value).lower(), pattern)
+        return lambda value: value is not None and fnmatch.fnmatchcase(str(value), pattern)
+
+    compare = _COMPARISONS.get(op)
+    if compare is None:
+        raise PostgrestError(400, "PGRST100", f"unsupported operator: {op}")
+
+    def match(value):
+        if value is None:
+            return False
+        return compare(*_coerce(value, literal))
+    return match
+
+
+def _unquote(literal: str) -> str:
+    if len(literal) >= 2 and literal[0] == literal[-1] == '"':
+        return literal[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return literal
+
+
+def compile_condition(expression: str) -> Callable[[dict], bool]:
+    """One operand of a logical filter: ``col.op.value`` or a nested ``and(...)``/``or(...)``"""
+    for kind in LOGICAL_PARAMS:
+        if expression.startswith(kind + "("):
+            return compile_logical(kind, expression[len(kind):])
+
+    column, _, expression = expression.partition(".")
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, literal = expression.partition(".")
+    predicate = compile_filter(op, literal if op == "in" else _unquote(literal))
+    return lambda row: predicate(row.get(column)) != negate
+
+
+def compile_logical(kind: str, text: str) -> Callable[[dict], bool]:
+    """Row predicate for ``or=(...)``, ``and=(...)`` and their ``not.`` forms"""
+    negate = kind.startswith("not.")
+    combine = all if kind.endswith("and") else any
+    inner = text[1:-1] if text.startswith("(") and text.endswith(")") else text
+    conditions = [compile_condition(c.strip()) for c in _split_top_level(inner)]
+    return lambda row: combine(c(row) for c in conditions) != negate
+
+
+def parse_filters(params: httpx.QueryParams) -> List[Tuple[Optional[str], bool, Callable[[Any], bool]]]:
+    """(column, negate, value predicate); column is None for logical filters over whole rows"""
+    filters = []
+    for column, expression in params.multi_items():
+        if column in LOGICAL_PARAMS:
+            filters.append((None, False, compile_logical(column, expression)))
+            continue
+        if column in RESERVED_PARAMS or "." in column:
+            continue
+        negate = expression.startswith("not.")
+        if negate:
+            expression = expression[4:]
+        op, _, literal = expression.partition(".")
+        filters.append((column, negate, compile_filter(op, literal)))
+    return filters
+
+
+def parse_embedded_filters(params: httpx.QueryParams) -> Dict[str, list]:
+    """Filters on embedded resources, keyed by relation path (``students.classes.name=eq.x``)"""
+    embedded: Dict[str, list] = {}
+    for key, expression in params.multi_items():
+        if key in LOGICAL_PARAMS or "." not in key:
+            continue
+        path, _, column = key.rpartition(".")
+        if column in RESERVED_PARAMS or column in ("or", "and") or path.endswith(".not"):
+            continue
+        negate = expression.startswith("not.")
+        if negate:
+            expression = expression[4:]
+        op, _, literal = expression.partition(".")
+        embedded.setdefault(path, []).append((column, negate, compile_filter(op, literal)))
+    return embedded
+
+
+def apply_filters(rows: List[dict], filters) -> List[dict]:
+    for column, negate, predicate in filters:
+        if column is None:
+            rows = [r for r in rows if predicate(r) != negate]
+        else:
+            rows = [r for r in rows if predicate(r.get(column)) != negate]
+    return rows
+
+
+def apply_order(rows: List[dict], order: Optional[str]) -> List[dict]:
+    if not order:
+        return rows
+    # Stable sorts applied from the last key to the first
+    for term in reversed(order.split(",")):
+        parts = term.split(".")
+        column = parts[0]
+        desc = "desc" in parts[1:]
+        nulls_first = "nullsfirst" in parts[1:] if len(parts) > 2 else desc
+        present = [r for r in rows if r.get(column) is not None]
+        missing = [r for r in rows if r.get(column) is None]
+        present.sort(key=lambda r: r[column], reverse=desc)
+        rows = missing + present if nulls_first else present + missing
+    return rows
+
+
+# ============================================
+# Database
+# ============================================
+
+class MemoryDatabase:
+    """In-memory tables keyed by name; rows are plain dicts"""
+
+    def __init__(self):
+        self.tables: Dict[str, List[dict]] = {}
+
+    def table(self, name: str) -> List[dict]:
+        return self.tables.setdefault(name, [])
+
+    def reset(self):
+        self.tables.clear()
+
+    def seed(self, data: Dict[str, List[dict]]):
+        """Insert fixture rows (defaults such as id/created_at are filled in)"""
+        for name, rows in data.items():
+            self.insert(name, rows)
+
+    def load_json(self, path: str):
+        with open(path, encoding="utf-8") as f:
+            self.seed(json.load(f))
+
+    def insert(self, name: str, rows: List[dict], on_conflict: Optional[List[str]] = None,
+               resolution: Optional[str] = None) -> List[dict]:
+        table = self.table(name)
+        result = []
+        for row in rows:
+            row = json.loads(json.dumps(row, default=_json_default))
+
+            if resolution:
+                keys = on_conflict or ["id"]
+                existing = next(
+                    (r for r in table if all(k in row and r.get(k) == row[k] for k in keys)),
+                    None
+                )
+                if existing is not None:
+                    if resolution == "merge-duplicates":
+                        existing.update(row)
+                        result.append(existing)
+                    continue
+
+            row.setdefault("id", str(uuid.uuid4()))
+            row.setdefault("created_at", _now())
+            for column, default in SCHEMA.get(name, {}).items():
+                row.setdefault(column, json.loads(json.dumps(default)))
+            table.append(row)
+            result.append(row)
+        return result
+
+    def select(self, name: str, filters=(), order: Optional[str] = None) -> List[dict]:
+        return apply_order(apply_filters(list(self.table(name)), filters), order)
+
+    def update(self, name: str, values: dict, filters=()) -> List[dict]:
+        values = json.loads(json.dumps(values, default=_json_default))
+        rows = apply_filters(list(self.table(name)), filters)
+        for row in rows:
+            row.update(values)
+        return rows
+
+    def delete(self, name: str, filters=()) -> List[dict]:
+        rows = apply_filters(list(self.table(name)), filters)
+        doomed = {id(r) for r in rows}
+        self.tables[name] = [r for r in self.table(name) if id(r) not in doomed]
+        return rows
+
+    # ---------- embedding ----------
+
+    def _resolve_relation(self, name: str, relation: str, row: dict):
+        if (name, relation) in RELATIONS:
+            return RELATIONS[(name, relation)]
+
+        forward_key = f"{_singular(relation)}_id"
+        if forward_key in row:
+            return ("one", forward_key, "id")
+        return ("many", "id", f"{_singular(name)}_id")
+
+    def _index(self, name: str, column: str) -> Dict[Any, List[dict]]:
+        index: Dict[Any, List[dict]] = {}
+        for r in self.table(name):
+            index.setdefault(r.get(column), []).append(r)
+        return index
+
+    def project(self, name: str, rows: List[dict], items: List[SelectItem],
+                embedded_filters: Optional[Dict[str, list]] = None, path: str = "") -> List[dict]:
+        embedded_filters = embedded_filters or {}
+        indexes: Dict[Tuple[str, str], Dict[Any, List[dict]]] = {}
+        result = []
+        for row in rows:
+            out = {}
+            keep = True
+            for item in items:
+                if not item.is_embed:
+                    if item.name == "*":
+                        out.update(row)
+                    else:
+                        out[item.alias] = row.get(item.name)
+                    continue
+
+                kind, local, remote = self._resolve_relation(name, item.name, row)
+                if (item.name, remote) not in indexes:
+                    indexes[(item.name, remote)] = self._index(item.name, remote)
+                related = indexes[(item.name, remote)].get(row.get(local), []) \
+                    if row.get(local) is not None else []
+                item_path = f"{path}{item.alias}"
+                if item_path in embedded_filters:
+                    related = apply_filters(related, embedded_filters[item_path])
+
+                if len(item.children) == 1 and item.children[0].name == "count" \
+                        and not item.children[0].is_embed:
+                    out[item.alias] = [{"count": len(related)}]
+                    keep = keep and (not item.inner or bool(related))
+                    continue
+
+                embedded = self.project(item.name, related, item.children,
+                                        embedded_filters, item_path + ".")
+                if kind == "one":
+                    out[item.alias] = embedded[0] if embedded else None
+                else:
+                    out[item.alias] = embedded
+                if item.inner and not embedded:
+                    keep = False
+            if keep:
+                result.append(out)
+        return result
+
+
+# ============================================
+# Transport
+# ============================================
+
+class MemoryPostgrestTransport(httpx.AsyncBaseTransport):
+    """httpx transport answering PostgREST requests from a MemoryDatabase"""
+
+    def __init__(self, db: MemoryDatabase, latency_ms: float = 0.0, jitter_ms: float = 0.0):
+        self.db = db
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        delay = self.latency_ms + (random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        await request.aread()
+        try:
+            status_code, headers, body = self._handle(request)
+        except PostgrestError as e:
+            status_code, headers = e.status_code, {}
+            body = {"code": e.code, "message": e.message, "details": None, "hint": None}
+
+        content = b"" if body is None or request.method == "HEAD" else \
+            json.dumps(body, default=_json_default).encode()
+        headers["content-type"] = "application/json; charset=utf-8"
+        return httpx.Response(status_code, headers=headers, content=content)
+
+    def _handle(self, request: httpx.Request):
+        path = request.url.path
+        if REST_PREFIX not in path:
+            raise PostgrestError(404, "PGRST000", f"unknown path: {path}")
+        resource = path.split(REST_PREFIX, 1)[1].strip("/")
+
+        params = request.url.params
+        prefer = {p.strip() for p in request.headers.get("prefer", "").split(",") if p.strip()}
+        body = json.loads(request.content) if request.content else None
+
+        if resource.startswith("rpc/"):
+            return self._handle_rpc(resource[4:], request, params, body, prefer)
+
+        filters = parse_filters(params)
+        method = request.method
+
+        if method in ("GET", "HEAD"):
+            rows = self.db.select(resource, filters, params.get("order"))
+        elif method == "POST":
+            payload = body if isinstance(body, list) else [body]
+            resolution = next((p.split("=", 1)[1] for p in prefer if p.startswith("resolution=")), None)
+            on_conflict = params.get("on_conflict")
+            rows = self.db.insert(
+                resource, payload,
+                on_conflict=on_conflict.split(",") if on_conflict else None,
+                resolution=resolution
+            )
+        elif method == "PATCH":
+            rows = self.db.update(resource, body or {}, filters)
+        elif method == "DELETE":
+            rows = self.db.delete(resource, filters)
+        else:
+            raise PostgrestError(405, "PGRST000", f"unsupported method: {method}")
+
+        return self._respond(resource, rows, request, params, prefer,
+                             status_code=201 if method == "POST" else 200)
+
+    def _handle_rpc(self, name, request, params, body, prefer):
+        fn = _rpc_functions.get(name)
+        if fn is None:
+            raise PostgrestError(404, "PGRST202", f"Could not find the function public.{name}")
+
+        args = body if request.method == "POST" else {
+            k: v for k, v in params.items() if k not in RESERVED_PARAMS
+        }
+        result = fn(self.db, args or {})
+
+        if not isinstance(result, list):
+            return 200, {}, result
+
+        rows = apply_order(apply_filters(result, parse_filters(params)), params.get("order"))
+        return self._respond(None, rows, request, params, prefer)
+
+    def _respond(self, resource, rows, request, params, prefer, status_code=200):
+        # Projection first: !inner embeds drop rows before counting and paging
+        if resource is not None and "select" in params:
+            rows = self.db.project(resource, rows, parse_select(params["select"]),
+                                   parse_embedded_filters(params))
+
+        total = len(rows)
+        offset = 0
+        if request.method in ("GET", "HEAD") or resource is None:
+            offset = int(params.get("offset") or 0)
+            limit = params.get("limit")
+            rows = rows[offset:offset + int(limit)] if limit else rows[offset:]
+
+        headers = {}
+        if any(p.startswith("count=") for p in prefer):
+            end = offset + len(rows) - 1
+            headers["content-range"] = f"{offset}-{end}/{total}" if rows else f"*/{total}"
+
+        if request.method not in ("GET", "HEAD") and resource is not None \
+                and "return=representation" not in prefer:
+            return status_code, headers, None
+
+        if "vnd.pgrst.object" in request.headers.get("accept", ""):
+            if len(rows) != 1:
+                raise PostgrestError(
+                    406, "PGRST116",
+                    "JSON object requested, multiple (or no) rows returned"
+                )
+            return status_code, headers, rows[0]
+
+        return status_code, headers, rows
+
+
+# ============================================
+# Database functions (mirror supabase/migrations/*.sql)
+# ============================================
+
+@rpc("attendance_stats")
+def _attendance_stats(db: MemoryDatabase, args: dict) -> dict:
+    rows = [
+        r for r in db.table("attendance")
+        if r.get("academy_id") == args["p_academy_id"] and r.get("date") == args["p_date"]
+    ]
+    counts = {"total": len(rows), "present": 0, "late": 0, "absent": 0}
+    for row in rows:
+        if row.get("status") in counts:
+            counts[row["status"]] += 1
+    return counts
+
+
+@rpc("billing_stats")
+def _billing_stats(db: MemoryDatabase, args: dict) -> dict:
+    rows = [
+        r for r in db.table("payments")
+        if r.get("academy_id") == args["p_academy_id"] and r.get("status") == "completed"
+        and r.get("paid_at") is not None and r["paid_at"] >= args["p_since"]
+    ]
+    return {
+        "monthly_revenue": sum(r.get("amount") or 0 for r in rows),
+        "payment_count": len(rows),
+    }
+
+
+def _latest_activity(entries: List[dict], limit: int = 10) -> List[dict]:
+    return sorted(entries, key=lambda a: str(a.get("at") or ""), reverse=True)[:limit]
+
+
+@rpc("recompute_dashboard_summary")
+def _recompute_dashboard_summary(db: MemoryDatabase, args: dict) -> dict:
+    academy_id, today, month_start = args["p_academy_id"], args["p_today"], args["p_month_start"]
+    students = [s for s in db.table("students") if s.get("academy_id") == academy_id]
+    names = {s["id"]: s.get("name") for s in db.table("students")}
+    attendance = [
+        a for a in db.table("attendance")
+        if a.get("academy_id") == academy_id and a.get("date") == today
+        and a.get("status") == "present"
+    ]
+    payments = [
+        p for p in db.table("payments")
+        if p.get("academy_id") == academy_id and p.get("status") == "completed"
+        and p.get("paid_at") is not None
+    ]
+
+    activity = [
+        {"kind": "student", "student_id": s["id"], "name": s.get("name"), "at": s.get("created_at")}
+        for s in students
+    ] + [
+        {"kind": "attendance", "student_id": a["student_id"], "name": names.get(a["student_id"]),
+         "at": a.get("check_in_time") or a.get("created_at")}
+        for a in attendance if a.get("student_id") in names
+    ] + [
+        {"kind": "payment", "student_id": p["student_id"], "name": names.get(p["student_id"]),
+         "at": p["paid_at"]}
+        for p in payments if p.get("student_id") in names
+    ]
+
+    summary = {
+        "academy_id": academy_id,
+        "total_students": sum(1 for s in students if s.get("status") == "active"),
+        "attendance_date": today,
+        "today_attendance": len(attendance),
+        "revenue_month": month_start,
+        "monthly_revenue": sum(p.get("amount") or 0 for p in payments if p["paid_at"] >= month_start),
+        "recent_activity": _latest_activity(activity),
+        "updated_at": _now(),
+    }
+    return db.insert("academy_dashboard_summary", [summary],
+                     on_conflict=["academy_id"], resolution="merge-duplicates")[0]
+
+
+@rpc("apply_dashboard_delta")
+def _apply_dashboard_delta(db: MemoryDatabase, args: dict) -> None:
+    academy_id, today, month_start = args["p_academy_id"], args["p_today"], args["p_month_start"]
+    summary = next(
+        (s for s in db.table("academy_dashboard_summary") if s["academy_id"] == academy_id), None
+    )
+    if summary is None:
+        _recompute_dashboard_summary(db, args)
+        return None
+
+    names = {s["id"]: s.get("name") for s in db.table("students")}
+    activity = [
+        {**a, "name": a.get("name") or names.get(a.get("student_id"))}
+        for a in args.get("p_activity") or []
+    ]
+    attendance = args.get("p_attendance", 0)
+    revenue = args.get("p_revenue", 0)
+
+    summary["total_students"] = max(summary["total_students"] + args.get("p_students", 0), 0)
+    summary["today_attendance"] = summary["today_attendance"] + attendance \
+        if summary["attendance_date"] == today else max(attendance, 0)
+    summary["attendance_date"] = today
+    summary["monthly_revenue"] = summary["monthly_revenue"] + revenue \
+        if summary["revenue_month"] == month_start else revenue
+    summary["revenue_month"] = month_start
+    summary["recent_activity"] = _latest_activity(activity + summary["recent_activity"])
+    summary["updated_at"] = _now()
+    return None
+
+
+@rpc("apply_class_roster")
+def _apply_class_roster(db: MemoryDatabase, args: dict) -> dict:
+    academy_id, class_id, mode = args["p_academy_id"], args["p_class_id"], args["p_mode"]
+    if not any(c["id"] == class_id and c.get("academy_id") == academy_id for c in db.table("classes")):
+        raise PostgrestError(404, "P0002", "반을 찾을 수 없습니다")
+
+    requested = list(dict.fromkeys(args.get("p_student_ids") or []))
+    if mode == "remove":
+        valid = requested
+    else:
+        academy_students = {s["id"] for s in db.table("students") if s.get("academy_id") == academy_id}
+        valid = [sid for sid in requested if sid in academy_students]
+
+    active = [m for m in db.table("class_members") if m["class_id"] == class_id and m.get("left_at") is None]
+    current = {m["student_id"] for m in active}
+
+    to_add = [] if mode == "remove" else [sid for sid in valid if sid not in current]
+    if mode == "add":
+        to_remove = []
+    elif mode == "remove":
+        to_remove = [sid for sid in valid if sid in current]
+    else:
+        to_remove = sorted(current - set(valid))
+
+    left_at = _now()
+    for member in active:
+        if member["student_id"] in to_remove:
+            member["left_at"] = left_at
+    db.insert("class_members", [{"class_id": class_id, "student_id": sid, "left_at": None} for sid in to_add])
+
+    return {
+        "added": to_add,
+        "removed": to_remove,
+        "invalid": [sid for sid in requested if sid not in valid],
+        "student_count": len(current) + len(to_add) - len(to_remove),
+    }
+
+
+@rpc("grade_submissions")
+def _grade_submissions(db: MemoryDatabase, args: dict) -> list:
+    academy_homework = {h["id"] for h in db.table("homework") if h.get("academy_id") == args["p_academy_id"]}
+    by_id = {s["id"]: s for s in db.table("homework_submissions")}
+    graded_at = _now()
+
+    graded = []
+    for submission_id, grade, feedback in zip(args["p_ids"], args["p_grades"], args["p_feedbacks"]):
+        submission = by_id.get(submission_id)
+        if submission is None or submission.get("homework_id") not in academy_homework:
+            continue
+        submission.update({
+            "grade": grade, "feedback": feedback, "status": "graded",
+            "graded_at": graded_at, "graded_by": args["p_graded_by"],
+        })
+        graded.append(submission_id)
+    return graded
+
+
+@rpc("submit_homework")
+def _submit_homework(db: MemoryDatabase, args: dict) -> dict:
+    homework_id, student_id = args["p_homework_id"], args["p_student_id"]
+    homework = next((h for h in db.table("homework") if h["id"] == homework_id), None)
+    if homework is None:
+        targeted = False
+    elif homework.get("target_mode") == "class":
+        class_ids = set(homework.get("class_ids") or [])
+        targeted = any(
+            m.get("class_id") in class_ids and m.get("student_id") == student_id
+            and m.get("left_at") is None
+            for m in db.table("class_members")
+        )
+    else:
+        targeted = any(
+            t.get("homework_id") == homework_id and t.get("student_id") == student_id
+            for t in db.table("homework_targets")
+        )
+    if not targeted:
+        raise PostgrestError(404, "P0002", "숙제를 찾을 수 없거나 대상 학생이 아닙니다")
+
+    submission = db.insert("homework_submissions", [{
+        "homework_id": homework_id,
+        "student_id": student_id,
+        "content": args.get("p_content"),
+        "status": "submitted",
+        "submitted_at": _now(),
+    }], on_conflict=["homework_id", "student_id"], resolution="merge-duplicates")[0]
+
+    db.delete("submission_files", [("submission_id", False, compile_filter("eq", submission["id"]))])
+    db.insert("submission_files", [
+        {
+            "submission_id": submission["id"],
+            "file_key": f.get("file_key"),
+            "file_name": f.get("file_name"),
+            "file_url": f.get("file_url"),
+            "file_size": f.get("file_size"),
+            "mime_type": f.get("mime_type") or "image/jpeg",
+            "upload_order": i,
+        }
+        for i, f in enumerate(args.get("p_files") or [])
+    ])
+    return {"submission_id": submission["id"]}
+
+
+@rpc("student_homework_feed")
+def _student_homework_feed(db: MemoryDatabase, args: dict) -> List[dict]:
+    student_id, today = args["p_student_id"], args["p_today"]
+    due_soon_end = (date.fromisoformat(today) + timedelta(days=args.get("p_due_soon_days", 3))).isoformat()
+    targeted = {t["homework_id"] for t in db.table("homework_targets") if t.get("student_id") == student_id}
+    class_ids = {
+        m["class_id"] for m in db.table("class_members")
+        if m.get("student_id") == student_id and m.get("left_at") is None
+    }
+    submissions = {
+        s["homework_id"]: s for s in db.table("homework_submissions") if s.get("student_id") == student_id
+    }
+
+    feed = []
+    for homework in db.table("homework"):
+        if homework.get("target_mode") == "class":
+            if not class_ids & set(homework.get("class_ids") or []):
+                continue
+        elif homework["id"] not in targeted:
+            continue
+
+        submission = submissions.get(homework["id"])
+        status = submission["status"] if submission else "pending"
+        due_date = homework.get("due_date")
+        keep = {
+            "due_soon": due_date is not None and today <= due_date <= due_soon_end and status == "pending",
+            "overdue": due_date is not None and due_date < today and status == "pending",
+            "graded": status == "graded",
+        }.get(args.get("p_filter"), True)
+        if not keep:
+            continue
+
+        if submission:
+            files = sorted(
+                (f for f in db.table("submission_files") if f.get("submission_id") == submission["id"]),
+                key=lambda f: f.get("upload_order") or 0
+            )
+            submission = {**submission, "files": [dict(f) for f in files]}
+        feed.append({**homework, "submission": submission})
+
+    # due_date (nulls last), then newest first
+    feed.sort(key=lambda h: h.get("created_at") or "", reverse=True)
+    dated = sorted((h for h in feed if h.get("due_date")), key=lambda h: h["due_date"],
+                   reverse=bool(args.get("p_descending")))
+    return dated + [h for h in feed if not h.get("due_date")]
+
+
+@rpc("homework_progress")
+def _homework_progress(db: MemoryDatabase, args: dict) -> dict:
+    homework_ids = {str(h) for h in args.get("p_homework_ids") or []}
+    homeworks = [h for h in db.table("homework") if h["id"] in homework_ids]
+
+    # One pass over each table, then per-homework lookups (like the SQL joins)
+    targets_by_homework: Dict[str, int] = {}
+    for t in db.table("homework_targets"):
+        if t.get("homework_id") in homework_ids:
+            targets_by_homework[t["homework_id"]] = targets_by_homework.get(t["homework_id"], 0) + 1
+
+    members_by_class: Dict[str, set] = {}
+    for m in db.table("class_members"):
+        if m.get("left_at") is None:
+            members_by_class.setdefault(m.get("class_id"), set()).add(m["student_id"])
+
+    submissions_by_homework: Dict[str, Dict[str, dict]] = {}
+    for sub in db.table("homework_submissions"):
+        if sub.get("homework_id") in homework_ids:
+            submissions_by_homework.setdefault(sub["homework_id"], {})[sub["student_id"]] = sub
+
+    progress = {}
+    for homework in homeworks:
+        if homework.get("target_mode") == "class":
+            students = set()
+            for class_id in homework.get("class_ids") or []:
+                students |= members_by_class.get(class_id, set())
+            targets = len(students)
+        else:
+            targets = targets_by_homework.get(homework["id"], 0)
+
+        submissions = submissions_by_homework.get(homework["id"], {}).values()
+        submitted = sum(1 for sub in submissions if sub.get("status") == "submitted")
+        graded = sum(1 for sub in submissions if sub.get("status") == "graded")
+        due_date = homework.get("due_date")
+        late = sum(
+            1 for sub in submissions
+            if sub.get("status") in ("submitted", "graded") and due_date and sub.get("submitted_at")
+            and str(sub["submitted_at"])[:10] > due_date
+        )
+        progress[homework["id"]] = {
+            "targets": targets,
+            "submitted": submitted,
+            "graded": graded,
+            "pending": max(targets - submitted - graded, 0),
+            "late": late,
+        }
+    return progress
+
+
+@rpc("claim_unreferenced_blobs")
+def _claim_unreferenced_blobs(db: MemoryDatabase, args: dict) -> List[str]:
+    # No triggers here: references are counted from submission_files directly
+    referenced = {f.get("file_key") for f in db.table("submission_files")}
+    candidates = sorted(
+        (b for b in db.table("upload_blobs")
+         if b["file_key"] not in referenced and b.get("uploaded_at", "") < args["p_uploaded_before"]),
+        key=lambda b: b.get("uploaded_at", "")
+    )[: args.get("p_limit", 500)]
+    claimed = {b["file_key"] for b in candidates}
+    db.tables["upload_blobs"] = [b for b in db.table("upload_blobs") if b["file_key"] not in claimed]
+    return [b["file_key"] for b in candidates]
+
+
+_database = MemoryDatabase()
+
+
+def get_memory_database() -> MemoryDatabase:
+    """The process-wide database used when DB_BACKEND=memory"""
+    return _database
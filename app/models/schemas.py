@@ -2,11 +2,23 @@
 Pydantic Models for Request/Response
 """
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Generic, TypeVar
 from datetime import datetime, date
 from uuid import UUID
 
 
+T = TypeVar("T")
+
+
+# ============================================
+# Pagination Models
+# ============================================
+class Page(BaseModel, Generic[T]):
+    """목록 응답 한 페이지 (next_cursor가 없으면 마지막 페이지)"""
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
 # ============================================
 # Auth Models
 # ============================================
@@ -227,6 +239,9 @@ class HomeworkCreate(BaseModel):
     subject: Optional[str] = None
     grade_level: Optional[str] = None
     class_ids: List[UUID] = []  # 대상 반 목록
+    # snapshot: 생성 시점의 반 학생 명단으로 고정 (이후 반에 들어온 학생은 제외)
+    # class: 조회 시점의 반 명단을 따름 (나중에 들어온 학생도 대상)
+    target_mode: str = Field("snapshot", pattern="^(class|snapshot)$")
 
 
 class HomeworkUpdate(BaseModel):
@@ -237,6 +252,15 @@ class HomeworkUpdate(BaseModel):
     grade_level: Optional[str] = None
 
 
+class HomeworkSubmissionCounts(BaseModel):
+    """숙제별 제출 현황 (submitted 는 채점 대기, graded 와 겹치지 않음)"""
+    targets: int = 0
+    submitted: int = 0
+    graded: int = 0
+    pending: int = 0  # 대상 학생 중 미제출
+    late: int = 0  # 마감일 이후 제출
+
+
 class HomeworkResponse(BaseModel):
     id: UUID
     academy_id: UUID
@@ -246,9 +270,11 @@ class HomeworkResponse(BaseModel):
     subject: Optional[str]
     grade_level: Optional[str]
     class_ids: Optional[List[UUID]] = []
+    target_mode: Optional[str] = "snapshot"  # 'class' | 'snapshot'
     created_at: datetime
     target_count: Optional[int] = 0  # 대상 학생 수
     class_names: Optional[List[str]] = []  # 반 이름 목록
+    submission_counts: Optional[HomeworkSubmissionCounts] = None  # 제출 현황 (목록 조회)
 
 
 class HomeworkSubmissionCreate(BaseModel):
@@ -273,6 +299,17 @@ class HomeworkSubmissionResponse(BaseModel):
     files: Optional[List[Dict]] = []  # 제출 파일 목록
 
 
+class SubmissionGrade(BaseModel):
+    submission_id: UUID
+    grade: str
+    feedback: Optional[str] = None
+
+
+class SubmissionBulkGrade(BaseModel):
+    """여러 제출물 일괄 채점"""
+    grades: List[SubmissionGrade] = Field(..., min_length=1, max_length=500)
+
+
 # ============================================
 # Notice Models
 # ============================================
@@ -403,12 +440,35 @@ class ClassMemberAdd(BaseModel):
 class PresignedUploadRequest(BaseModel):
     file_name: str
     content_type: str = "image/jpeg"
+    file_size: Optional[int] = Field(None, gt=0)
+    # 파일 내용의 SHA-256 (hex); 주면 같은 파일은 업로드 없이 재사용 (S3 저장소에서는 필수)
+    sha256: Optional[str] = Field(None, pattern="^[0-9a-f]{64}$")
 
 
 class PresignedUploadResponse(BaseModel):
-    upload_url: str
+    upload_url: Optional[str] = None  # exists 이면 None
     file_key: str
     public_url: str
+    method: str = "POST"  # upload_url 에 보낼 HTTP 메서드
+    headers: Dict[str, str] = {}  # 업로드 요청에 그대로 붙일 헤더
+    resumable: bool = False  # 이어 올리기 세션 사용 가능 (로컬 저장소)
+    exists: bool = False  # 같은 내용이 이미 저장되어 있음 (업로드 불필요)
+
+
+class UploadSessionCreate(BaseModel):
+    """이어 올리기(청크) 업로드 세션 생성"""
+    file_name: str
+    content_type: str = "image/jpeg"
+    file_size: int = Field(..., gt=0)
+
+
+class UploadSessionResponse(BaseModel):
+    session_id: str
+    file_size: int
+    chunk_size: int
+    chunk_count: int
+    received: List[int] = []  # 받은 청크 번호
+    expires_at: datetime
 
 
 class SubmissionFileResponse(BaseModel):
@@ -419,6 +479,8 @@ class SubmissionFileResponse(BaseModel):
     file_size: Optional[int]
     mime_type: Optional[str]
     upload_order: int
+    thumbnail_url: Optional[str] = None  # WebP 썸네일 (없으면 file_url 사용)
+    preview_url: Optional[str] = None  # WebP 검토용 크기
     created_at: datetime
 
 
@@ -0,0 +1,135 @@
+"""
+Keyset (cursor) pagination for list endpoints
+
+Pages are ordered by a sort column plus ``id`` as tie-breaker, and the next
+page is selected with a range filter on those two values instead of an
+OFFSET, so every page costs the same regardless of how deep it is.
+
+Usage:
+    async def list_students(page: PageParams = Depends(page_params), ...):
+        query = STUDENT_KEYSET.apply(supabase.table("students").select(...), page)
+        response = await query.execute()
+        items, next_cursor = STUDENT_KEYSET.paginate(response.data, page)
+        return projection.render_page(items, next_cursor, page)
+
+The cursor is opaque to clients (base64 of the last row's sort value and id);
+``?limit=`` is capped at ``PAGE_SIZE_MAX``.
+
+Every request is paged server-side. A request with ``cursor`` or ``limit``
+gets the ``{items, next_cursor}`` envelope; one with neither keeps the bare
+JSON array these endpoints returned before, but it holds at most
+``PAGE_SIZE_MAX`` rows and the cursor of the rest is sent in the
+``X-Next-Cursor`` header (``Projection.render_page`` picks the shape).
+"""
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, Query, Response, status
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class PageParams:
+    """``?cursor=`` and ``?limit=`` of one list request"""
+
+    def __init__(self, cursor: Optional[str], limit: int, paged: bool = True,
+                 response: Optional[Response] = None):
+        self.cursor = cursor
+        self.limit = limit
+        # False: legacy request (no cursor/limit) answered with a bare list
+        self.paged = paged
+        # Carries X-Next-Cursor for bare-list responses
+        self.response = response
+
+
+# Header with the next page's cursor when the response is a bare list
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def page_params(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+    limit: Optional[int] = Query(None, ge=1, description="페이지 크기 (최대 PAGE_SIZE_MAX)"),
+) -> PageParams:
+    """
+    FastAPI dependency: page size defaults to PAGE_SIZE_DEFAULT and is capped;
+    a request without cursor/limit gets one PAGE_SIZE_MAX page as a bare list
+    """
+    paged = cursor is not None or limit is not None
+    size = min(limit or settings.page_size_default, settings.page_size_max) if paged \
+        else settings.page_size_max
+    return PageParams(cursor, size, paged=paged, response=response)
+
+
+def encode_cursor(sort_value: Any, row_id: Any) -> str:
+    raw = json.dumps([sort_value, str(row_id)], default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="잘못된 커서입니다"
+        )
+    return sort_value, row_id
+
+
+def _quote(value: Any) -> str:
+    """PostgREST logical-filter literal (quoted: timestamps contain ':' and '+')"""
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+class Keyset:
+    """Ordering by ``column`` (NULLs last) then ``id``, and the filter for the page after a cursor"""
+
+    def __init__(self, column: str, desc: bool = True):
+        self.column = column
+        self.desc = desc
+
+    @property
+    def required_columns(self) -> List[str]:
+        """Columns the rows must include to build the next cursor (for FieldSet.parse)"""
+        return [self.column, "id"]
+
+    def apply(self, query, page: PageParams):
+        """Add the cursor filter, ordering and limit (one extra row to detect a next page)"""
+        if page.cursor:
+            query = self._after(query, *decode_cursor(page.cursor))
+
+        return query\
+            .order(self.column, desc=self.desc, nullsfirst=False)\
+            .order("id", desc=self.desc)\
+            .limit(page.limit + 1)
+
+    def _after(self, query, sort_value, row_id):
+        op = "lt" if self.desc else "gt"
+        col = self.column
+        if sort_value is None:
+            # Only the NULL tail is left
+            return query.is_(col, "null").filter("id", op, row_id)
+
+        value, rid = _quote(sort_value), _quote(row_id)
+        return query.or_(
+            f"{col}.{op}.{value},"
+            f"and({col}.eq.{value},id.{op}.{rid}),"
+            f"{col}.is.null"
+        )
+
+    def paginate(self, rows: Optional[List[dict]], page: PageParams) -> Tuple[List[dict], Optional[str]]:
+        """Trim the look-ahead row; next_cursor is None on the last page"""
+        rows = rows or []
+        if len(rows) <= page.limit:
+            return rows, None
+
+        rows = rows[:page.limit]
+        last = rows[-1]
+        return rows, encode_cursor(last.get(self.column), last["id"])
@@ -2,11 +2,18 @@
 출석 관리 API
 """
 from fastapi import APIRouter, Depends, HTTPException
-from app.auth.utils import get_current_user
+import asyncio
+from app.auth.utils import require_admin
 from app.database import get_supabase_admin
-from pydantic import BaseModel
-from datetime import datetime, date
-from typing import Optional
+from app.cache import get_classes
+from app.models.schemas import TokenData
+from app.fields import FieldSet
+from app.pagination import Keyset, PageParams, page_params
+from app.dashboard_summary import activity, apply_delta, local_today
+from pydantic import AliasChoices, BaseModel, Field
+import datetime as dt
+from typing import List, Optional
+from uuid import UUID
 
 router = APIRouter(prefix="/attendance", tags=["attendance"])
 
@@ -15,79 +22,235 @@ class AttendanceCreate(BaseModel):
     status: str  # present, late, absent, excused
     notes: Optional[str] = None
 
+class AttendanceBulkRecord(BaseModel):
+    """일괄 출석 한 행 (date 생략 시 오늘, memo 는 notes 의 옛 이름)"""
+    student_id: UUID
+    status: str = "present"
+    notes: Optional[str] = Field(None, validation_alias=AliasChoices("notes", "memo"))
+    date: Optional[dt.date] = None
+    check_in_time: Optional[dt.datetime] = None
+    check_out_time: Optional[dt.datetime] = None
+
+class AttendanceBulkCreate(BaseModel):
+    """반 단위 일괄 출석"""
+    class_id: UUID
+    records: List[AttendanceBulkRecord] = Field(..., min_length=1, max_length=500)
+
+ATTENDANCE_STATUSES = {"present", "late", "absent", "excused"}
+
+# ?fields= 로 선택 가능한 필드
+ATTENDANCE_FIELDS = FieldSet(
+    ["id", "academy_id", "student_id", "date", "status", "notes",
+     "check_in_time", "check_out_time", "marked_by", "created_at"],
+    relations={"students": "students(name, student_number)"}
+)
+ATTENDANCE_KEYSET = Keyset("created_at")
+
 @router.get("/")
 async def list_attendance(
     date: Optional[str] = None,
-    current_user: dict = Depends(get_current_user)
+    fields: Optional[str] = None,
+    page: PageParams = Depends(page_params),
+    current_user: TokenData = Depends(require_admin)
 ):
-    """출석 기록 조회"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="권한이 없습니다.")
-    
+    """출석 기록 조회 (최신순, cursor/limit 을 주면 페이지 단위)"""
+    projection = ATTENDANCE_FIELDS.parse(fields, require=ATTENDANCE_KEYSET.required_columns)
     supabase = get_supabase_admin()
-    academy_id = current_user.get("academy_id")
+    academy_id = str(current_user.academy_id)
     
     query = supabase.table("attendance")\
-        .select("*, students(name, student_number)")\
+        .select(projection.select)\
         .eq("academy_id", academy_id)
     
     if date:
         query = query.eq("date", date)
     else:
         # 오늘 날짜
-        today = datetime.now().date().isoformat()
+        today = local_today().isoformat()
         query = query.eq("date", today)
     
-    response = query.order("created_at", desc=True).execute()
+    response = await ATTENDANCE_KEYSET.apply(query, page).execute()
+    items, next_cursor = ATTENDANCE_KEYSET.paginate(response.data, page)
     
-    return response.data
+    return projection.render_page(items, next_cursor, page)
+
+async def _fetch_statuses(academy_id: str, attendance_date: str, student_ids: List[str]) -> dict:
+    """student_id -> 그날 이미 기록된 출석 상태"""
+    supabase = get_supabase_admin()
+    response = await supabase.table("attendance")\
+        .select("student_id, status")\
+        .eq("academy_id", academy_id)\
+        .eq("date", attendance_date)\
+        .in_("student_id", student_ids)\
+        .execute()
+    return {row["student_id"]: row["status"] for row in (response.data or [])}
+
+async def _apply_present_delta(academy_id: str, rows: List[dict], previous: dict):
+    """대시보드 요약: 오늘 출석(present) 수 변화분 (덮어쓰기 전 상태와 비교)"""
+    today = local_today().isoformat()
+    rows = [row for row in rows if row["date"] == today]
+    newly_present = [
+        row for row in rows
+        if row["status"] == "present" and previous.get(row["student_id"]) != "present"
+    ]
+    no_longer_present = [
+        row for row in rows
+        if row["status"] != "present" and previous.get(row["student_id"]) == "present"
+    ]
+    if newly_present or no_longer_present:
+        await apply_delta(
+            academy_id,
+            attendance=len(newly_present) - len(no_longer_present),
+            activities=[
+                activity("attendance", row["student_id"], row.get("check_in_time") or row.get("created_at"))
+                for row in newly_present[:10]
+            ]
+        )
 
 @router.post("/")
 async def create_attendance(
     attendance: AttendanceCreate,
-    current_user: dict = Depends(get_current_user)
+    current_user: TokenData = Depends(require_admin)
 ):
-    """출석 기록 생성"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="권한이 없습니다.")
-    
+    """출석 기록 생성 (같은 날 다시 기록하면 덮어씀)"""
     supabase = get_supabase_admin()
-    academy_id = current_user.get("academy_id")
+    academy_id = str(current_user.academy_id)
+    today = local_today().isoformat()
     
     data = {
         "academy_id": academy_id,
         "student_id": attendance.student_id,
-        "date": datetime.now().date().isoformat(),
+        "date": today,
         "status": attendance.status,
         "notes": attendance.notes,
-        "marked_by": current_user["sub"]
+        "marked_by": str(current_user.user_id)
     }
     
-    response = supabase.table("attendance").insert(data).execute()
+    previous = await _fetch_statuses(academy_id, today, [attendance.student_id])
+    response = await supabase.table("attendance")\
+        .upsert(data, on_conflict="student_id,date")\
+        .execute()
+    saved = response.data[0]
+    
+    await _apply_present_delta(academy_id, [saved], previous)
     
-    return response.data[0]
+    return saved
+
+@router.post("/bulk")
+async def bulk_create_attendance(
+    payload: AttendanceBulkCreate,
+    current_user: TokenData = Depends(require_admin)
+):
+    """
+    반 전체 출석 일괄 기록
+    
+    1. 반 소속 확인: class_members (현재 소속) 한 번 조회
+    2. 유효한 행 전체를 한 번에 upsert (학생+날짜 기준, 다시 부르면 덮어씀)
+    3. 행별 결과 반환
+    """
+    supabase = get_supabase_admin()
+    academy_id = str(current_user.academy_id)
+    class_id = str(payload.class_id)
+    today = local_today().isoformat()
+    for record in payload.records:
+        if record.date is None:
+            record.date = dt.date.fromisoformat(today)
+    
+    classes = await get_classes([class_id])
+    if class_id not in classes or str(classes[class_id].get("academy_id")) != academy_id:
+        raise HTTPException(status_code=404, detail="반을 찾을 수 없습니다.")
+    
+    student_ids = list(dict.fromkeys(str(r.student_id) for r in payload.records))
+    
+    async def fetch_members():
+        response = await supabase.table("class_members")\
+            .select("student_id")\
+            .eq("class_id", class_id)\
+            .in_("student_id", student_ids)\
+            .is_("left_at", "null")\
+            .execute()
+        return {row["student_id"] for row in (response.data or [])}
+    
+    # 대시보드 요약(오늘 출석 수) 보정용: 덮어쓰기 전 상태
+    async def fetch_previous_statuses():
+        if not any(r.date.isoformat() == today for r in payload.records):
+            return {}
+        return await _fetch_statuses(academy_id, today, student_ids)
+    
+    members, previous = await asyncio.gather(fetch_members(), fetch_previous_statuses())
+    
+    results = []
+    rows = []
+    seen = set()
+    for record in payload.records:
+        student_id = str(record.student_id)
+        key = (student_id, record.date)
+        error = None
+        if key in seen:
+            error = "요청에 같은 학생/날짜가 중복되었습니다"
+        elif record.status not in ATTENDANCE_STATUSES:
+            error = f"잘못된 출석 상태입니다: {record.status}"
+        elif student_id not in members:
+            error = "반에 속한 학생이 아닙니다"
+        seen.add(key)
+        
+        results.append({
+            "student_id": student_id,
+            "date": record.date.isoformat(),
+            "status": record.status,
+            "ok": error is None,
+            "error": error
+        })
+        if error is None:
+            rows.append({
+                "academy_id": academy_id,
+                "student_id": student_id,
+                "date": record.date.isoformat(),
+                "status": record.status,
+                "check_in_time": record.check_in_time.isoformat() if record.check_in_time else None,
+                "check_out_time": record.check_out_time.isoformat() if record.check_out_time else None,
+                "notes": record.notes,
+                "marked_by": str(current_user.user_id)
+            })
+    
+    saved = {}
+    if rows:
+        response = await supabase.table("attendance")\
+            .upsert(rows, on_conflict="student_id,date")\
+            .execute()
+        saved = {(row["student_id"], row["date"]): row for row in (response.data or [])}
+    
+    for result in results:
+        if result["ok"]:
+            result["attendance_id"] = saved.get((result["student_id"], result["date"]), {}).get("id")
+    
+    await _apply_present_delta(academy_id, rows, previous)
+    
+    return {
+        "class_id": class_id,
+        "saved": len(rows),
+        "failed": len(results) - len(rows),
+        "results": results
+    }
 
 @router.get("/stats")
-async def attendance_stats(current_user: dict = Depends(get_current_user)):
+async def attendance_stats(current_user: TokenData = Depends(require_admin)):
     """출석 통계"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="권한이 없습니다.")
-    
     supabase = get_supabase_admin()
-    academy_id = current_user.get("academy_id")
-    today = datetime.now().date().isoformat()
+    academy_id = str(current_user.academy_id)
+    today = local_today().isoformat()
     
-    # 오늘 출석 현황
-    response = supabase.table("attendance")\
-        .select("status")\
-        .eq("academy_id", academy_id)\
-        .eq("date", today)\
-        .execute()
+    # 오늘 출석 현황 (DB에서 상태별 집계, supabase/migrations 참고)
+    response = await supabase.rpc("attendance_stats", {
+        "p_academy_id": academy_id,
+        "p_date": today
+    }).execute()
     
-    total = len(response.data)
-    present = len([r for r in response.data if r["status"] == "present"])
-    late = len([r for r in response.data if r["status"] == "late"])
-    absent = len([r for r in response.data if r["status"] == "absent"])
+    counts = response.data or {}
+    total = counts.get("total", 0)
+    present = counts.get("present", 0)
+    late = counts.get("late", 0)
+    absent = counts.get("absent", 0)
     
     return {
         "date": today,
@@ -1,9 +1,13 @@
 """
 결제 관리 API
 """
-from fastapi import APIRouter, Depends, HTTPException
-from app.auth.utils import get_current_user
+from fastapi import APIRouter, Depends
+from app.auth.utils import require_admin
 from app.database import get_supabase_admin
+from app.models.schemas import TokenData
+from app.fields import FieldSet
+from app.pagination import Keyset, PageParams, page_params
+from app.dashboard_summary import activity, apply_delta
 from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
@@ -16,34 +20,42 @@ class PaymentCreate(BaseModel):
     payment_method: str  # card, cash, transfer
     notes: Optional[str] = None
 
+# ?fields= 로 선택 가능한 필드
+PAYMENT_FIELDS = FieldSet(
+    ["id", "academy_id", "student_id", "amount", "payment_method",
+     "status", "paid_at", "notes", "created_at"],
+    relations={"students": "students(name, student_number)"}
+)
+PAYMENT_KEYSET = Keyset("paid_at")
+
 @router.get("/payments")
-async def list_payments(current_user: dict = Depends(get_current_user)):
-    """결제 내역 조회"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="권한이 없습니다.")
-    
+async def list_payments(
+    fields: Optional[str] = None,
+    page: PageParams = Depends(page_params),
+    current_user: TokenData = Depends(require_admin)
+):
+    """결제 내역 조회 (최신순, cursor/limit 을 주면 페이지 단위)"""
+    projection = PAYMENT_FIELDS.parse(fields, require=PAYMENT_KEYSET.required_columns)
     supabase = get_supabase_admin()
-    academy_id = current_user.get("academy_id")
+    academy_id = str(current_user.academy_id)
+    
+    query = supabase.table("payments")\
+        .select(projection.select)\
+        .eq("academy_id", academy_id)
     
-    response = supabase.table("payments")\
-        .select("*, students(name, student_number)")\
-        .eq("academy_id", academy_id)\
-        .order("paid_at", desc=True)\
-        .execute()
+    response = await PAYMENT_KEYSET.apply(query, page).execute()
+    items, next_cursor = PAYMENT_KEYSET.paginate(response.data, page)
     
-    return response.data
+    return projection.render_page(items, next_cursor, page)
 
 @router.post("/payments")
 async def create_payment(
     payment: PaymentCreate,
-    current_user: dict = Depends(get_current_user)
+    current_user: TokenData = Depends(require_admin)
 ):
     """결제 생성"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="권한이 없습니다.")
-    
     supabase = get_supabase_admin()
-    academy_id = current_user.get("academy_id")
+    academy_id = str(current_user.academy_id)
     
     data = {
         "academy_id": academy_id,
@@ -55,33 +67,37 @@ async def create_payment(
         "notes": payment.notes
     }
     
-    response = supabase.table("payments").insert(data).execute()
+    response = await supabase.table("payments").insert(data).execute()
+    created = response.data[0]
+    
+    # 대시보드 요약: 이번 달 매출
+    await apply_delta(
+        academy_id,
+        revenue=created["amount"],
+        activities=[activity("payment", created["student_id"], created.get("paid_at"))]
+    )
     
-    return response.data[0]
+    return created
 
 @router.get("/stats")
-async def billing_stats(current_user: dict = Depends(get_current_user)):
+async def billing_stats(current_user: TokenData = Depends(require_admin)):
     """결제 통계"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="권한이 없습니다.")
-    
     supabase = get_supabase_admin()
-    academy_id = current_user.get("academy_id")
+    academy_id = str(current_user.academy_id)
     
     # 이번 달 매출
     current_month = datetime.now().strftime("%Y-%m")
     
-    response = supabase.table("payments")\
-        .select("amount")\
-        .eq("academy_id", academy_id)\
-        .eq("status", "completed")\
-        .gte("paid_at", f"{current_month}-01")\
-        .execute()
+    # DB에서 합계/건수만 집계 (supabase/migrations 참고)
+    response = await supabase.rpc("billing_stats", {
+        "p_academy_id": academy_id,
+        "p_since": f"{current_month}-01"
+    }).execute()
     
-    monthly_revenue = sum(p["amount"] for p in response.data)
+    totals = response.data or {}
     
     return {
-        "monthly_revenue": monthly_revenue,
-        "payment_count": len(response.data)
+        "monthly_revenue": totals.get("monthly_revenue", 0),
+        "payment_count": totals.get("payment_count", 0)
     }
 
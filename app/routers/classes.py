@@ -2,9 +2,14 @@
 반 관리 API
 """
 from fastapi import APIRouter, Depends, HTTPException
-from app.auth.utils import get_current_user
+from postgrest.exceptions import APIError
+from app.auth.utils import require_admin
 from app.database import get_supabase_admin
+from app.cache import invalidate_class
+from app.membership import invalidate_membership
+from app.models.schemas import ClassMemberAdd, TokenData
 from typing import List, Optional
+from uuid import UUID
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/classes", tags=["classes"])
@@ -22,33 +27,34 @@ class ClassUpdate(BaseModel):
     subject: Optional[str] = None
 
 @router.get("/")
-async def list_classes(current_user: dict = Depends(get_current_user)):
-    """반 목록 조회"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="권한이 없습니다.")
-    
+async def list_classes(current_user: TokenData = Depends(require_admin)):
+    """반 목록 조회 (student_count: 현재 소속 학생 수)"""
     supabase = get_supabase_admin()
-    academy_id = current_user.get("academy_id")
+    academy_id = str(current_user.academy_id)
     
-    response = supabase.table("classes")\
-        .select("*, class_students(count)")\
+    # 명단은 class_members (left_at 이 없는 행이 현재 소속)
+    response = await supabase.table("classes")\
+        .select("*, class_students:class_members(count)")\
         .eq("academy_id", academy_id)\
+        .is_("class_students.left_at", "null")\
         .order("created_at", desc=True)\
         .execute()
     
-    return response.data
+    classes = response.data or []
+    for cls in classes:
+        counts = cls.get("class_students") or [{}]
+        cls["student_count"] = counts[0].get("count", 0)
+    
+    return classes
 
 @router.post("/")
 async def create_class(
     class_data: ClassCreate,
-    current_user: dict = Depends(get_current_user)
+    current_user: TokenData = Depends(require_admin)
 ):
     """반 생성"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="권한이 없습니다.")
-    
     supabase = get_supabase_admin()
-    academy_id = current_user.get("academy_id")
+    academy_id = str(current_user.academy_id)
     
     new_class = {
         "academy_id": academy_id,
@@ -58,18 +64,20 @@ async def create_class(
         "subject": class_data.subject
     }
     
-    response = supabase.table("classes").insert(new_class).execute()
+    response = await supabase.table("classes").insert(new_class).execute()
     
     return response.data[0]
 
 @router.get("/{class_id}")
-async def get_class(class_id: str, current_user: dict = Depends(get_current_user)):
-    """반 상세 조회"""
+async def get_class(class_id: str, current_user: TokenData = Depends(require_admin)):
+    """반 상세 조회 (class_students: 현재 소속 학생)"""
     supabase = get_supabase_admin()
     
-    response = supabase.table("classes")\
-        .select("*, class_students(student_id, students(*))")\
+    response = await supabase.table("classes")\
+        .select("*, class_students:class_members(student_id, students(*))")\
         .eq("id", class_id)\
+        .eq("academy_id", str(current_user.academy_id))\
+        .is_("class_students.left_at", "null")\
         .execute()
     
     if not response.data:
@@ -81,17 +89,14 @@ async def get_class(class_id: str, current_user: dict = Depends(get_current_user
 async def update_class(
     class_id: str,
     class_data: ClassUpdate,
-    current_user: dict = Depends(get_current_user)
+    current_user: TokenData = Depends(require_admin)
 ):
     """반 정보 수정"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="권한이 없습니다.")
-    
     supabase = get_supabase_admin()
     
     update_data = {k: v for k, v in class_data.dict().items() if v is not None}
     
-    response = supabase.table("classes")\
+    response = await supabase.table("classes")\
         .update(update_data)\
         .eq("id", class_id)\
         .execute()
@@ -99,61 +104,111 @@ async def update_class(
     if not response.data:
         raise HTTPException(status_code=404, detail="반을 찾을 수 없습니다.")
     
+    invalidate_class(class_id)
+    
     return response.data[0]
 
 @router.delete("/{class_id}")
-async def delete_class(class_id: str, current_user: dict = Depends(get_current_user)):
+async def delete_class(class_id: str, current_user: TokenData = Depends(require_admin)):
     """반 삭제"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="권한이 없습니다.")
-    
     supabase = get_supabase_admin()
     
-    response = supabase.table("classes")\
+    response = await supabase.table("classes")\
         .delete()\
         .eq("id", class_id)\
+        .eq("academy_id", str(current_user.academy_id))\
         .execute()
     
+    invalidate_class(class_id)
+    invalidate_membership(str(current_user.academy_id))
+    
     return {"message": "반이 삭제되었습니다."}
 
+# ============================================
+# 반 명단 일괄 변경 (추가/제거/교체)
+# ("/{class_id}/students/{student_id}" 보다 먼저 등록해야 /remove 가 가로채이지 않음)
+# ============================================
+
+async def _apply_roster(class_id: UUID, student_ids: List, mode: str, current_user: TokenData):
+    """
+    현재 명단과 비교해 차이만 반영 (class_members, DB 함수 apply_class_roster 한 번)
+    
+    - add: student_ids 중 아직 없는 학생 추가
+    - remove: student_ids 중 있는 학생 제거 (left_at 기록)
+    - replace: 명단을 student_ids 로 맞춤
+    
+    비교와 추가/제거가 한 트랜잭션이라 중간에 실패해도 명단이 반만 바뀌지 않음
+    """
+    supabase = get_supabase_admin()
+    academy_id = str(current_user.academy_id)
+    
+    try:
+        response = await supabase.rpc("apply_class_roster", {
+            "p_academy_id": academy_id,
+            "p_class_id": str(class_id),
+            "p_student_ids": list(dict.fromkeys(str(sid) for sid in student_ids)),
+            "p_mode": mode
+        }).execute()
+    except APIError as e:
+        if e.code == "P0002":
+            raise HTTPException(status_code=404, detail="반을 찾을 수 없습니다.")
+        if e.code == "22P02":
+            raise HTTPException(status_code=400, detail="잘못된 ID 형식입니다.")
+        raise
+    
+    result = response.data
+    if result["added"] or result["removed"]:
+        invalidate_membership(academy_id)
+    
+    return {"class_id": class_id, **result}
+
+@router.post("/{class_id}/students")
+async def add_students_to_class(
+    class_id: UUID,
+    members: ClassMemberAdd,
+    current_user: TokenData = Depends(require_admin)
+):
+    """반에 학생 여러 명 추가 (이미 소속된 학생은 건너뜀)"""
+    return await _apply_roster(class_id, members.student_ids, "add", current_user)
+
+@router.post("/{class_id}/students/remove")
+async def remove_students_from_class(
+    class_id: UUID,
+    members: ClassMemberAdd,
+    current_user: TokenData = Depends(require_admin)
+):
+    """반에서 학생 여러 명 제거"""
+    return await _apply_roster(class_id, members.student_ids, "remove", current_user)
+
+@router.put("/{class_id}/students")
+async def replace_class_students(
+    class_id: UUID,
+    members: ClassMemberAdd,
+    current_user: TokenData = Depends(require_admin)
+):
+    """반 명단 교체 (목록에 없는 학생은 제거, 새 학생은 추가)"""
+    return await _apply_roster(class_id, members.student_ids, "replace", current_user)
+
 @router.post("/{class_id}/students/{student_id}")
 async def add_student_to_class(
-    class_id: str,
-    student_id: str,
-    current_user: dict = Depends(get_current_user)
+    class_id: UUID,
+    student_id: UUID,
+    current_user: TokenData = Depends(require_admin)
 ):
     """반에 학생 추가"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="권한이 없습니다.")
-    
-    supabase = get_supabase_admin()
-    
-    data = {
-        "class_id": class_id,
-        "student_id": student_id
-    }
-    
-    response = supabase.table("class_students").insert(data).execute()
+    result = await _apply_roster(class_id, [student_id], "add", current_user)
+    if result["invalid"]:
+        raise HTTPException(status_code=404, detail="학생을 찾을 수 없습니다.")
     
-    return response.data[0]
+    return {"class_id": class_id, "student_id": student_id}
 
 @router.delete("/{class_id}/students/{student_id}")
 async def remove_student_from_class(
-    class_id: str,
-    student_id: str,
-    current_user: dict = Depends(get_current_user)
+    class_id: UUID,
+    student_id: UUID,
+    current_user: TokenData = Depends(require_admin)
 ):
     """반에서 학생 제거"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="권한이 없습니다.")
-    
-    supabase = get_supabase_admin()
-    
-    response = supabase.table("class_students")\
-        .delete()\
-        .eq("class_id", class_id)\
-        .eq("student_id", student_id)\
-        .execute()
+    await _apply_roster(class_id, [student_id], "remove", current_user)
     
     return {"message": "학생이 반에서 제거되었습니다."}
-
@@ -2,8 +2,11 @@
 상담 관리 API
 """
 from fastapi import APIRouter, Depends, HTTPException
-from app.auth.utils import get_current_user
+from app.auth.utils import require_admin
 from app.database import get_supabase_admin
+from app.models.schemas import TokenData
+from app.fields import FieldSet
+from app.pagination import Keyset, PageParams, page_params
 from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
@@ -17,34 +20,42 @@ class CounselingCreate(BaseModel):
     notes: str
     follow_up_required: bool = False
 
+# ?fields= 로 선택 가능한 필드
+COUNSELING_FIELDS = FieldSet(
+    ["id", "academy_id", "student_id", "counseling_date", "counselor",
+     "notes", "follow_up_required", "created_by", "created_at"],
+    relations={"students": "students(name, student_number)"}
+)
+COUNSELING_KEYSET = Keyset("counseling_date")
+
 @router.get("/")
-async def list_counseling(current_user: dict = Depends(get_current_user)):
-    """상담 기록 목록 조회"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="권한이 없습니다.")
-    
+async def list_counseling(
+    fields: Optional[str] = None,
+    page: PageParams = Depends(page_params),
+    current_user: TokenData = Depends(require_admin)
+):
+    """상담 기록 목록 조회 (최신순, cursor/limit 을 주면 페이지 단위)"""
+    projection = COUNSELING_FIELDS.parse(fields, require=COUNSELING_KEYSET.required_columns)
     supabase = get_supabase_admin()
-    academy_id = current_user.get("academy_id")
+    academy_id = str(current_user.academy_id)
     
-    response = supabase.table("counseling")\
-        .select("*, students(name, student_number)")\
-        .eq("academy_id", academy_id)\
-        .order("counseling_date", desc=True)\
-        .execute()
+    query = supabase.table("counseling")\
+        .select(projection.select)\
+        .eq("academy_id", academy_id)
+    
+    response = await COUNSELING_KEYSET.apply(query, page).execute()
+    items, next_cursor = COUNSELING_KEYSET.paginate(response.data, page)
     
-    return response.data
+    return projection.render_page(items, next_cursor, page)
 
 @router.post("/")
 async def create_counseling(
     counseling: CounselingCreate,
-    current_user: dict = Depends(get_current_user)
+    current_user: TokenData = Depends(require_admin)
 ):
     """상담 기록 생성"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="권한이 없습니다.")
-    
     supabase = get_supabase_admin()
-    academy_id = current_user.get("academy_id")
+    academy_id = str(current_user.academy_id)
     
     data = {
         "academy_id": academy_id,
@@ -53,46 +64,42 @@ async def create_counseling(
         "counselor": counseling.counselor,
         "notes": counseling.notes,
         "follow_up_required": counseling.follow_up_required,
-        "created_by": current_user["sub"]
+        "created_by": str(current_user.user_id)
     }
     
-    response = supabase.table("counseling").insert(data).execute()
+    response = await supabase.table("counseling").insert(data).execute()
     
     return response.data[0]
 
 @router.get("/{counseling_id}")
 async def get_counseling(
     counseling_id: str,
-    current_user: dict = Depends(get_current_user)
+    fields: Optional[str] = None,
+    current_user: TokenData = Depends(require_admin)
 ):
     """상담 기록 상세 조회"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="권한이 없습니다.")
-    
+    projection = COUNSELING_FIELDS.parse(fields)
     supabase = get_supabase_admin()
     
-    response = supabase.table("counseling")\
-        .select("*, students(name, student_number)")\
+    response = await supabase.table("counseling")\
+        .select(projection.select)\
         .eq("id", counseling_id)\
         .execute()
     
     if not response.data:
         raise HTTPException(status_code=404, detail="상담 기록을 찾을 수 없습니다.")
     
-    return response.data[0]
+    return projection.render(response.data[0])
 
 @router.delete("/{counseling_id}")
 async def delete_counseling(
     counseling_id: str,
-    current_user: dict = Depends(get_current_user)
+    current_user: TokenData = Depends(require_admin)
 ):
     """상담 기록 삭제"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="권한이 없습니다.")
-    
     supabase = get_supabase_admin()
     
-    response = supabase.table("counseling")\
+    response = await supabase.table("counseling")\
         .delete()\
         .eq("id", counseling_id)\
         .execute()
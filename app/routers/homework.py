@@ -2,22 +2,65 @@
 Homework Management API V2
 숙제 관리 시스템 (반 기반 + 파일 업로드)
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Body, Request
-from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status, Body, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import RedirectResponse
+import asyncio
+from typing import Dict, List, Optional, Union
 from uuid import UUID
 from datetime import datetime, date, timezone
 
 from app.models.schemas import (
     HomeworkCreate, HomeworkUpdate, HomeworkResponse,
     HomeworkSubmissionCreate, HomeworkSubmissionResponse,
+    SubmissionGrade, SubmissionBulkGrade,
     PresignedUploadRequest, PresignedUploadResponse,
-    TokenData
+    UploadSessionCreate, UploadSessionResponse,
+    TokenData, Page
 )
-from app.auth.utils import require_admin
-from app.database import supabase_admin
+from app.auth.utils import require_admin, get_current_user
+from app.database import get_supabase_admin
+from postgrest.exceptions import APIError
+from app.loaders import Loaders, get_loaders
+from app.cache import get_classes
+from app.membership import get_membership
+from app.config import get_settings
+from app.fields import FieldSet
+from app.pagination import Keyset, PageParams, page_params
+from app.uploads import (
+    resolve_upload_path, store_blob, too_large, blob_key, blob_digest,
+    create_session, get_session, write_chunk, complete_session
+)
+from app.storage import get_storage
+from app.derivatives import ensure_derivatives, record_derivatives
+from app.blobstore import register_blob, reserve_blob
 
+settings = get_settings()
 router = APIRouter(prefix="/homeworks", tags=["Homework"])
 
+# Fields selectable with ?fields=; computed fields list the columns they need
+HOMEWORK_FIELDS = FieldSet.from_model(
+    HomeworkResponse,
+    computed={
+        "target_count": ["target_mode", "class_ids"],
+        "class_names": ["class_ids"],
+        "submission_counts": [],
+    }
+)
+HOMEWORK_KEYSET = Keyset("created_at")
+
+
+async def _homework_progress(homework_ids: List[str]) -> dict:
+    """
+    homework_id -> {targets, submitted, graded, pending, late}
+    (one grouped aggregate; targets follow each homework's target_mode)
+    """
+    if not homework_ids:
+        return {}
+    supabase = get_supabase_admin()
+    response = await supabase.rpc("homework_progress", {"p_homework_ids": homework_ids}).execute()
+    return response.data or {}
+
 
 # ============================================
 # Admin: Homework Management
@@ -31,12 +74,18 @@ async def create_homework(
     """
     Create a new homework assignment
     
+    대상 지정 방식 (target_mode):
+    - snapshot (기본): 생성 시점 명단을 homework_targets 에 고정
+    - class: 반만 기록, 대상 학생은 조회 시점의 반 명단으로 결정
+      (나중에 반에 들어온 학생도 숙제를 받음)
+    
     시퀀스:
     1. homework 생성
-    2. class_ids에 속한 학생들 조회
-    3. homework_targets 스냅샷 저장
+    2. (snapshot) class_ids에 속한 학생들 조회 (한 번의 in_ 조회, 학생 기준 중복 제거)
+    3. (snapshot) homework_targets 저장 (HOMEWORK_TARGET_CHUNK_SIZE 단위로 나눠 insert)
     4. (선택) 알림톡 발송
     """
+    supabase = get_supabase_admin()
     
     homework_data = homework.dict()
     homework_data["academy_id"] = str(current_user.academy_id)
@@ -50,7 +99,7 @@ async def create_homework(
     homework_data["class_ids"] = [str(cid) for cid in homework_data.get("class_ids", [])]
     
     # 1. Create homework
-    response = supabase_admin.table("homework")\
+    response = await supabase.table("homework")\
         .insert(homework_data)\
         .execute()
     
@@ -61,94 +110,123 @@ async def create_homework(
         )
     
     homework_id = response.data[0]["id"]
+    class_ids = homework_data["class_ids"]
+    result = response.data[0]
+    
+    if homework_data["target_mode"] == "class":
+        membership = await get_membership(current_user.academy_id)
+        result["target_count"] = membership.count(class_ids)
+        return result
     
-    # 2. Get target students from classes
+    # 2. Get target students from all classes at once
     target_students = []
     
-    if homework.class_ids:
-        for class_id in homework.class_ids:
-            # Get students in this class
-            members_response = supabase_admin.table("class_members")\
-                .select("student_id, students(id, name), class_id, classes(name)")\
-                .eq("class_id", str(class_id))\
+    if class_ids:
+        async def fetch_members():
+            response = await supabase.table("class_members")\
+                .select("student_id, students(id, name), class_id")\
+                .in_("class_id", class_ids)\
                 .is_("left_at", "null")\
                 .execute()
+            return response.data or []
+        
+        members, classes = await asyncio.gather(fetch_members(), get_classes(class_ids))
+        
+        # A student in several classes is targeted once, under the first listed class
+        class_order = {class_id: i for i, class_id in enumerate(class_ids)}
+        members.sort(key=lambda m: class_order.get(m["class_id"], len(class_order)))
+        
+        seen = set()
+        for member in members:
+            student_data = member.get("students") or {}
+            class_data = classes.get(member["class_id"]) or {}
+            student_id = student_data.get("id")
+            if not student_id or student_id in seen:
+                continue
+            seen.add(student_id)
             
-            for member in (members_response.data or []):
-                student_data = member.get("students", {})
-                class_data = member.get("classes", {})
-                
-                target_students.append({
-                    "homework_id": homework_id,
-                    "student_id": student_data.get("id"),
-                    "student_name": student_data.get("name"),
-                    "class_id": str(class_id),
-                    "class_name": class_data.get("name")
-                })
-    
-    # 3. Create homework_targets snapshot
-    if target_students:
-        supabase_admin.table("homework_targets")\
-            .insert(target_students)\
+            target_students.append({
+                "homework_id": homework_id,
+                "student_id": student_id,
+                "student_name": student_data.get("name"),
+                "class_id": member["class_id"],
+                "class_name": class_data.get("name")
+            })
+    
+    # 3. Create homework_targets snapshot (bounded payload per insert)
+    chunk_size = settings.homework_target_chunk_size
+    for start in range(0, len(target_students), chunk_size):
+        await supabase.table("homework_targets")\
+            .insert(target_students[start:start + chunk_size])\
             .execute()
     
     # 4. TODO: Send Kakao notifications (optional)
     
-    result = response.data[0]
     result["target_count"] = len(target_students)
     
     return result
 
 
-@router.get("/", response_model=List[HomeworkResponse])
+@router.get("/", response_model=Union[Page[HomeworkResponse], List[HomeworkResponse]])
 async def list_homeworks(
-    current_user: TokenData = Depends(require_admin)
+    fields: Optional[str] = None,
+    page: PageParams = Depends(page_params),
+    current_user: TokenData = Depends(require_admin),
+    loaders: Loaders = Depends(get_loaders)
 ):
-    """List all homeworks for the academy"""
-    
-    response = supabase_admin.table("homework")\
-        .select("*")\
-        .eq("academy_id", current_user.academy_id)\
-        .order("created_at", desc=True)\
-        .execute()
-    
-    homeworks = response.data or []
-    
-    # Get target count and class names for each homework
-    for homework in homeworks:
-        count_response = supabase_admin.table("homework_targets")\
-            .select("id", count="exact")\
-            .eq("homework_id", homework["id"])\
-            .execute()
-        
-        homework["target_count"] = count_response.count or 0
-        
-        # Get unique class names
-        class_ids = homework.get("class_ids", [])
-        
-        if class_ids:
-            classes_response = supabase_admin.table("classes")\
-                .select("name")\
-                .in_("id", class_ids)\
-                .execute()
-            
-            class_names = [c["name"] for c in (classes_response.data or [])]
-            homework["class_names"] = class_names
-        else:
-            homework["class_names"] = []
+    """
+    List homeworks for the academy (newest first; ?cursor= / ?limit= pages; otherwise one PAGE_SIZE_MAX bare-list page + X-Next-Cursor)
     
-    return homeworks
+    대상 수와 제출 현황(submission_counts)은 페이지 전체를 DB 함수
+    homework_progress 한 번으로 집계
+    """
+    projection = HOMEWORK_FIELDS.parse(fields, require=HOMEWORK_KEYSET.required_columns)
+    supabase = get_supabase_admin()
+    
+    query = supabase.table("homework")\
+        .select(projection.select)\
+        .eq("academy_id", current_user.academy_id)
+    
+    response = await HOMEWORK_KEYSET.apply(query, page).execute()
+    homeworks, next_cursor = HOMEWORK_KEYSET.paginate(response.data, page)
+    
+    async def fetch_progress():
+        if not (projection.wants("target_count") or projection.wants("submission_counts")):
+            return {}
+        return await _homework_progress([h["id"] for h in homeworks])
+    
+    async def fetch_class_names():
+        if not projection.wants("class_names"):
+            return []
+        return await asyncio.gather(*(loaders.class_names(h.get("class_ids")) for h in homeworks))
+    
+    progress, class_names = await asyncio.gather(fetch_progress(), fetch_class_names())
+    
+    for i, homework in enumerate(homeworks):
+        counts = progress.get(homework["id"]) or {}
+        if projection.wants("target_count"):
+            homework["target_count"] = counts.get("targets", 0)
+        if projection.wants("submission_counts"):
+            homework["submission_counts"] = counts or None
+        if projection.wants("class_names"):
+            homework["class_names"] = class_names[i]
+    
+    return projection.render_page(homeworks, next_cursor, page)
 
 
 @router.get("/{homework_id}", response_model=HomeworkResponse)
 async def get_homework(
     homework_id: UUID,
-    current_user: TokenData = Depends(require_admin)
+    fields: Optional[str] = None,
+    current_user: TokenData = Depends(require_admin),
+    loaders: Loaders = Depends(get_loaders)
 ):
     """Get homework details"""
+    projection = HOMEWORK_FIELDS.parse(fields)
+    supabase = get_supabase_admin()
     
-    response = supabase_admin.table("homework")\
-        .select("*")\
+    response = await supabase.table("homework")\
+        .select(projection.select)\
         .eq("id", str(homework_id))\
         .eq("academy_id", current_user.academy_id)\
         .single()\
@@ -160,16 +238,15 @@ async def get_homework(
             detail="숙제를 찾을 수 없습니다"
         )
     
-    # Get target count
-    count_response = supabase_admin.table("homework_targets")\
-        .select("id", count="exact")\
-        .eq("homework_id", str(homework_id))\
-        .execute()
-    
     result = response.data
-    result["target_count"] = count_response.count or 0
-    
-    return result
+    if projection.wants("target_count") or projection.wants("submission_counts"):
+        counts = (await _homework_progress([str(homework_id)])).get(str(homework_id)) or {}
+        result["target_count"] = counts.get("targets", 0)
+        result["submission_counts"] = counts or None
+    if projection.wants("class_names"):
+        result["class_names"] = await loaders.class_names(result.get("class_ids"))
+    
+    return projection.render(result)
 
 
 @router.put("/{homework_id}", response_model=HomeworkResponse)
@@ -179,6 +256,7 @@ async def update_homework(
     current_user: TokenData = Depends(require_admin)
 ):
     """Update homework"""
+    supabase = get_supabase_admin()
     
     update_data = homework.dict(exclude_unset=True)
     
@@ -188,7 +266,7 @@ async def update_homework(
     
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
-    response = supabase_admin.table("homework")\
+    response = await supabase.table("homework")\
         .update(update_data)\
         .eq("id", str(homework_id))\
         .eq("academy_id", current_user.academy_id)\
@@ -201,7 +279,8 @@ async def update_homework(
         )
     
     result = response.data[0]
-    result["target_count"] = 0
+    counts = (await _homework_progress([str(homework_id)])).get(str(homework_id)) or {}
+    result["target_count"] = counts.get("targets", 0)
     return result
 
 
@@ -211,8 +290,9 @@ async def delete_homework(
     current_user: TokenData = Depends(require_admin)
 ):
     """Delete homework"""
+    supabase = get_supabase_admin()
     
-    response = supabase_admin.table("homework")\
+    response = await supabase.table("homework")\
         .delete()\
         .eq("id", str(homework_id))\
         .eq("academy_id", current_user.academy_id)\
@@ -234,42 +314,72 @@ async def delete_homework(
 @router.get("/{homework_id}/submissions")
 async def list_submissions(
     homework_id: UUID,
-    current_user: TokenData = Depends(require_admin)
+    current_user: TokenData = Depends(require_admin),
+    loaders: Loaders = Depends(get_loaders)
 ):
-    """List all submissions for a homework with target students"""
-    
-    # Get target students
-    targets_response = supabase_admin.table("homework_targets")\
-        .select("student_id, student_name, class_name")\
-        .eq("homework_id", str(homework_id))\
-        .execute()
-    
-    targets = {t["student_id"]: t for t in (targets_response.data or [])}
+    """
+    List all submissions for a homework with target students
     
-    # Get submissions
-    submissions_response = supabase_admin.table("homework_submissions")\
-        .select("*")\
-        .eq("homework_id", str(homework_id))\
-        .execute()
+    숙제, 스냅샷 대상, 제출 목록을 동시에 조회
+    (반 기반 숙제의 대상은 반 명단 인덱스에서 결정)
+    """
+    supabase = get_supabase_admin()
     
-    submissions_dict = {s["student_id"]: s for s in (submissions_response.data or [])}
+    async def fetch_homework():
+        response = await supabase.table("homework")\
+            .select("id, target_mode, class_ids")\
+            .eq("id", str(homework_id))\
+            .eq("academy_id", current_user.academy_id)\
+            .execute()
+        return response.data[0] if response.data else None
     
-    # Get submission files
-    submission_ids = [s["id"] for s in (submissions_response.data or [])]
-    files_dict = {}
+    async def fetch_snapshot_targets():
+        response = await supabase.table("homework_targets")\
+            .select("student_id, student_name, class_name")\
+            .eq("homework_id", str(homework_id))\
+            .execute()
+        return response.data or []
     
-    if submission_ids:
-        files_response = supabase_admin.table("submission_files")\
+    async def fetch_submissions():
+        response = await supabase.table("homework_submissions")\
             .select("*")\
-            .in_("submission_id", submission_ids)\
-            .order("upload_order")\
+            .eq("homework_id", str(homework_id))\
             .execute()
-        
-        for file in (files_response.data or []):
-            sid = file["submission_id"]
-            if sid not in files_dict:
-                files_dict[sid] = []
-            files_dict[sid].append(file)
+        return response.data or []
+    
+    homework, snapshot_targets, submissions = await asyncio.gather(
+        fetch_homework(), fetch_snapshot_targets(), fetch_submissions()
+    )
+    
+    if not homework:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="숙제를 찾을 수 없습니다"
+        )
+    
+    # Get target students
+    if homework.get("target_mode") == "class":
+        class_ids = homework.get("class_ids") or []
+        membership, classes = await asyncio.gather(
+            get_membership(current_user.academy_id), get_classes(class_ids)
+        )
+        targets = {
+            student_id: {
+                "student_name": name,
+                "class_name": (classes.get(class_id) or {}).get("name")
+            }
+            for student_id, name, class_id in membership.students(class_ids)
+        }
+    else:
+        targets = {t["student_id"]: t for t in snapshot_targets}
+    
+    submissions_dict = {s["student_id"]: s for s in submissions}
+    
+    # Get submission files (one batched query for all submissions)
+    submission_files = await asyncio.gather(
+        *(loaders.submission_files.load(s["id"]) for s in submissions)
+    )
+    files_dict = {s["id"]: files or [] for s, files in zip(submissions, submission_files)}
     
     # Combine targets with submissions
     results = []
@@ -291,6 +401,60 @@ async def list_submissions(
     return results
 
 
+async def _grade_submissions(grades: List[SubmissionGrade], current_user: TokenData) -> List[dict]:
+    """
+    Grade many submissions with one UPDATE (DB function grade_submissions)
+    
+    Submissions of other academies (or unknown ids) are reported per row
+    and left untouched; a submission repeated in one request is graded once.
+    """
+    supabase = get_supabase_admin()
+    
+    updates = {}
+    for entry in grades:
+        updates.setdefault(str(entry.submission_id), entry)
+    
+    response = await supabase.rpc("grade_submissions", {
+        "p_academy_id": str(current_user.academy_id),
+        "p_graded_by": str(current_user.user_id),
+        "p_ids": list(updates),
+        "p_grades": [entry.grade for entry in updates.values()],
+        "p_feedbacks": [entry.feedback for entry in updates.values()]
+    }).execute()
+    graded = set(response.data or [])
+    
+    results = []
+    reported = set()
+    for entry in grades:
+        submission_id = str(entry.submission_id)
+        if submission_id in reported:
+            results.append({"submission_id": submission_id, "ok": False, "error": "요청에 중복된 제출입니다"})
+            continue
+        reported.add(submission_id)
+        if submission_id not in graded:
+            results.append({"submission_id": submission_id, "ok": False, "error": "제출을 찾을 수 없습니다"})
+            continue
+        results.append({"submission_id": submission_id, "ok": True, "error": None})
+    
+    return results
+
+
+@router.put("/submissions/grade")
+async def bulk_grade_submissions(
+    payload: SubmissionBulkGrade,
+    current_user: TokenData = Depends(require_admin)
+):
+    """Grade many submissions in one request (per-row results)"""
+    results = await _grade_submissions(payload.grades, current_user)
+    graded = sum(1 for r in results if r["ok"])
+    
+    return {
+        "graded": graded,
+        "failed": len(results) - graded,
+        "results": results
+    }
+
+
 @router.put("/submissions/{submission_id}/grade")
 async def grade_submission(
     submission_id: UUID,
@@ -299,21 +463,12 @@ async def grade_submission(
     current_user: TokenData = Depends(require_admin)
 ):
     """Grade a homework submission"""
+    results = await _grade_submissions(
+        [SubmissionGrade(submission_id=submission_id, grade=grade, feedback=feedback)],
+        current_user
+    )
     
-    update_data = {
-        "grade": grade,
-        "feedback": feedback,
-        "graded_at": datetime.now(timezone.utc).isoformat(),
-        "graded_by": str(current_user.user_id),
-        "status": "graded"
-    }
-    
-    response = supabase_admin.table("homework_submissions")\
-        .update(update_data)\
-        .eq("id", str(submission_id))\
-        .execute()
-    
-    if not response.data:
+    if not results[0]["ok"]:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="제출을 찾을 수 없습니다"
@@ -327,131 +482,125 @@ async def grade_submission(
 # ============================================
 
 @router.get("/student/list")
-async def list_student_homeworks(student_id: str):
+async def list_student_homeworks(
+    student_id: str,
+    filter: Optional[str] = Query(
+        None, pattern="^(due_soon|overdue|graded)$",
+        description="due_soon: HOMEWORK_DUE_SOON_DAYS 이내 마감 미제출, overdue: 기한 지난 미제출, graded: 채점 완료"
+    ),
+    order: str = Query("due_date", pattern="^-?due_date$", description="due_date (마감 빠른 순) | -due_date")
+):
     """
     List all homeworks assigned to a student
-    (homework_targets 기반)
-    """
-    
-    # Get assigned homeworks
-    targets_response = supabase_admin.table("homework_targets")\
-        .select("homework_id, homework(*)")\
-        .eq("student_id", student_id)\
-        .execute()
-    
-    homework_ids = []
-    homeworks = []
     
-    for target in (targets_response.data or []):
-        if target.get("homework"):
-            homework = target["homework"]
-            homework_ids.append(homework["id"])
-            homeworks.append(homework)
+    DB 함수 student_homework_feed 한 번으로 조회
+    (스냅샷/반 기반 대상 숙제 + 본인 제출 + 제출 파일(upload_order 순)을 중첩해서 반환,
+    필터와 마감일 정렬도 DB에서 처리)
+    """
+    supabase = get_supabase_admin()
     
-    if not homeworks:
-        return []
+    response = await supabase.rpc("student_homework_feed", {
+        "p_student_id": student_id,
+        "p_today": datetime.now(timezone.utc).date().isoformat(),
+        "p_filter": filter,
+        "p_due_soon_days": settings.homework_due_soon_days,
+        "p_descending": order.startswith("-")
+    }).execute()
     
-    # Get student's submissions
-    submissions_response = supabase_admin.table("homework_submissions")\
-        .select("*")\
-        .eq("student_id", student_id)\
-        .in_("homework_id", homework_ids)\
+    return response.data or []
+
+
+async def _stored_sizes(file_keys: List[str]) -> Dict[str, int]:
+    """
+    file_key -> stored size of blobs that really exist (others are left out)
+
+    Rows reserved by presign (file_size null) are checked in storage once;
+    the real size is recorded so later submits don't look again.
+    """
+    keys = [key for key in file_keys if key]
+    if not keys:
+        return {}
+    supabase = get_supabase_admin()
+    response = await supabase.table("upload_blobs")\
+        .select("file_key, file_size")\
+        .in_("file_key", keys)\
         .execute()
-    
-    submissions_dict = {s["homework_id"]: s for s in (submissions_response.data or [])}
-    
-    # Get submission files
-    submission_ids = [s["id"] for s in (submissions_response.data or [])]
-    files_dict = {}
-    
-    if submission_ids:
-        files_response = supabase_admin.table("submission_files")\
-            .select("*")\
-            .in_("submission_id", submission_ids)\
-            .order("upload_order")\
+    rows = response.data or []
+    sizes = {row["file_key"]: row["file_size"] for row in rows if row.get("file_size") is not None}
+    
+    storage = get_storage()
+    unverified = [row["file_key"] for row in rows if row.get("file_size") is None]
+    found = await asyncio.gather(*(run_in_threadpool(storage.size, key) for key in unverified))
+    for file_key, size in zip(unverified, found):
+        if size is None:
+            continue
+        await supabase.table("upload_blobs")\
+            .update({"file_size": size})\
+            .eq("file_key", file_key)\
             .execute()
-        
-        for file in (files_response.data or []):
-            sid = file["submission_id"]
-            if sid not in files_dict:
-                files_dict[sid] = []
-            files_dict[sid].append(file)
-    
-    # Combine homework with submission status
-    for homework in homeworks:
-        submission = submissions_dict.get(homework["id"])
-        homework["submission"] = submission
-        
-        if submission:
-            submission["files"] = files_dict.get(submission["id"], [])
+        sizes[file_key] = size
     
-    return homeworks
+    return {key: int(size) for key, size in sizes.items()}
 
 
 @router.post("/{homework_id}/submit")
 async def submit_homework(
     homework_id: UUID,
     submission: HomeworkSubmissionCreate,
-    student_id: str
+    student_id: str,
+    background_tasks: BackgroundTasks
 ):
     """
     Submit homework with files
     
-    시퀀스:
-    1. submission 저장
-    2. submission_files 저장
-    3. (선택) 알림톡 발송
+    대상 확인, 제출 저장(재제출 시 갱신), 파일 교체를 DB 함수
+    submit_homework 하나로 처리 (한 번의 왕복, 하나의 트랜잭션)
+    응답 후 이미지 썸네일 URL 기록 (app.derivatives)
+    (선택) 알림톡 발송
     """
+    supabase = get_supabase_admin()
     
-    # Check if homework exists and student is target
-    target_response = supabase_admin.table("homework_targets")\
-        .select("id")\
-        .eq("homework_id", str(homework_id))\
-        .eq("student_id", student_id)\
-        .execute()
-    
-    if not target_response.data:
+    # 용량은 요청의 file_size 가 아니라 저장된 blob 크기(upload_blobs)로 계산
+    file_keys = list(dict.fromkeys(f.get("file_key") for f in submission.files))
+    stored_sizes = await _stored_sizes(file_keys)
+    if any(key not in stored_sizes for key in file_keys):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="숙제를 찾을 수 없거나 대상 학생이 아닙니다"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="업로드되지 않은 파일이 포함되어 있습니다"
         )
     
-    # Check if already submitted
-    existing_response = supabase_admin.table("homework_submissions")\
-        .select("id")\
-        .eq("homework_id", str(homework_id))\
-        .eq("student_id", student_id)\
-        .execute()
-    
-    submission_data = {
-        "homework_id": str(homework_id),
-        "student_id": student_id,
-        "content": submission.content,
-        "status": "submitted",
-        "submitted_at": datetime.now(timezone.utc).isoformat()
-    }
+    total_size = sum(stored_sizes.values())
+    if total_size > settings.upload_max_submission_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"제출 파일 용량이 너무 큽니다 (최대 {settings.upload_max_submission_bytes // (1024 * 1024)}MB)"
+        )
     
-    if existing_response.data:
-        # Update existing submission
-        submission_id = existing_response.data[0]["id"]
-        
-        response = supabase_admin.table("homework_submissions")\
-            .update(submission_data)\
-            .eq("id", submission_id)\
-            .execute()
-        
-        # Delete old files
-        supabase_admin.table("submission_files")\
-            .delete()\
-            .eq("submission_id", submission_id)\
-            .execute()
-    else:
-        # Create new submission
-        response = supabase_admin.table("homework_submissions")\
-            .insert(submission_data)\
-            .execute()
-        
-        submission_id = response.data[0]["id"]
+    files = [
+        {
+            "file_key": file_data["file_key"],
+            "file_name": file_data.get("file_name"),
+            "file_url": file_data.get("file_url"),
+            "file_size": stored_sizes[file_data["file_key"]],
+            "mime_type": file_data.get("mime_type", "image/jpeg")
+        }
+        for file_data in submission.files
+    ]
+    
+    try:
+        response = await supabase.rpc("submit_homework", {
+            "p_homework_id": str(homework_id),
+            "p_student_id": student_id,
+            "p_content": submission.content,
+            "p_files": files
+        }).execute()
+    except APIError as e:
+        if e.code == "P0002":
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="숙제를 찾을 수 없거나 대상 학생이 아닙니다"
+            )
+        raise
     
     if not response.data:
         raise HTTPException(
@@ -459,68 +608,125 @@ async def submit_homework(
             detail="제출에 실패했습니다"
         )
     
-    # Save submission files
-    if submission.files:
-        file_records = []
-        for idx, file_data in enumerate(submission.files):
-            file_records.append({
-                "submission_id": submission_id,
-                "file_key": file_data.get("file_key"),
-                "file_name": file_data.get("file_name"),
-                "file_url": file_data.get("file_url"),
-                "file_size": file_data.get("file_size"),
-                "mime_type": file_data.get("mime_type", "image/jpeg"),
-                "upload_order": idx
-            })
-        
-        if file_records:
-            file_insert_response = supabase_admin.table("submission_files")\
-                .insert(file_records)\
-                .execute()
+    background_tasks.add_task(record_derivatives, [f["file_key"] for f in files if f["file_key"]])
     
     # TODO: Send Kakao notification
     
     return {
         "message": "숙제가 제출되었습니다",
-        "submission_id": submission_id
+        "submission_id": response.data["submission_id"]
     }
 
 
 # ============================================
 # File Upload (Presigned URL)
 # ============================================
+# 업로드된 파일은 내용 해시(SHA-256) 기준으로 저장 (app.uploads, app.blobstore):
+# 같은 파일은 한 번만 저장되고, 제출에는 업로드 응답의 file_key / file_url 을 사용
+# 저장 위치는 STORAGE_BACKEND (app.storage): local 은 앱을 거쳐 업로드,
+# s3 는 브라우저가 presigned URL 로 직접 업로드
+
+def _new_file_key(file_name: str) -> str:
+    """Unique upload key keeping the original extension"""
+    import uuid
+    import os
+    
+    file_ext = os.path.splitext(file_name)[1]
+    return f"homework/{uuid.uuid4()}{file_ext}"
+
+
+def _extension(file_name: str) -> str:
+    import os
+    
+    return os.path.splitext(file_name)[1]
+
+
+async def _finish_upload(blob: dict) -> dict:
+    """Start the image derivatives of a stored (already registered) blob"""
+    ensure_derivatives(blob["file_key"])
+    
+    return {
+        "message": "File uploaded successfully",
+        "file_key": blob["file_key"],
+        "file_url": get_storage().public_url(blob["file_key"]),
+        "file_size": blob["file_size"]
+    }
+
+
+def _require_local_storage():
+    """Endpoints that receive file bytes only exist for the local backend"""
+    if get_storage().name != "local":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="이 저장소에서는 presign 으로 받은 URL 에 직접 업로드하세요"
+        )
+
 
 @router.post("/uploads/presign", response_model=PresignedUploadResponse)
 async def create_presigned_upload(request: PresignedUploadRequest):
     """
     Generate presigned URL for file upload
     
-    실제 프로덕션: S3/R2 presigned URL 생성
-    현재 구현: 로컬 파일 시스템 시뮬레이션
+    sha256 / file_size 를 주면 file_key 는 내용 주소(blobs/..)로 미리 정해짐:
+    - exists=true: 같은 파일이 이미 저장되어 있음 → 업로드 없이 file_key / public_url 로 제출
+    - s3: upload_url 에 method(PUT) + headers 그대로 전송 (크기/해시가 서명에 포함되어 다르면 거부)
+    - local: upload_url 로 전송 (또는 resumable=true 이면 /uploads/sessions 사용)
+    sha256 없이 요청하면 로컬 저장소에서만 허용 (최종 file_key / file_url 은 업로드 응답 값을 사용)
     """
+    storage = get_storage()
+    if request.file_size and request.file_size > settings.upload_max_file_bytes:
+        raise too_large(settings.upload_max_file_bytes)
+    
+    if not request.sha256:
+        if storage.name != "local":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="sha256 과 file_size 가 필요합니다"
+            )
+        file_key = _new_file_key(request.file_name)
+        return {
+            "file_key": file_key,
+            "public_url": storage.public_url(file_key),
+            **storage.upload_target(file_key, request.content_type, request.file_size or 0)
+        }
+    
+    if request.file_size is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="sha256 과 file_size 가 필요합니다"
+        )
     
-    import uuid
-    import os
-    from pathlib import Path
-    
-    # Generate unique file key
-    file_ext = os.path.splitext(request.file_name)[1]
-    file_key = f"homework/{uuid.uuid4()}{file_ext}"
-    
-    # 실제 프로덕션에서는:
-    # - S3/R2 presigned URL 생성
-    # - 시간 제한 (예: 15분)
-    # - 파일 크기 제한
-    
-    # 현재는 로컬 경로 반환 (프론트엔드에서 FormData로 업로드)
-    upload_url = f"/api/homeworks/uploads/file/{file_key}"
-    public_url = f"/uploads/{file_key}"
+    file_key = blob_key(request.sha256, _extension(request.file_name))
+    public_url = storage.public_url(file_key)
+    blob = {"file_key": file_key, "sha256": request.sha256, "file_size": request.file_size}
+    
+    # 파일 확인보다 먼저 기록 (uploaded_at 갱신): sweeper 가 같은 파일을 지우는 중이면
+    # 기록을 보고 되살리고, 이미 지웠으면 아래 확인에서 없음 → 다시 업로드
+    # 업로드 전에 기록해 두면 업로드 후 제출되지 않은 파일도 sweeper 가 회수
+    # 요청의 file_size 는 기록하지 않음 (미확인 행, 제출 시 저장소에서 확인)
+    await reserve_blob(blob)
+    
+    if await run_in_threadpool(storage.exists, file_key):
+        # 같은 내용이 이미 있음: 업로드 없이 사용
+        await _finish_upload(blob)
+        return {"file_key": file_key, "public_url": public_url, "exists": True}
+    
+    target = await run_in_threadpool(
+        storage.upload_target, file_key, request.content_type, request.file_size, request.sha256
+    )
+    return {"file_key": file_key, "public_url": public_url, **target}
+
+
+@router.get("/files/{file_key:path}")
+async def download_file(file_key: str):
+    """
+    저장된 파일로 이동 (s3: 짧게 유효한 presigned GET URL 로 리다이렉트)
     
-    return {
-        "upload_url": upload_url,
-        "file_key": file_key,
-        "public_url": public_url
-    }
+    제출 파일 URL 은 이 주소로 저장되므로 URL 이 만료되지 않음
+    """
+    resolve_upload_path(file_key)
+    url = await run_in_threadpool(get_storage().download_url, file_key)
+    return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
 
 
 @router.post("/uploads/file/{file_key:path}")
@@ -528,20 +734,89 @@ async def upload_file(file_key: str, request: Request):
     """
     실제 파일 업로드 엔드포인트 (로컬 구현)
     
-    프로덕션에서는 이 엔드포인트가 필요 없음 (S3/R2 직접 업로드)
+    요청 본문을 청크 단위로 임시 파일에 기록(스레드 풀, SHA-256 계산)한 뒤
+    내용 주소(blobs/..)로 원자적으로 이름 변경, 같은 내용이 이미 있으면 재사용
+    (UPLOAD_MAX_FILE_BYTES 초과 시 413, 메모리에 파일 전체를 올리지 않음)
+    file_key 가 presign 의 내용 주소이면 해시가 다를 때 400
+    STORAGE_BACKEND=s3 에서는 사용하지 않음 (presigned URL 로 직접 업로드)
     """
-    from pathlib import Path
-    
-    # Read raw body
-    file_data = await request.body()
-    
-    # Create uploads directory
-    upload_dir = Path("static/uploads") / Path(file_key).parent
-    upload_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Save file
-    file_path = Path("static/uploads") / file_key
-    with open(file_path, "wb") as f:
-        f.write(file_data)
-    
-    return {"message": "File uploaded successfully", "file_key": file_key}
+    _require_local_storage()
+    resolve_upload_path(file_key)
+    blob = await store_blob(
+        request.stream(),
+        _extension(file_key),
+        max_bytes=settings.upload_max_file_bytes,
+        register=register_blob,
+        content_length=request.headers.get("content-length"),
+        expected_sha256=blob_digest(file_key)
+    )
+    return await _finish_upload(blob)
+
+
+# ============================================
+# File Upload (Resumable, chunked)
+# ============================================
+
+def _session_response(session: dict) -> dict:
+    return {
+        **session,
+        "received": session.get("received", []),
+        "expires_at": datetime.fromtimestamp(session["expires_at"], timezone.utc)
+    }
+
+
+@router.post("/uploads/sessions", response_model=UploadSessionResponse)
+async def create_upload_session(
+    request: UploadSessionCreate,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    이어 올리기 업로드 세션 생성
+    
+    1. POST /uploads/sessions → session_id, chunk_size, chunk_count
+    2. PUT /uploads/sessions/{id}/chunks/{n} (n = 0 .. chunk_count-1, 순서 무관, 병렬 가능)
+    3. 끊기면 GET /uploads/sessions/{id} 의 received 를 보고 빠진 청크만 다시 전송
+    4. POST /uploads/sessions/{id}/complete → file_key / file_url 로 제출
+    (로컬 저장소 전용, 로그인 필요; 세션은 만든 사용자만 사용,
+    사용자당 진행 중 세션은 UPLOAD_MAX_OPEN_SESSIONS 개까지, 넘으면 429)
+    """
+    _require_local_storage()
+    if request.file_size > settings.upload_max_file_bytes:
+        raise too_large(settings.upload_max_file_bytes)
+    
+    session = await create_session(
+        str(current_user.user_id),
+        _extension(request.file_name),
+        request.file_size,
+        chunk_size=settings.upload_chunk_bytes,
+        ttl_seconds=settings.upload_session_ttl_seconds,
+        max_open=settings.upload_max_open_sessions
+    )
+    return _session_response(session)
+
+
+@router.get("/uploads/sessions/{session_id}", response_model=UploadSessionResponse)
+async def get_upload_session(session_id: str, current_user: TokenData = Depends(get_current_user)):
+    """업로드 세션 상태 (받은 청크 번호)"""
+    return _session_response(await get_session(session_id, str(current_user.user_id)))
+
+
+@router.put("/uploads/sessions/{session_id}/chunks/{index}")
+async def upload_chunk(
+    session_id: str,
+    index: int,
+    request: Request,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """청크 하나 업로드 (재전송 시 덮어씀, 마지막 청크 외에는 chunk_size 바이트)"""
+    _require_local_storage()
+    return await write_chunk(session_id, str(current_user.user_id), index, request.stream())
+
+
+@router.post("/uploads/sessions/{session_id}/complete")
+async def complete_upload_session(session_id: str, current_user: TokenData = Depends(get_current_user)):
+    """모든 청크를 받았으면 파일 확정 (복사 없이 이름 변경); 빠진 청크가 있으면 409"""
+    _require_local_storage()
+    return await _finish_upload(
+        await complete_session(session_id, str(current_user.user_id), register=register_blob)
+    )
@@ -2,8 +2,11 @@
 공지사항 API
 """
 from fastapi import APIRouter, Depends, HTTPException
-from app.auth.utils import get_current_user
+from app.auth.utils import get_current_user, require_admin
 from app.database import get_supabase_admin
+from app.models.schemas import TokenData
+from app.fields import FieldSet
+from app.pagination import Keyset, PageParams, page_params
 from pydantic import BaseModel
 from typing import Optional
 
@@ -15,22 +18,29 @@ class NoticeCreate(BaseModel):
     is_important: bool = False
     target_classes: Optional[list] = None
 
+# ?fields= 로 선택 가능한 필드
+NOTICE_FIELDS = FieldSet(
+    ["id", "academy_id", "title", "content", "is_important",
+     "target_classes", "created_by", "created_at"]
+)
+NOTICE_KEYSET = Keyset("created_at")
+
 @router.get("/")
-async def list_notices(current_user: dict = Depends(get_current_user)):
-    """공지사항 목록 조회"""
+async def list_notices(
+    fields: Optional[str] = None,
+    page: PageParams = Depends(page_params),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """공지사항 목록 조회 (최신순, cursor/limit 을 주면 페이지 단위)"""
+    projection = NOTICE_FIELDS.parse(fields, require=NOTICE_KEYSET.required_columns)
     supabase = get_supabase_admin()
     
-    if current_user["role"] == "admin":
-        academy_id = current_user.get("academy_id")
-        response = supabase.table("notices")\
-            .select("*")\
-            .eq("academy_id", academy_id)\
-            .order("created_at", desc=True)\
-            .execute()
+    if current_user.role in ("admin", "teacher"):
+        academy_id = str(current_user.academy_id)
     else:
         # 학생은 자신의 학원 공지만 볼 수 있음
-        student_id = current_user["sub"]
-        student_response = supabase.table("students")\
+        student_id = str(current_user.user_id)
+        student_response = await supabase.table("students")\
             .select("academy_id")\
             .eq("id", student_id)\
             .execute()
@@ -39,25 +49,24 @@ async def list_notices(current_user: dict = Depends(get_current_user)):
             raise HTTPException(status_code=404, detail="학생 정보를 찾을 수 없습니다.")
         
         academy_id = student_response.data[0]["academy_id"]
-        response = supabase.table("notices")\
-            .select("*")\
-            .eq("academy_id", academy_id)\
-            .order("created_at", desc=True)\
-            .execute()
     
-    return response.data
+    query = supabase.table("notices")\
+        .select(projection.select)\
+        .eq("academy_id", academy_id)
+    
+    response = await NOTICE_KEYSET.apply(query, page).execute()
+    items, next_cursor = NOTICE_KEYSET.paginate(response.data, page)
+    
+    return projection.render_page(items, next_cursor, page)
 
 @router.post("/")
 async def create_notice(
     notice: NoticeCreate,
-    current_user: dict = Depends(get_current_user)
+    current_user: TokenData = Depends(require_admin)
 ):
     """공지사항 생성"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="권한이 없습니다.")
-    
     supabase = get_supabase_admin()
-    academy_id = current_user.get("academy_id")
+    academy_id = str(current_user.academy_id)
     
     data = {
         "academy_id": academy_id,
@@ -65,22 +74,19 @@ async def create_notice(
         "content": notice.content,
         "is_important": notice.is_important,
         "target_classes": notice.target_classes,
-        "created_by": current_user["sub"]
+        "created_by": str(current_user.user_id)
     }
     
-    response = supabase.table("notices").insert(data).execute()
+    response = await supabase.table("notices").insert(data).execute()
     
     return response.data[0]
 
 @router.delete("/{notice_id}")
-async def delete_notice(notice_id: str, current_user: dict = Depends(get_current_user)):
+async def delete_notice(notice_id: str, current_user: TokenData = Depends(require_admin)):
     """공지사항 삭제"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="권한이 없습니다.")
-    
     supabase = get_supabase_admin()
     
-    response = supabase.table("notices")\
+    response = await supabase.table("notices")\
         .delete()\
         .eq("id", notice_id)\
         .execute()
@@ -1,88 +1,134 @@
 """
 Student Management API
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from typing import List, Optional, Union
 from uuid import uuid4
+import asyncio
+import logging
 from datetime import datetime, timedelta
 import secrets
 from app.models.schemas import (
-    StudentCreate, StudentUpdate, StudentResponse, StudentInviteResponse, TokenData
+    StudentCreate, StudentUpdate, StudentResponse, StudentInviteResponse, TokenData, Page
 )
 from app.auth.utils import require_admin, get_current_user
-from app.database import supabase_admin
+from app.database import get_supabase_admin
+from app.cache import get_academy_name
+from app.dashboard_summary import activity, apply_delta
+from app.membership import invalidate_membership
+from app.fields import FieldSet
+from app.pagination import Keyset, PageParams, page_params
+from app.imports import iter_rows, take
 from app.config import get_settings
 
 settings = get_settings()
 router = APIRouter(prefix="/students", tags=["Students"])
+logger = logging.getLogger(__name__)
+
+# Fields selectable with ?fields= (e.g. ?fields=name,status)
+STUDENT_FIELDS = FieldSet.from_model(StudentResponse)
+STUDENT_KEYSET = Keyset("created_at")
+
+# Import file column titles -> StudentCreate fields
+STUDENT_IMPORT_COLUMNS = {
+    "이름": "name",
+    "학번": "student_number",
+    "전화번호": "phone",
+    "연락처": "phone",
+    "이메일": "email",
+    "학년": "grade",
+    "학부모 연락처": "parent_phone",
+    "학부모 전화번호": "parent_phone",
+    "학부모 이름": "parent_name",
+    "메모": "memo",
+}
+
+
+async def _non_critical(name: str, coro, default, failed: List[str]):
+    """Await a non-critical query with its own timeout; on failure record it and use default"""
+    try:
+        return await asyncio.wait_for(coro, settings.profile_query_timeout_seconds)
+    except Exception as e:
+        logger.warning("profile query %s failed: %r", name, e)
+        failed.append(name)
+        return default
 
 
 @router.get("/me")
 async def get_my_profile(
     current_user: TokenData = Depends(get_current_user)
 ):
-    """Get current student's profile (for students)"""
-    from datetime import datetime, timedelta
-    
+    """Get current student's profile (for students)
+
+    The student row is required; academy name, stats and notices are
+    fetched concurrently and fall back to defaults (``degraded: true``)
+    when they fail or time out.
+    """
     if current_user.role != "student":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="학생만 접근할 수 있습니다"
         )
     
-    # Get student info
-    student_response = supabase_admin.table("students")\
-        .select("id, name, student_number, phone, email, grade, status, created_at")\
-        .eq("id", current_user.user_id)\
-        .eq("academy_id", current_user.academy_id)\
-        .execute()
+    supabase = get_supabase_admin()
+    
+    async def fetch_student():
+        response = await supabase.table("students")\
+            .select("id, name, student_number, phone, email, grade, status, created_at")\
+            .eq("id", current_user.user_id)\
+            .eq("academy_id", current_user.academy_id)\
+            .execute()
+        return response.data[0] if response.data else None
+    
+    # Attendance stats (this month)
+    async def fetch_attendance_count():
+        first_day = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        response = await supabase.table("attendance")\
+            .select("id", count="exact")\
+            .eq("student_id", current_user.user_id)\
+            .eq("status", "present")\
+            .gte("date", first_day.date().isoformat())\
+            .execute()
+        return response.count or 0
+    
+    # Pending homework count
+    async def fetch_pending_homework():
+        response = await supabase.table("homework_submissions")\
+            .select("id", count="exact")\
+            .eq("student_id", current_user.user_id)\
+            .eq("status", "pending")\
+            .execute()
+        return response.count or 0
+    
+    # Recent notices
+    async def fetch_recent_notices():
+        response = await supabase.table("notices")\
+            .select("id, title, is_important, created_at")\
+            .eq("academy_id", current_user.academy_id)\
+            .order("created_at", desc=True)\
+            .limit(5)\
+            .execute()
+        return response.data or []
+    
+    failed: List[str] = []
+    student, academy_name, attendance_count, pending_homework, notices = await asyncio.gather(
+        fetch_student(),
+        _non_critical("academy", get_academy_name(current_user.academy_id), None, failed),
+        _non_critical("attendance", fetch_attendance_count(), 0, failed),
+        _non_critical("homework", fetch_pending_homework(), 0, failed),
+        _non_critical("notices", fetch_recent_notices(), [], failed),
+    )
     
-    if not student_response.data:
+    if not student:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="학생 정보를 찾을 수 없습니다"
         )
     
-    student = student_response.data[0]
-    
-    # Get academy info
-    academy_response = supabase_admin.table("academies")\
-        .select("name")\
-        .eq("id", current_user.academy_id)\
-        .execute()
-    
-    academy_name = academy_response.data[0]["name"] if academy_response.data else "알 수 없는 학원"
-    
-    # Get attendance stats (this month)
-    first_day = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    attendance_response = supabase_admin.table("attendance")\
-        .select("id", count="exact")\
-        .eq("student_id", current_user.user_id)\
-        .eq("status", "present")\
-        .gte("date", first_day.date().isoformat())\
-        .execute()
-    
-    attendance_count = attendance_response.count or 0
-    
-    # Get pending homework count
-    homework_response = supabase_admin.table("homework_submissions")\
-        .select("id", count="exact")\
-        .eq("student_id", current_user.user_id)\
-        .eq("status", "pending")\
-        .execute()
-    
-    pending_homework = homework_response.count or 0
-    
-    # Get recent notices
-    notices_response = supabase_admin.table("notices")\
-        .select("id, title, is_important, created_at")\
-        .eq("academy_id", current_user.academy_id)\
-        .order("created_at", desc=True)\
-        .limit(5)\
-        .execute()
-    
     recent_notices = []
-    for notice in (notices_response.data or []):
+    for notice in notices:
         created_at = datetime.fromisoformat(notice["created_at"].replace('Z', '+00:00'))
         days_ago = (datetime.utcnow().replace(tzinfo=created_at.tzinfo) - created_at).days
         date_str = f"{days_ago}일 전" if days_ago > 0 else "오늘"
@@ -96,40 +142,42 @@ async def get_my_profile(
     
     return {
         "name": student["name"],
-        "academy_name": academy_name,
+        "academy_name": academy_name or "알 수 없는 학원",
         "student_number": student.get("student_number"),
         "grade": student.get("grade"),
         "stats": {
             "attendance": attendance_count,
             "pendingHomework": pending_homework
         },
-        "recent_notices": recent_notices
+        "recent_notices": recent_notices,
+        "degraded": bool(failed),
+        "degraded_parts": failed
     }
 
 
+def _new_student_row(student: StudentCreate, academy_id, exclude_unset: bool = True) -> dict:
+    """Student record with a fresh invite token (valid 7 days)"""
+    student_data = student.dict(exclude_unset=exclude_unset)
+    student_data.update({
+        "academy_id": str(academy_id),
+        "invite_token": secrets.token_urlsafe(32),
+        "invite_expires_at": (datetime.utcnow() + timedelta(days=7)).isoformat(),
+        "is_linked": False,
+        "status": "active"
+    })
+    return student_data
+
+
 @router.post("/", response_model=StudentResponse)
 async def create_student(
     student: StudentCreate,
     current_user: TokenData = Depends(require_admin)
 ):
     """Create a new student and generate invite link"""
+    supabase = get_supabase_admin()
     
-    # Generate invite token
-    invite_token = secrets.token_urlsafe(32)
-    invite_expires_at = datetime.utcnow() + timedelta(days=7)
-    
-    # Create student record
-    student_data = student.dict(exclude_unset=True)
-    student_data.update({
-        "academy_id": str(current_user.academy_id),
-        "invite_token": invite_token,
-        "invite_expires_at": invite_expires_at.isoformat(),
-        "is_linked": False,
-        "status": "active"
-    })
-    
-    response = supabase_admin.table("students")\
-        .insert(student_data)\
+    response = await supabase.table("students")\
+        .insert(_new_student_row(student, current_user.academy_id))\
         .execute()
     
     if not response.data:
@@ -138,37 +186,125 @@ async def create_student(
             detail="학생 생성에 실패했습니다"
         )
     
-    return response.data[0]
+    created = response.data[0]
+    await apply_delta(
+        current_user.academy_id,
+        students=1,
+        activities=[activity("student", created["id"], created.get("created_at"))]
+    )
+    
+    return created
 
 
-@router.get("/", response_model=List[StudentResponse])
+@router.post("/import")
+async def import_students(
+    file: UploadFile = File(..., description="CSV 또는 XLSX (첫 행은 헤더)"),
+    batch_size: Optional[int] = Query(None, ge=1, le=5000),
+    current_user: TokenData = Depends(require_admin)
+):
+    """
+    Bulk-create students from an uploaded CSV/XLSX file
+    
+    Rows are read one batch at a time (parsing runs off the event loop),
+    validated against StudentCreate and inserted one batch per query.
+    Invalid rows are skipped and reported with their row number.
+    """
+    supabase = get_supabase_admin()
+    batch_size = batch_size or settings.student_import_batch_size
+    rows = iter_rows(file, STUDENT_IMPORT_COLUMNS)
+    
+    total = 0
+    created = []
+    errors = []
+    truncated = False
+    
+    while not truncated:
+        batch = await run_in_threadpool(take, rows, batch_size)
+        if not batch:
+            break
+        
+        # Rows beyond STUDENT_IMPORT_MAX_ROWS are not read
+        if total + len(batch) > settings.student_import_max_rows:
+            batch = batch[:settings.student_import_max_rows - total]
+            truncated = True
+        total += len(batch)
+        
+        valid = []
+        for row_number, values in batch:
+            try:
+                student = StudentCreate(**{k: v for k, v in values.items() if v is not None})
+            except ValidationError as e:
+                errors.append({
+                    "row": row_number,
+                    "errors": [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()]
+                })
+                continue
+            # exclude_unset=False: every row of one insert needs the same columns
+            valid.append((row_number, _new_student_row(student, current_user.academy_id, exclude_unset=False)))
+        
+        if not valid:
+            continue
+        
+        try:
+            response = await supabase.table("students")\
+                .insert([data for _, data in valid])\
+                .execute()
+            created.extend(response.data or [])
+        except Exception as e:
+            errors.extend({"row": row_number, "errors": [f"저장 실패: {e}"]} for row_number, _ in valid)
+    
+    if created:
+        await apply_delta(
+            current_user.academy_id,
+            students=len(created),
+            activities=[activity("student", s["id"], s.get("created_at")) for s in created[-10:]]
+        )
+    
+    return {
+        "total": total,
+        "created": len(created),
+        "failed": len(errors),
+        "errors": errors,
+        "truncated": truncated
+    }
+
+
+@router.get("/", response_model=Union[Page[StudentResponse], List[StudentResponse]])
 async def list_students(
     status: str = None,
+    fields: Optional[str] = None,
+    page: PageParams = Depends(page_params),
     current_user: TokenData = Depends(require_admin)
 ):
-    """List all students in academy"""
+    """List students in academy (newest first; ?cursor= / ?limit= pages; otherwise one PAGE_SIZE_MAX bare-list page + X-Next-Cursor)"""
+    projection = STUDENT_FIELDS.parse(fields, require=STUDENT_KEYSET.required_columns)
+    supabase = get_supabase_admin()
     
-    query = supabase_admin.table("students")\
-        .select("*")\
+    query = supabase.table("students")\
+        .select(projection.select)\
         .eq("academy_id", current_user.academy_id)
     
     if status:
         query = query.eq("status", status)
     
-    response = query.order("created_at", desc=True).execute()
+    response = await STUDENT_KEYSET.apply(query, page).execute()
+    items, next_cursor = STUDENT_KEYSET.paginate(response.data, page)
     
-    return response.data
+    return projection.render_page(items, next_cursor, page)
 
 
 @router.get("/{student_id}", response_model=StudentResponse)
 async def get_student(
     student_id: str,
+    fields: Optional[str] = None,
     current_user: TokenData = Depends(require_admin)
 ):
     """Get student details"""
+    projection = STUDENT_FIELDS.parse(fields)
+    supabase = get_supabase_admin()
     
-    response = supabase_admin.table("students")\
-        .select("*")\
+    response = await supabase.table("students")\
+        .select(projection.select)\
         .eq("id", student_id)\
         .eq("academy_id", current_user.academy_id)\
         .execute()
@@ -179,7 +315,7 @@ async def get_student(
             detail="학생을 찾을 수 없습니다"
         )
     
-    return response.data[0]
+    return projection.render(response.data[0])
 
 
 @router.patch("/{student_id}", response_model=StudentResponse)
@@ -189,10 +325,11 @@ async def update_student(
     current_user: TokenData = Depends(require_admin)
 ):
     """Update student information"""
+    supabase = get_supabase_admin()
     
-    # Verify student belongs to academy
-    check_response = supabase_admin.table("students")\
-        .select("id")\
+    # Verify student belongs to academy (status: dashboard student count)
+    check_response = await supabase.table("students")\
+        .select("id, status")\
         .eq("id", student_id)\
         .eq("academy_id", current_user.academy_id)\
         .execute()
@@ -205,11 +342,21 @@ async def update_student(
     
     # Update student
     update_data = student_update.dict(exclude_unset=True)
-    response = supabase_admin.table("students")\
+    response = await supabase.table("students")\
         .update(update_data)\
         .eq("id", student_id)\
         .execute()
     
+    # Only active students are counted on the dashboard
+    was_active = check_response.data[0].get("status") == "active"
+    is_active = response.data[0].get("status") == "active"
+    if was_active != is_active:
+        await apply_delta(current_user.academy_id, students=1 if is_active else -1)
+    
+    # The membership index carries student names
+    if "name" in update_data:
+        invalidate_membership(current_user.academy_id)
+    
     return response.data[0]
 
 
@@ -219,8 +366,21 @@ async def delete_student(
     current_user: TokenData = Depends(require_admin)
 ):
     """Delete student (soft delete by setting status to inactive)"""
+    supabase = get_supabase_admin()
+    
+    # Only an active -> inactive transition changes the dashboard's student count
+    response = await supabase.table("students")\
+        .update({"status": "inactive"})\
+        .eq("id", student_id)\
+        .eq("academy_id", current_user.academy_id)\
+        .eq("status", "active")\
+        .execute()
+    
+    if response.data:
+        await apply_delta(current_user.academy_id, students=-1)
+        return {"message": "학생이 비활성화되었습니다"}
     
-    response = supabase_admin.table("students")\
+    response = await supabase.table("students")\
         .update({"status": "inactive"})\
         .eq("id", student_id)\
         .eq("academy_id", current_user.academy_id)\
@@ -241,9 +401,10 @@ async def generate_student_invite(
     current_user: TokenData = Depends(require_admin)
 ):
     """Generate invite link and QR code for student (NEW STRUCTURE)"""
+    supabase = get_supabase_admin()
     
     # Get student info
-    student_response = supabase_admin.table("students")\
+    student_response = await supabase.table("students")\
         .select("id, name, academy_id")\
         .eq("id", student_id)\
         .eq("academy_id", current_user.academy_id)\
@@ -258,7 +419,7 @@ async def generate_student_invite(
     student = student_response.data[0]
     
     # Delete existing invite for this student (if any)
-    supabase_admin.table("student_invites")\
+    await supabase.table("student_invites")\
         .delete()\
         .eq("student_id", student_id)\
         .execute()
@@ -268,7 +429,7 @@ async def generate_student_invite(
     invite_expires_at = datetime.utcnow() + timedelta(days=7)
     
     # Insert into student_invites table
-    invite_response = supabase_admin.table("student_invites")\
+    invite_response = await supabase.table("student_invites")\
         .insert({
             "student_id": student_id,
             "token": invite_token,
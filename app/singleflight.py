@@ -0,0 +1,70 @@
+"""
+Single-flight coalescing of identical concurrent backend reads
+
+Wraps the backend httpx transport. While a read (GET/HEAD) is in flight,
+identical reads — same table, filters, projection, ordering and Prefer/Accept
+headers, i.e. the same URL and headers — wait for that one round trip and
+receive a copy of its response instead of issuing their own.
+
+No result is reused after its round trip finishes, so nothing is served
+staler than a read that was already running. Any write that passes through
+the transport starts a new generation, so a read issued after a write never
+joins a flight that began before it.
+"""
+import asyncio
+from typing import Dict, Tuple
+
+import httpx
+
+# Request headers that change the response of a PostgREST read
+KEY_HEADERS = ("accept", "accept-profile", "prefer", "range", "authorization")
+
+READ_METHODS = {"GET", "HEAD"}
+
+
+class SingleFlightTransport(httpx.AsyncBaseTransport):
+    """Shares one in-flight backend call among identical concurrent reads"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+        self._in_flight: Dict[Tuple, asyncio.Future] = {}
+        self._generation = 0
+        self.coalesced = 0
+
+    def _key(self, request: httpx.Request) -> Tuple:
+        headers = tuple(request.headers.get(h, "") for h in KEY_HEADERS)
+        return (self._generation, request.method, str(request.url), headers)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method not in READ_METHODS:
+            self._generation += 1
+            try:
+                return await self._transport.handle_async_request(request)
+            finally:
+                self._generation += 1
+
+        key = self._key(request)
+        flight = self._in_flight.get(key)
+
+        if flight is None:
+            # Shielded so a cancelled leader does not fail the followers
+            flight = asyncio.ensure_future(self._fetch(request))
+            self._in_flight[key] = flight
+            flight.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+
+        status_code, headers, content = await asyncio.shield(flight)
+        return httpx.Response(status_code, headers=headers, content=content, request=request)
+
+    async def _fetch(self, request: httpx.Request):
+        response = await self._transport.handle_async_request(request)
+        try:
+            # Raw bytes keep Content-Encoding/Content-Length consistent for every copy
+            content = b"".join([chunk async for chunk in response.stream])
+        finally:
+            await response.aclose()
+        return response.status_code, response.headers.multi_items(), content
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
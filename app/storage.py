@@ -0,0 +1,213 @@
+"""
+Object storage backends for uploaded files
+
+``STORAGE_BACKEND`` selects where blobs (see app.uploads) live:
+
+- local: ``static/uploads`` on this host. Bytes are proxied through the app
+  (streamed / resumable upload endpoints) and served from ``/uploads``.
+- s3: any S3-compatible store (AWS S3, Cloudflare R2, MinIO). The browser
+  uploads directly with a presigned PUT and downloads through short-lived
+  presigned GET URLs, so file traffic never passes through the app
+  workers. Uses ``boto3`` (listed in requirements.txt).
+
+Presigned PUTs sign Content-Length, Content-Type and the SHA-256 checksum.
+The store therefore rejects uploads of a different size or content than
+declared, which keeps the content-addressed keys honest.
+
+Backend methods are blocking; call them with ``run_in_threadpool``.
+"""
+import base64
+import os
+import shutil
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from app.config import get_settings
+from app.uploads import resolve_upload_path
+
+try:
+    import boto3
+    from botocore.config import Config as BotoConfig
+    from botocore.exceptions import ClientError
+except ImportError:  # only needed for STORAGE_BACKEND=s3
+    boto3 = None
+
+
+class LocalStorage:
+    """Files under static/uploads, uploaded through the app"""
+
+    name = "local"
+
+    def upload_target(self, file_key: str, content_type: str, file_size: int,
+                      sha256: Optional[str] = None) -> dict:
+        return {
+            "upload_url": f"/api/homeworks/uploads/file/{file_key}",
+            "method": "POST",
+            "headers": {},
+            # Chunked upload sessions are available for this backend
+            "resumable": True,
+        }
+
+    def public_url(self, file_key: str) -> str:
+        """URL stored with the file row"""
+        return f"/uploads/{file_key}"
+
+    def download_url(self, file_key: str) -> str:
+        return self.public_url(file_key)
+
+    def exists(self, file_key: str) -> bool:
+        return resolve_upload_path(file_key).exists()
+
+    def size(self, file_key: str) -> Optional[int]:
+        """Stored size in bytes; None when the object does not exist"""
+        try:
+            return resolve_upload_path(file_key).stat().st_size
+        except FileNotFoundError:
+            return None
+
+    def fetch(self, file_key: str, path: str) -> str:
+        """Local path with the object's bytes (here: the file itself, ``path`` is unused)"""
+        return str(resolve_upload_path(file_key))
+
+    def store(self, path: str, file_key: str, content_type: str):
+        destination = resolve_upload_path(file_key)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(path, destination)
+
+    def move(self, file_key: str, new_key: str) -> bool:
+        """Atomic rename; False when ``file_key`` does not exist"""
+        destination = resolve_upload_path(new_key)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(resolve_upload_path(file_key), destination)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def delete(self, file_keys: Iterable[str]) -> int:
+        removed = 0
+        for file_key in file_keys:
+            try:
+                os.unlink(resolve_upload_path(file_key))
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+
+class S3Storage:
+    """S3-compatible bucket with presigned direct uploads/downloads"""
+
+    name = "s3"
+
+    def __init__(self, settings):
+        if boto3 is None:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires the boto3 package (pip install boto3)")
+        if not settings.s3_bucket:
+            raise ValueError("STORAGE_BACKEND=s3 requires S3_BUCKET")
+
+        self.bucket = settings.s3_bucket
+        self.url_ttl = settings.storage_url_ttl_seconds
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.s3_endpoint_url or None,
+            region_name=settings.s3_region,
+            aws_access_key_id=settings.s3_access_key_id or None,
+            aws_secret_access_key=settings.s3_secret_access_key or None,
+            # Path-style addressing works with MinIO and custom endpoints
+            config=BotoConfig(signature_version="s3v4", s3={"addressing_style": "path"}),
+        )
+
+    def upload_target(self, file_key: str, content_type: str, file_size: int,
+                      sha256: Optional[str] = None) -> dict:
+        params = {
+            "Bucket": self.bucket,
+            "Key": file_key,
+            "ContentType": content_type,
+            "ContentLength": file_size,
+        }
+        headers = {"Content-Type": content_type}
+        if sha256:
+            checksum = base64.b64encode(bytes.fromhex(sha256)).decode()
+            params["ChecksumSHA256"] = checksum
+            headers["x-amz-checksum-sha256"] = checksum
+
+        url = self.client.generate_presigned_url(
+            "put_object", Params=params, ExpiresIn=int(self.url_ttl), HttpMethod="PUT"
+        )
+        return {"upload_url": url, "method": "PUT", "headers": headers, "resumable": False}
+
+    def public_url(self, file_key: str) -> str:
+        """Stable app URL that redirects to a fresh presigned GET (see homework.download_file)"""
+        return f"/api/homeworks/files/{file_key}"
+
+    def download_url(self, file_key: str) -> str:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": file_key},
+            ExpiresIn=int(self.url_ttl),
+        )
+
+    def exists(self, file_key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=file_key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def size(self, file_key: str) -> Optional[int]:
+        """Stored size in bytes (HEAD ContentLength); None when the object does not exist"""
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=file_key)["ContentLength"]
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def fetch(self, file_key: str, path: str) -> str:
+        self.client.download_file(self.bucket, file_key, path)
+        return path
+
+    def store(self, path: str, file_key: str, content_type: str):
+        self.client.upload_file(path, self.bucket, file_key, ExtraArgs={"ContentType": content_type})
+        os.unlink(path)
+
+    def move(self, file_key: str, new_key: str) -> bool:
+        """Copy then delete (the old key disappears last); False when ``file_key`` does not exist"""
+        try:
+            self.client.copy_object(
+                Bucket=self.bucket, Key=new_key,
+                CopySource={"Bucket": self.bucket, "Key": file_key},
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        self.client.delete_object(Bucket=self.bucket, Key=file_key)
+        return True
+
+    def delete(self, file_keys: Iterable[str]) -> int:
+        file_keys = list(file_keys)
+        removed = 0
+        # delete_objects takes at most 1000 keys
+        for start in range(0, len(file_keys), 1000):
+            batch = file_keys[start:start + 1000]
+            response = self.client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+            removed += len(batch) - len(response.get("Errors", []))
+        return removed
+
+
+@lru_cache()
+def get_storage():
+    """The configured backend (one instance per process)"""
+    settings = get_settings()
+    if settings.storage_backend == "local":
+        return LocalStorage()
+    if settings.storage_backend == "s3":
+        return S3Storage(settings)
+    raise ValueError(f"Unknown STORAGE_BACKEND: {settings.storage_backend}")
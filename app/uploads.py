@@ -0,0 +1,377 @@
+"""
+Streaming, content-addressed writes of uploaded files to local storage
+(static/uploads)
+
+The request body is consumed chunk by chunk and never held in memory as a
+whole: chunks are buffered up to ``WRITE_BUFFER_BYTES`` and written (and
+hashed) from the thread pool, so the event loop never blocks on disk I/O.
+The size cap is enforced while streaming (and up front from
+Content-Length).
+
+Finished files are stored under their SHA-256, ``blobs/ab/<sha256><ext>``:
+identical uploads (a resubmitted photo, the same worksheet scan from many
+students) share one file, and the temp file of a duplicate is simply
+dropped. Placement is an atomic rename, so readers never see a partial
+file and a failed or aborted upload leaves nothing behind. References
+and garbage collection are tracked in the database (app.blobstore): the
+``register`` callback records the blob *before* it is placed, which is
+what lets the sweeper detect an upload racing its delete.
+
+Resumable uploads (upload sessions) write each numbered chunk straight to
+its offset in one ``data.part`` file, so chunks can arrive in any order or
+in parallel and completing the session is one hashing read plus a rename,
+not a copy. The file starts empty and grows as chunks are written, so a
+session only takes the disk space of the bytes actually received. Sessions
+belong to the user who opened them, and one user may hold at most
+``max_open`` unfinished sessions. A chunk counts as received once its
+marker file exists; session state lives under ``UPLOAD_ROOT/.sessions`` so
+every worker on the host sees it.
+"""
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, BinaryIO, Callable, List, Optional
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+
+# Served at /uploads (see app.main)
+UPLOAD_ROOT = Path("static/uploads")
+
+# Content-addressed files live under this key prefix
+BLOB_PREFIX = "blobs"
+
+# Bytes collected from the request before one threaded write
+WRITE_BUFFER_BYTES = 1024 * 1024
+
+# Called with {file_key, sha256, file_size} before a blob is placed
+Register = Callable[[dict], Awaitable]
+
+
+def resolve_upload_path(file_key: str) -> Path:
+    """Local path of ``file_key``; keys escaping UPLOAD_ROOT are rejected"""
+    root = UPLOAD_ROOT.resolve()
+    path = (root / file_key).resolve()
+    if root not in path.parents:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="잘못된 파일 경로입니다"
+        )
+    return path
+
+
+def too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"파일이 너무 큽니다 (최대 {max_bytes // (1024 * 1024)}MB)"
+    )
+
+
+def blob_digest(file_key: str) -> Optional[str]:
+    """SHA-256 encoded in a blob key, None for other keys"""
+    match = re.fullmatch(BLOB_PREFIX + r"/[0-9a-f]{2}/([0-9a-f]{64})(\.[a-z0-9]{1,10})?", file_key)
+    return match.group(1) if match else None
+
+
+def blob_key(digest: str, extension: str) -> str:
+    """``blobs/ab/ab12...ef.jpg`` for a SHA-256 hex digest"""
+    extension = extension.lower()
+    if not re.fullmatch(r"\.[a-z0-9]{1,10}", extension):
+        extension = ""
+    elif extension == ".jpeg":
+        extension = ".jpg"
+    return f"{BLOB_PREFIX}/{digest[:2]}/{digest}{extension}"
+
+
+def _open_temp(directory: Path) -> BinaryIO:
+    directory.mkdir(parents=True, exist_ok=True)
+    # Under UPLOAD_ROOT so the final rename stays on one filesystem
+    return tempfile.NamedTemporaryFile(dir=directory, prefix=".upload-", suffix=".part", delete=False)
+
+
+def _write(file: BinaryIO, chunks: List[bytes], hasher):
+    for chunk in chunks:
+        file.write(chunk)
+        hasher.update(chunk)
+
+
+def _place_blob(temp_path: str, digest: str, extension: str) -> str:
+    """Rename a finished temp file to its content address; an existing copy wins"""
+    file_key = blob_key(digest, extension)
+    destination = resolve_upload_path(file_key)
+    if destination.exists():
+        os.unlink(temp_path)
+    else:
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(temp_path, destination)
+    return file_key
+
+
+def _seal(file: BinaryIO, hasher, expected_sha256: Optional[str]):
+    file.flush()
+    os.fsync(file.fileno())
+    file.close()
+    if expected_sha256 and hasher.hexdigest() != expected_sha256:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="업로드한 파일 내용이 요청한 해시와 다릅니다"
+        )
+
+
+def _discard(file: BinaryIO):
+    file.close()
+    try:
+        os.unlink(file.name)
+    except FileNotFoundError:
+        pass
+
+
+async def store_blob(
+    chunks: AsyncIterator[bytes],
+    extension: str,
+    max_bytes: int,
+    register: Register,
+    content_length: Optional[str] = None,
+    expected_sha256: Optional[str] = None,
+) -> dict:
+    """
+    Stream ``chunks`` into the content-addressed store; returns file_key, sha256, file_size
+    (400 and nothing stored when ``expected_sha256`` is given and does not match)
+    """
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise too_large(max_bytes)
+
+    file = await run_in_threadpool(_open_temp, UPLOAD_ROOT / BLOB_PREFIX)
+    hasher = hashlib.sha256()
+    size = 0
+    buffer: List[bytes] = []
+    buffered = 0
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            size += len(chunk)
+            if size > max_bytes:
+                raise too_large(max_bytes)
+            buffer.append(chunk)
+            buffered += len(chunk)
+            if buffered >= WRITE_BUFFER_BYTES:
+                await run_in_threadpool(_write, file, buffer, hasher)
+                buffer, buffered = [], 0
+
+        if buffer:
+            await run_in_threadpool(_write, file, buffer, hasher)
+        await run_in_threadpool(_seal, file, hasher, expected_sha256)
+        blob = {"file_key": blob_key(hasher.hexdigest(), extension), "sha256": hasher.hexdigest(), "file_size": size}
+        await register(blob)
+        await run_in_threadpool(_place_blob, file.name, blob["sha256"], extension)
+    except BaseException:
+        await run_in_threadpool(_discard, file)
+        raise
+
+    return blob
+
+
+# ============================================
+# Resumable upload sessions
+# ============================================
+
+SESSION_ROOT = UPLOAD_ROOT / ".sessions"
+
+
+def _session_dir(session_id: str) -> Path:
+    return SESSION_ROOT / uuid.UUID(str(session_id)).hex
+
+
+def _create_session(
+    owner: str, extension: str, file_size: int, chunk_size: int, ttl_seconds: float, max_open: int
+) -> dict:
+    open_sessions = _purge_expired_sessions(owner)
+    if open_sessions >= max_open:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"진행 중인 업로드가 너무 많습니다 (최대 {max_open}개)"
+        )
+
+    session_id = uuid.uuid4().hex
+    directory = _session_dir(session_id)
+    (directory / "chunks").mkdir(parents=True)
+
+    # Empty file; chunks are written in place and extend it
+    (directory / "data.part").touch()
+
+    session = {
+        "session_id": session_id,
+        "owner": owner,
+        "extension": extension,
+        "file_size": file_size,
+        "chunk_size": chunk_size,
+        "chunk_count": max(math.ceil(file_size / chunk_size), 1),
+        "expires_at": time.time() + ttl_seconds,
+    }
+    (directory / "session.json").write_text(json.dumps(session))
+    return session
+
+
+def _load_session(session_id: str, owner: str) -> dict:
+    try:
+        directory = _session_dir(session_id)
+        session = json.loads((directory / "session.json").read_text())
+    except (ValueError, FileNotFoundError):
+        session = None
+    # Another user's session is reported as missing
+    if session is None or session["expires_at"] < time.time() or session.get("owner") != owner:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="업로드 세션을 찾을 수 없거나 만료되었습니다"
+        )
+    session["received"] = sorted(int(name) for name in os.listdir(directory / "chunks"))
+    return session
+
+
+def _purge_expired_sessions(owner: Optional[str] = None) -> int:
+    """Remove expired sessions; returns how many unexpired ones ``owner`` holds"""
+    if not SESSION_ROOT.exists():
+        return 0
+    now = time.time()
+    open_sessions = 0
+    for directory in SESSION_ROOT.iterdir():
+        session_owner = None
+        try:
+            session = json.loads((directory / "session.json").read_text())
+            expires_at, session_owner = session["expires_at"], session.get("owner")
+        except (ValueError, KeyError, OSError):
+            try:
+                expires_at = directory.stat().st_mtime
+            except OSError:
+                continue
+        if expires_at < now:
+            shutil.rmtree(directory, ignore_errors=True)
+        elif owner is not None and session_owner == owner:
+            open_sessions += 1
+    return open_sessions
+
+
+def _write_at(fd: int, offset: int, chunks: List[bytes]):
+    for chunk in chunks:
+        os.pwrite(fd, chunk, offset)
+        offset += len(chunk)
+
+
+async def create_session(
+    owner: str, extension: str, file_size: int, chunk_size: int, ttl_seconds: float, max_open: int
+) -> dict:
+    """New upload session of ``owner`` for a file of ``file_size`` bytes (429 past ``max_open``)"""
+    return await run_in_threadpool(
+        _create_session, owner, extension, file_size, chunk_size, ttl_seconds, max_open
+    )
+
+
+async def get_session(session_id: str, owner: str) -> dict:
+    """Session metadata plus ``received`` chunk indexes; 404 when unknown, expired or not ``owner``'s"""
+    return await run_in_threadpool(_load_session, session_id, owner)
+
+
+async def write_chunk(session_id: str, owner: str, index: int, chunks: AsyncIterator[bytes]) -> dict:
+    """
+    Stream chunk ``index`` to its offset in the session file
+
+    Every chunk but the last must be exactly ``chunk_size`` bytes. Re-sending
+    a chunk (retry) overwrites it with the same bytes.
+    """
+    session = await get_session(session_id, owner)
+    if not 0 <= index < session["chunk_count"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"청크 번호는 0 ~ {session['chunk_count'] - 1} 입니다"
+        )
+
+    offset = index * session["chunk_size"]
+    expected = min(session["chunk_size"], session["file_size"] - offset)
+    directory = _session_dir(session_id)
+
+    fd = await run_in_threadpool(os.open, str(directory / "data.part"), os.O_WRONLY)
+    size = 0
+    buffer: List[bytes] = []
+    buffered = 0
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            if size + buffered + len(chunk) > expected:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"청크 {index} 의 크기는 {expected} 바이트여야 합니다"
+                )
+            buffer.append(chunk)
+            buffered += len(chunk)
+            if buffered >= WRITE_BUFFER_BYTES:
+                await run_in_threadpool(_write_at, fd, offset + size, buffer)
+                size += buffered
+                buffer, buffered = [], 0
+
+        if buffer:
+            await run_in_threadpool(_write_at, fd, offset + size, buffer)
+            size += buffered
+        await run_in_threadpool(os.fsync, fd)
+    finally:
+        await run_in_threadpool(os.close, fd)
+
+    if size != expected:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"청크 {index} 의 크기는 {expected} 바이트여야 합니다"
+        )
+
+    # Marker only after the bytes are durable
+    await run_in_threadpool((directory / "chunks" / str(index)).touch)
+    return {"index": index, "size": size}
+
+
+def _assemble_session(session_id: str, owner: str) -> dict:
+    session = _load_session(session_id, owner)
+    missing = sorted(set(range(session["chunk_count"])) - set(session["received"]))
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "아직 받지 못한 청크가 있습니다", "missing": missing}
+        )
+
+    directory = _session_dir(session_id)
+    data = directory / "data.part"
+    hasher = hashlib.sha256()
+    with open(data, "rb") as f:
+        for block in iter(lambda: f.read(WRITE_BUFFER_BYTES), b""):
+            hasher.update(block)
+
+    return {
+        "file_key": blob_key(hasher.hexdigest(), session["extension"]),
+        "sha256": hasher.hexdigest(),
+        "file_size": session["file_size"],
+    }
+
+
+def _place_session(session_id: str, blob: dict, extension: str):
+    directory = _session_dir(session_id)
+    _place_blob(str(directory / "data.part"), blob["sha256"], extension)
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+async def complete_session(session_id: str, owner: str, register: Register) -> dict:
+    """Move the assembled file into the store (rename, no copy); 409 lists missing chunks"""
+    blob = await run_in_threadpool(_assemble_session, session_id, owner)
+    await register(blob)
+    await run_in_threadpool(_place_session, session_id, blob, os.path.splitext(blob["file_key"])[1])
+    return blob
+
+
+async def purge_expired_sessions():
+    """Remove upload sessions past their expiry (also done when sessions are created)"""
+    await run_in_threadpool(_purge_expired_sessions)
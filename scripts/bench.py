@@ -0,0 +1,172 @@
+"""
+인메모리 백엔드 벤치마크 스크립트
+
+Supabase 없이 전체 FastAPI 앱을 인메모리 PostgREST 백엔드(app.memory_backend)로
+실행하고, 주요 엔드포인트에 동시 요청을 보내 지연 시간을 측정합니다.
+
+사용 예:
+    python scripts/bench.py --latency-ms 20 --requests 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.chdir(project_root)
+
+ENDPOINTS = {
+    "admin": [
+        "/api/homeworks/",
+        "/api/students/",
+        "/api/dashboard/stats",
+    ],
+    "student": [
+        "/api/students/me",
+    ],
+}
+
+
+def configure_env(args):
+    """메모리 백엔드 설정 (설정 로딩 전에 호출)"""
+    os.environ["DB_BACKEND"] = "memory"
+    os.environ["DB_MEMORY_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["DB_MEMORY_JITTER_MS"] = str(args.jitter_ms)
+    os.environ.setdefault("SUPABASE_URL", "http://memory.local")
+    os.environ.setdefault("SUPABASE_KEY", "memory")
+    os.environ.setdefault("SUPABASE_SERVICE_KEY", "memory")
+    os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+    os.environ.setdefault("KAKAO_CLIENT_ID", "bench")
+
+
+def seed(db, students: int, classes: int, homeworks: int):
+    """학원 1개 분량의 합성 데이터 생성"""
+    academy_id = str(uuid.uuid4())
+    admin_id = str(uuid.uuid4())
+    now = datetime.now(timezone.utc)
+    today = now.date().isoformat()
+
+    db.seed({
+        "academies": [{"id": academy_id, "name": "벤치마크 학원"}],
+        "users": [{"id": admin_id, "academy_id": academy_id, "role": "admin",
+                   "email": "bench@test.com", "name": "관리자"}],
+    })
+
+    student_rows = db.insert("students", [
+        {"academy_id": academy_id, "name": f"학생{i}", "student_number": f"S{i:04d}",
+         "status": "active", "is_linked": True,
+         "created_at": (now - timedelta(minutes=i)).isoformat()}
+        for i in range(students)
+    ])
+    class_rows = db.insert("classes", [
+        {"academy_id": academy_id, "name": f"{i + 1}반"} for i in range(classes)
+    ])
+
+    members = []
+    for i, student in enumerate(student_rows):
+        class_row = class_rows[i % len(class_rows)]
+        members.append({"class_id": class_row["id"], "student_id": student["id"], "left_at": None})
+    db.insert("class_members", members)
+
+    student_names = {s["id"]: s["name"] for s in student_rows}
+    for i in range(homeworks):
+        class_row = class_rows[i % len(class_rows)]
+        homework = db.insert("homework", [{
+            "academy_id": academy_id, "title": f"숙제 {i}", "class_ids": [class_row["id"]],
+            "target_mode": "snapshot",
+            "due_date": (now + timedelta(days=i % 14)).date().isoformat(),
+            "created_at": (now - timedelta(hours=i)).isoformat(),
+        }])[0]
+        db.insert("homework_targets", [
+            {"homework_id": homework["id"], "student_id": m["student_id"],
+             "student_name": student_names[m["student_id"]],
+             "class_id": class_row["id"], "class_name": class_row["name"]}
+            for m in members if m["class_id"] == class_row["id"]
+        ])
+
+    db.insert("attendance", [
+        {"academy_id": academy_id, "student_id": s["id"], "date": today,
+         "status": "present", "check_in_time": now.isoformat()}
+        for s in student_rows[: students // 2]
+    ])
+    db.insert("notices", [
+        {"academy_id": academy_id, "title": f"공지 {i}", "content": "내용",
+         "is_important": i == 0, "created_at": (now - timedelta(days=i)).isoformat()}
+        for i in range(10)
+    ])
+
+    return academy_id, admin_id, student_rows[0]["id"]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(args):
+    import httpx
+    from app.main import app
+    from app.auth.utils import create_access_token
+    from app.memory_backend import get_memory_database
+
+    db = get_memory_database()
+    db.reset()
+    academy_id, admin_id, student_id = seed(db, args.students, args.classes, args.homeworks)
+
+    tokens = {
+        "admin": create_access_token({"sub": admin_id, "role": "admin", "academy_id": academy_id}),
+        "student": create_access_token({"sub": student_id, "role": "student", "academy_id": academy_id}),
+    }
+
+    print(f"latency={args.latency_ms}ms jitter={args.jitter_ms}ms "
+          f"requests={args.requests} concurrency={args.concurrency}")
+    print(f"{'endpoint':32} {'ok':>5} {'p50 ms':>8} {'p95 ms':>8} {'req/s':>8}")
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for role, paths in ENDPOINTS.items():
+                headers = {"Authorization": f"Bearer {tokens[role]}"}
+                for path in paths:
+                    semaphore = asyncio.Semaphore(args.concurrency)
+                    timings, ok = [], 0
+
+                    async def one():
+                        nonlocal ok
+                        async with semaphore:
+                            start = time.perf_counter()
+                            response = await client.get(path, headers=headers)
+                            timings.append((time.perf_counter() - start) * 1000)
+                            ok += response.status_code == 200
+
+                    started = time.perf_counter()
+                    await asyncio.gather(*(one() for _ in range(args.requests)))
+                    elapsed = time.perf_counter() - started
+
+                    print(f"{path:32} {ok:>5} {percentile(timings, 50):>8.1f} "
+                          f"{percentile(timings, 95):>8.1f} {args.requests / elapsed:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="인메모리 백엔드 벤치마크")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="백엔드 왕복 지연 (ms)")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="지연 편차 (ms)")
+    parser.add_argument("--requests", type=int, default=100, help="엔드포인트별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=10, help="동시 요청 수")
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--classes", type=int, default=10)
+    parser.add_argument("--homeworks", type=int, default=100)
+    args = parser.parse_args()
+
+    configure_env(args)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
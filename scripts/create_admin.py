@@ -9,16 +9,17 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from app.database import get_supabase_admin
+from app.database import init_supabase_admin, close_supabase_admin
 from app.auth.utils import hash_password
+import asyncio
 import uuid
 
-def create_admin_account():
+async def create_admin_account():
     """테스트 관리자 계정 생성"""
-    supabase = get_supabase_admin()
+    supabase = await init_supabase_admin()
     
     # 테스트 학원 생성 또는 조회
-    academy_response = supabase.table("academies")\
+    academy_response = await supabase.table("academies")\
         .select("*")\
         .eq("name", "테스트 학원")\
         .execute()
@@ -34,7 +35,7 @@ def create_admin_account():
             "subscription_tier": "premium",
             "subscription_status": "active"
         }
-        academy_response = supabase.table("academies").insert(academy_data).execute()
+        academy_response = await supabase.table("academies").insert(academy_data).execute()
         academy_id = academy_response.data[0]["id"]
         print(f"✅ 새 학원 생성: {academy_id}")
     
@@ -44,7 +45,7 @@ def create_admin_account():
     admin_name = "관리자"
     
     # 기존 계정 확인
-    existing_user = supabase.table("users")\
+    existing_user = await supabase.table("users")\
         .select("*")\
         .eq("email", admin_email)\
         .execute()
@@ -69,7 +70,7 @@ def create_admin_account():
     }
     
     try:
-        result = supabase.table("users").insert(user_data).execute()
+        result = await supabase.table("users").insert(user_data).execute()
         print("\n✅ 관리자 계정 생성 완료!")
         print("=" * 50)
         print(f"📧 이메일: {admin_email}")
@@ -79,6 +80,12 @@ def create_admin_account():
     except Exception as e:
         print(f"❌ 계정 생성 실패: {str(e)}")
 
+async def main():
+    try:
+        await create_admin_account()
+    finally:
+        await close_supabase_admin()
+
 if __name__ == "__main__":
-    create_admin_account()
+    asyncio.run(main())
 
@@ -0,0 +1,56 @@
+"""
+대시보드 요약 재계산 스크립트
+
+academy_dashboard_summary 를 원본 테이블(students, attendance, payments)에서
+다시 계산합니다. 증분 갱신이 어긋났을 때(실패한 갱신, 직접 수정한 데이터 등)
+실행합니다. 주기적으로 실행해도 됩니다.
+
+사용 예:
+    python scripts/recompute_dashboard.py                 # 모든 학원
+    python scripts/recompute_dashboard.py --academy-id <uuid>
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.database import init_supabase_admin, close_supabase_admin
+from app.dashboard_summary import recompute
+
+
+async def recompute_all(academy_id=None):
+    supabase = await init_supabase_admin()
+
+    if academy_id:
+        academy_ids = [academy_id]
+    else:
+        response = await supabase.table("academies").select("id").execute()
+        academy_ids = [row["id"] for row in (response.data or [])]
+
+    for academy_id in academy_ids:
+        try:
+            summary = await recompute(academy_id)
+            print(f"✅ {academy_id}: 학생 {summary['total_students']}명, "
+                  f"오늘 출석 {summary['today_attendance']}명, "
+                  f"이번 달 매출 {summary['monthly_revenue']}원")
+        except Exception as e:
+            print(f"❌ {academy_id}: 재계산 실패 - {str(e)}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="대시보드 요약 재계산")
+    parser.add_argument("--academy-id", help="특정 학원만 재계산")
+    args = parser.parse_args()
+
+    try:
+        await recompute_all(args.academy_id)
+    finally:
+        await close_supabase_admin()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,45 @@
+"""
+업로드 파일 정리 스크립트
+
+어떤 제출(submission_files)에서도 참조하지 않는 업로드 파일(blob)과
+그 썸네일을 삭제합니다. 마지막 업로드 후 UPLOAD_GC_GRACE_SECONDS 가
+지나지 않은 파일은 아직 제출 전일 수 있으므로 남겨둡니다.
+만료된 이어 올리기 세션도 함께 정리합니다. cron 등으로 주기적으로 실행하세요.
+
+사용 예:
+    python scripts/sweep_uploads.py
+    python scripts/sweep_uploads.py --grace-hours 1
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.config import get_settings
+from app.database import init_supabase_admin, close_supabase_admin
+from app.blobstore import sweep
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="참조 없는 업로드 파일 정리")
+    parser.add_argument("--grace-hours", type=float, help="이 시간보다 오래된 파일만 삭제 (기본: UPLOAD_GC_GRACE_SECONDS)")
+    parser.add_argument("--batch-size", type=int, default=500, help="한 번에 회수할 파일 수")
+    args = parser.parse_args()
+
+    grace_seconds = args.grace_hours * 3600 if args.grace_hours is not None \
+        else get_settings().upload_gc_grace_seconds
+
+    await init_supabase_admin()
+    try:
+        result = await sweep(grace_seconds, batch_size=args.batch_size)
+        print(f"✅ 삭제: blob {result['blobs']}개, 파일 {result['files']}개")
+    finally:
+        await close_supabase_admin()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
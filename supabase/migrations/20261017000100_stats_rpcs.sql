@@ -0,0 +1,41 @@
+-- Aggregated statistics computed in the database
+-- (called via supabase.rpc(); only the counts/sums cross the wire)
+
+-- 출석 통계: 하루 동안의 상태별 출석 수
+create or replace function public.attendance_stats(p_academy_id uuid, p_date date)
+returns json
+language sql
+stable
+as $$
+    select json_build_object(
+        'total',   count(*),
+        'present', count(*) filter (where status = 'present'),
+        'late',    count(*) filter (where status = 'late'),
+        'absent',  count(*) filter (where status = 'absent')
+    )
+    from public.attendance
+    where academy_id = p_academy_id
+      and date = p_date;
+$$;
+
+-- 결제 통계: 기간 내 완료된 결제의 합계와 건수
+create or replace function public.billing_stats(p_academy_id uuid, p_since timestamptz)
+returns json
+language sql
+stable
+as $$
+    select json_build_object(
+        'monthly_revenue', coalesce(sum(amount), 0),
+        'payment_count',   count(*)
+    )
+    from public.payments
+    where academy_id = p_academy_id
+      and status = 'completed'
+      and paid_at >= p_since;
+$$;
+
+create index if not exists attendance_academy_date_idx
+    on public.attendance (academy_id, date);
+
+create index if not exists payments_academy_status_paid_at_idx
+    on public.payments (academy_id, status, paid_at);
@@ -0,0 +1,146 @@
+-- Per-academy dashboard summary, maintained incrementally by the write paths
+-- (student create/delete, attendance create, payment create) and rebuilt from
+-- the base tables by recompute_dashboard_summary() to repair drift.
+
+create table if not exists public.academy_dashboard_summary (
+    academy_id       uuid primary key references public.academies(id) on delete cascade,
+    total_students   integer not null default 0,   -- status = 'active'
+    attendance_date  date,                          -- day today_attendance refers to
+    today_attendance integer not null default 0,   -- status = 'present'
+    revenue_month    date,                          -- first day of the month monthly_revenue refers to
+    monthly_revenue  bigint not null default 0,    -- completed payments
+    recent_activity  jsonb not null default '[]',  -- [{kind, student_id, name, at}], newest first, max 10
+    updated_at       timestamptz not null default now()
+);
+
+
+-- 전체 재계산 (요약이 없거나 어긋났을 때)
+create or replace function public.recompute_dashboard_summary(
+    p_academy_id uuid,
+    p_today date,
+    p_month_start date
+)
+returns json
+language plpgsql
+as $$
+declare
+    v_row public.academy_dashboard_summary;
+begin
+    insert into public.academy_dashboard_summary as s (
+        academy_id, total_students, attendance_date, today_attendance,
+        revenue_month, monthly_revenue, recent_activity, updated_at
+    )
+    select
+        p_academy_id,
+        (select count(*) from public.students
+          where academy_id = p_academy_id and status = 'active'),
+        p_today,
+        (select count(*) from public.attendance
+          where academy_id = p_academy_id and date = p_today and status = 'present'),
+        p_month_start,
+        (select coalesce(sum(amount), 0) from public.payments
+          where academy_id = p_academy_id and status = 'completed' and paid_at >= p_month_start),
+        coalesce((
+            select jsonb_agg(a order by a->>'at' desc)
+            from (
+                select a from (
+                    (select jsonb_build_object('kind', 'student', 'student_id', st.id,
+                                               'name', st.name, 'at', st.created_at) as a
+                       from public.students st
+                      where st.academy_id = p_academy_id
+                      order by st.created_at desc limit 10)
+                    union all
+                    (select jsonb_build_object('kind', 'attendance', 'student_id', st.id,
+                                               'name', st.name,
+                                               'at', coalesce(att.check_in_time, att.created_at))
+                       from public.attendance att
+                       join public.students st on st.id = att.student_id
+                      where att.academy_id = p_academy_id and att.date = p_today
+                        and att.status = 'present'
+                      order by coalesce(att.check_in_time, att.created_at) desc limit 10)
+                    union all
+                    (select jsonb_build_object('kind', 'payment', 'student_id', st.id,
+                                               'name', st.name, 'at', p.paid_at)
+                       from public.payments p
+                       join public.students st on st.id = p.student_id
+                      where p.academy_id = p_academy_id and p.status = 'completed'
+                        and p.paid_at is not null
+                      order by p.paid_at desc limit 10)
+                ) activity
+                order by a->>'at' desc
+                limit 10
+            ) latest
+        ), '[]'::jsonb),
+        now()
+    on conflict (academy_id) do update set
+        total_students   = excluded.total_students,
+        attendance_date  = excluded.attendance_date,
+        today_attendance = excluded.today_attendance,
+        revenue_month    = excluded.revenue_month,
+        monthly_revenue  = excluded.monthly_revenue,
+        recent_activity  = excluded.recent_activity,
+        updated_at       = excluded.updated_at
+    returning * into v_row;
+
+    return row_to_json(v_row);
+end;
+$$;
+
+
+-- 증분 반영: 쓰기 경로에서 호출 (행 잠금으로 동시 갱신도 안전)
+-- 저장된 날짜/월이 p_today / p_month_start 와 다르면 해당 카운터는 새 기간으로 초기화
+-- p_activity: [{kind, student_id, at}] (name 은 students 에서 채움)
+create or replace function public.apply_dashboard_delta(
+    p_academy_id uuid,
+    p_today date,
+    p_month_start date,
+    p_students integer default 0,
+    p_attendance integer default 0,
+    p_revenue bigint default 0,
+    p_activity jsonb default '[]'
+)
+returns void
+language plpgsql
+as $$
+declare
+    v_activity jsonb;
+begin
+    perform 1 from public.academy_dashboard_summary
+     where academy_id = p_academy_id
+       for update;
+
+    if not found then
+        -- 요약이 아직 없으면 방금 쓴 행까지 포함해 전체 계산
+        perform public.recompute_dashboard_summary(p_academy_id, p_today, p_month_start);
+        return;
+    end if;
+
+    select coalesce(jsonb_agg(
+               a || jsonb_build_object('name', coalesce(a->>'name', st.name))
+           ), '[]'::jsonb)
+      into v_activity
+      from jsonb_array_elements(p_activity) a
+      left join public.students st on st.id = (a->>'student_id')::uuid;
+
+    update public.academy_dashboard_summary s set
+        total_students   = greatest(s.total_students + p_students, 0),
+        today_attendance = case when s.attendance_date = p_today
+                                then s.today_attendance + p_attendance
+                                else greatest(p_attendance, 0) end,
+        attendance_date  = p_today,
+        monthly_revenue  = case when s.revenue_month = p_month_start
+                                then s.monthly_revenue + p_revenue
+                                else p_revenue end,
+        revenue_month    = p_month_start,
+        recent_activity  = coalesce((
+            select jsonb_agg(a order by a->>'at' desc)
+            from (
+                select a from jsonb_array_elements(v_activity || s.recent_activity) a
+                order by a->>'at' desc
+                limit 10
+            ) latest
+        ), '[]'::jsonb),
+        updated_at       = now()
+    where s.academy_id = p_academy_id;
+end;
+$$;
@@ -0,0 +1,35 @@
+-- One attendance row per student per day, so bulk roll-call can upsert
+-- (on_conflict=student_id,date) in a single statement.
+
+-- Existing same-day duplicates are not deleted: every row except the most
+-- recent one per (student_id, date) is moved to attendance_duplicates for
+-- review, and the number moved is reported.
+create table if not exists public.attendance_duplicates
+    (like public.attendance including defaults);
+
+alter table public.attendance_duplicates
+    add column if not exists moved_at timestamptz not null default now();
+
+do $$
+declare
+    moved integer;
+begin
+    with losers as (
+        delete from public.attendance a
+         using public.attendance b
+         where a.student_id = b.student_id
+           and a.date = b.date
+           and (a.created_at, a.id) < (b.created_at, b.id)
+        returning a.*
+    )
+    insert into public.attendance_duplicates
+    select losers.*, now() from losers;
+
+    get diagnostics moved = row_count;
+    if moved > 0 then
+        raise notice 'attendance: % same-day duplicate row(s) moved to public.attendance_duplicates', moved;
+    end if;
+end $$;
+
+create unique index if not exists attendance_student_date_key
+    on public.attendance (student_id, date);
@@ -0,0 +1,125 @@
+-- Homework submission as one transactional RPC
+-- (target check + submission upsert + file replacement in a single round trip)
+
+-- One submission per student per homework.
+-- Existing duplicates are merged instead of deleted: the latest submission
+-- per (homework_id, student_id) is kept, the files of the others are moved
+-- onto it (appended after its own, so the cascade cannot remove them), and
+-- the other submission rows are moved to homework_submission_duplicates for
+-- review. The numbers moved are reported.
+create table if not exists public.homework_submission_duplicates
+    (like public.homework_submissions including defaults);
+
+alter table public.homework_submission_duplicates
+    add column if not exists kept_submission_id uuid,
+    add column if not exists moved_at timestamptz not null default now();
+
+do $$
+declare
+    files_moved integer;
+    moved integer;
+begin
+    create temp table submission_merge on commit drop as
+    select s.id, w.id as kept_id
+      from public.homework_submissions s
+      join lateral (
+          select k.id from public.homework_submissions k
+           where k.homework_id = s.homework_id
+             and k.student_id = s.student_id
+           order by coalesce(k.submitted_at, k.created_at) desc, k.id desc
+           limit 1
+      ) w on w.id <> s.id;
+
+    with moving as (
+        select f.ctid as row_id,
+               m.kept_id,
+               (select coalesce(max(k.upload_order), -1)
+                  from public.submission_files k
+                 where k.submission_id = m.kept_id)
+               + row_number() over (partition by m.kept_id
+                                    order by f.submission_id, f.upload_order) as upload_order
+          from public.submission_files f
+          join submission_merge m on m.id = f.submission_id
+    )
+    update public.submission_files f
+       set submission_id = moving.kept_id,
+           upload_order = moving.upload_order
+      from moving
+     where f.ctid = moving.row_id;
+
+    get diagnostics files_moved = row_count;
+
+    with losers as (
+        delete from public.homework_submissions s
+         using submission_merge m
+         where s.id = m.id
+        returning s.*, m.kept_id
+    )
+    insert into public.homework_submission_duplicates
+    select losers.*, now() from losers;
+
+    get diagnostics moved = row_count;
+    if moved > 0 then
+        raise notice 'homework_submissions: % duplicate submission(s) moved to public.homework_submission_duplicates, % file(s) reattached to the kept submission',
+            moved, files_moved;
+    end if;
+end $$;
+
+create unique index if not exists homework_submissions_homework_student_key
+    on public.homework_submissions (homework_id, student_id);
+
+create index if not exists submission_files_submission_idx
+    on public.submission_files (submission_id, upload_order);
+
+
+-- 숙제 제출 (재제출 시 내용/파일 교체)
+-- p_files: [{file_key, file_name, file_url, file_size, mime_type}] (배열 순서 = upload_order)
+-- 대상 학생이 아니면 P0002 (PostgREST: 404)
+create or replace function public.submit_homework(
+    p_homework_id uuid,
+    p_student_id uuid,
+    p_content text,
+    p_files jsonb default '[]'
+)
+returns json
+language plpgsql
+as $$
+declare
+    v_submission_id uuid;
+begin
+    if not exists (
+        select 1 from public.homework_targets
+         where homework_id = p_homework_id and student_id = p_student_id
+    ) then
+        raise exception '숙제를 찾을 수 없거나 대상 학생이 아닙니다'
+            using errcode = 'P0002';
+    end if;
+
+    -- The upsert locks the submission row, so concurrent resubmits are serialized
+    insert into public.homework_submissions as s
+        (homework_id, student_id, content, status, submitted_at)
+    values
+        (p_homework_id, p_student_id, p_content, 'submitted', now())
+    on conflict (homework_id, student_id) do update set
+        content      = excluded.content,
+        status       = excluded.status,
+        submitted_at = excluded.submitted_at
+    returning s.id into v_submission_id;
+
+    delete from public.submission_files where submission_id = v_submission_id;
+
+    insert into public.submission_files
+        (submission_id, file_key, file_name, file_url, file_size, mime_type, upload_order)
+    select
+        v_submission_id,
+        f.value->>'file_key',
+        f.value->>'file_name',
+        f.value->>'file_url',
+        (f.value->>'file_size')::bigint,
+        coalesce(f.value->>'mime_type', 'image/jpeg'),
+        (f.ord - 1)::int
+    from jsonb_array_elements(coalesce(p_files, '[]'::jsonb)) with ordinality as f(value, ord);
+
+    return json_build_object('submission_id', v_submission_id);
+end;
+$$;
@@ -0,0 +1,83 @@
+-- Class-based homework targeting
+-- target_mode = 'snapshot': audience frozen in homework_targets at creation (existing behaviour, default)
+-- target_mode = 'class'   : audience resolved from class_members at read time (no homework_targets rows, opt-in)
+
+alter table public.homework
+    add column if not exists target_mode text not null default 'snapshot'
+        check (target_mode in ('class', 'snapshot'));
+
+-- Student -> class-based homework lookups (class_ids && array[...])
+create index if not exists homework_class_ids_gin
+    on public.homework using gin (class_ids)
+    where target_mode = 'class';
+
+create index if not exists class_members_active_class_idx
+    on public.class_members (class_id, student_id)
+    where left_at is null;
+
+create index if not exists class_members_active_student_idx
+    on public.class_members (student_id, class_id)
+    where left_at is null;
+
+
+-- 숙제 제출: 반 기반 숙제는 현재 반 소속으로 대상 여부 확인
+create or replace function public.submit_homework(
+    p_homework_id uuid,
+    p_student_id uuid,
+    p_content text,
+    p_files jsonb default '[]'
+)
+returns json
+language plpgsql
+as $$
+declare
+    v_submission_id uuid;
+begin
+    if not exists (
+        select 1
+          from public.homework h
+         where h.id = p_homework_id
+           and case h.target_mode
+                   when 'class' then exists (
+                       select 1 from public.class_members m
+                        where m.class_id = any(h.class_ids)
+                          and m.student_id = p_student_id
+                          and m.left_at is null)
+                   else exists (
+                       select 1 from public.homework_targets t
+                        where t.homework_id = h.id
+                          and t.student_id = p_student_id)
+               end
+    ) then
+        raise exception '숙제를 찾을 수 없거나 대상 학생이 아닙니다'
+            using errcode = 'P0002';
+    end if;
+
+    -- The upsert locks the submission row, so concurrent resubmits are serialized
+    insert into public.homework_submissions as s
+        (homework_id, student_id, content, status, submitted_at)
+    values
+        (p_homework_id, p_student_id, p_content, 'submitted', now())
+    on conflict (homework_id, student_id) do update set
+        content      = excluded.content,
+        status       = excluded.status,
+        submitted_at = excluded.submitted_at
+    returning s.id into v_submission_id;
+
+    delete from public.submission_files where submission_id = v_submission_id;
+
+    insert into public.submission_files
+        (submission_id, file_key, file_name, file_url, file_size, mime_type, upload_order)
+    select
+        v_submission_id,
+        f.value->>'file_key',
+        f.value->>'file_name',
+        f.value->>'file_url',
+        (f.value->>'file_size')::bigint,
+        coalesce(f.value->>'mime_type', 'image/jpeg'),
+        (f.ord - 1)::int
+    from jsonb_array_elements(coalesce(p_files, '[]'::jsonb)) with ordinality as f(value, ord);
+
+    return json_build_object('submission_id', v_submission_id);
+end;
+$$;
@@ -0,0 +1,63 @@
+-- Student homework list as one RPC
+-- (assigned homework of both targeting modes + own submission + ordered files, one round trip)
+
+create index if not exists homework_targets_student_idx
+    on public.homework_targets (student_id, homework_id);
+
+
+-- 학생 숙제 목록
+-- p_filter: null(전체) | 'due_soon'(오늘 ~ 오늘 + p_due_soon_days, 미제출) | 'overdue'(기한 지남, 미제출) | 'graded'(채점 완료)
+-- 정렬: 마감일 (p_descending), 마감일 없는 숙제는 마지막, 같은 마감일은 최신 등록 순
+-- 각 숙제에 submission (없으면 null), submission.files 는 upload_order 순
+create or replace function public.student_homework_feed(
+    p_student_id uuid,
+    p_today date,
+    p_filter text default null,
+    p_due_soon_days int default 3,
+    p_descending boolean default false
+)
+returns json
+language sql
+stable
+as $$
+    with assigned as (
+        select h.*
+          from public.homework h
+         where h.target_mode = 'snapshot'
+           and exists (
+               select 1 from public.homework_targets t
+                where t.homework_id = h.id and t.student_id = p_student_id)
+        union all
+        select h.*
+          from public.homework h
+         where h.target_mode = 'class'
+           and h.class_ids && array(
+               select m.class_id from public.class_members m
+                where m.student_id = p_student_id and m.left_at is null)
+    )
+    select coalesce(json_agg(
+               to_jsonb(a) || jsonb_build_object('submission', s.submission)
+               order by
+                   case when p_descending then a.due_date end desc nulls last,
+                   case when not p_descending then a.due_date end asc nulls last,
+                   a.created_at desc
+           ), '[]'::json)
+      from assigned a
+      left join lateral (
+          select sub.status,
+                 to_jsonb(sub) || jsonb_build_object('files', coalesce((
+                     select jsonb_agg(to_jsonb(f) order by f.upload_order)
+                       from public.submission_files f
+                      where f.submission_id = sub.id), '[]'::jsonb)) as submission
+            from public.homework_submissions sub
+           where sub.homework_id = a.id and sub.student_id = p_student_id
+      ) s on true
+     where case p_filter
+               when 'due_soon' then a.due_date between p_today and p_today + p_due_soon_days
+                                and coalesce(s.status, 'pending') = 'pending'
+               when 'overdue'  then a.due_date < p_today
+                                and coalesce(s.status, 'pending') = 'pending'
+               when 'graded'   then s.status = 'graded'
+               else true
+           end;
+$$;
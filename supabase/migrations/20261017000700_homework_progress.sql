@@ -0,0 +1,46 @@
+-- Per-homework submission progress for the admin homework list
+-- (one grouped aggregate over a page of homework instead of one drill-down per homework)
+
+create index if not exists homework_submissions_homework_status_idx
+    on public.homework_submissions (homework_id, status);
+
+
+-- 숙제별 제출 현황: {homework_id: {targets, submitted, graded, pending, late}}
+-- targets: 스냅샷 숙제는 homework_targets, 반 기반 숙제는 현재 반 명단
+-- submitted: 채점 대기, graded: 채점 완료, pending: 대상 중 미제출, late: 마감일 이후 제출
+create or replace function public.homework_progress(p_homework_ids uuid[])
+returns json
+language sql
+stable
+as $$
+    select coalesce(json_object_agg(h.id, json_build_object(
+               'targets',   t.targets,
+               'submitted', coalesce(s.submitted, 0),
+               'graded',    coalesce(s.graded, 0),
+               'pending',   greatest(t.targets - coalesce(s.submitted, 0) - coalesce(s.graded, 0), 0),
+               'late',      coalesce(s.late, 0)
+           )), '{}'::json)
+      from public.homework h
+      cross join lateral (
+          select case h.target_mode
+                     when 'class' then (
+                         select count(distinct m.student_id) from public.class_members m
+                          where m.class_id = any(h.class_ids) and m.left_at is null)
+                     else (
+                         select count(*) from public.homework_targets ht
+                          where ht.homework_id = h.id)
+                 end as targets
+      ) t
+      left join (
+          select sub.homework_id,
+                 count(*) filter (where sub.status = 'submitted') as submitted,
+                 count(*) filter (where sub.status = 'graded')    as graded,
+                 count(*) filter (where sub.status in ('submitted', 'graded')
+                                    and sub.submitted_at::date > hw.due_date) as late
+            from public.homework_submissions sub
+            join public.homework hw on hw.id = sub.homework_id
+           where sub.homework_id = any(p_homework_ids)
+           group by sub.homework_id
+      ) s on s.homework_id = h.id
+     where h.id = any(p_homework_ids);
+$$;
@@ -0,0 +1,9 @@
+-- WebP derivatives of submitted images (filled in after submission, see app/derivatives.py)
+-- thumbnail_url: grid thumbnail, preview_url: review-size image; null = use file_url
+
+alter table public.submission_files
+    add column if not exists thumbnail_url text,
+    add column if not exists preview_url text;
+
+create index if not exists submission_files_file_key_idx
+    on public.submission_files (file_key);
@@ -0,0 +1,69 @@
+-- Content-addressed upload store: one row per stored blob (blobs/ab/<sha256><ext>)
+-- ref_count = submission_files rows pointing at the blob (maintained by trigger)
+
+create table if not exists public.upload_blobs (
+    file_key    text primary key,
+    sha256      text not null,
+    file_size   bigint,          -- null: reserved by presign, bytes not verified yet
+    ref_count   integer not null default 0,
+    uploaded_at timestamptz not null default now(),
+    created_at  timestamptz not null default now()
+);
+
+-- Sweeper candidates
+create index if not exists upload_blobs_unreferenced_idx
+    on public.upload_blobs (uploaded_at)
+    where ref_count = 0;
+
+
+create or replace function public.upload_blob_refs()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('INSERT', 'UPDATE') then
+        update public.upload_blobs
+           set ref_count = ref_count + 1
+         where file_key = new.file_key;
+    end if;
+    if tg_op in ('DELETE', 'UPDATE') then
+        update public.upload_blobs
+           set ref_count = greatest(ref_count - 1, 0)
+         where file_key = old.file_key;
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists submission_files_blob_refs on public.submission_files;
+create trigger submission_files_blob_refs
+    after insert or delete or update of file_key on public.submission_files
+    for each row execute function public.upload_blob_refs();
+
+
+-- 참조 없는 blob 회수 (sweeper 용)
+-- p_uploaded_before 이전에 마지막으로 업로드된 blob 중 참조가 없는 것을 최대 p_limit 개 삭제하고
+-- file_key 목록을 반환 (파일 삭제는 호출 측). ref_count 와 별개로 submission_files 를 다시 확인
+create or replace function public.claim_unreferenced_blobs(
+    p_uploaded_before timestamptz,
+    p_limit int default 500
+)
+returns json
+language sql
+as $$
+    with claimed as (
+        delete from public.upload_blobs b
+         where b.file_key in (
+             select c.file_key
+               from public.upload_blobs c
+              where c.ref_count = 0
+                and c.uploaded_at < p_uploaded_before
+                and not exists (
+                    select 1 from public.submission_files f where f.file_key = c.file_key)
+              order by c.uploaded_at
+              limit p_limit
+              for update skip locked)
+        returning b.file_key
+    )
+    select coalesce(json_agg(file_key), '[]'::json) from claimed;
+$$;
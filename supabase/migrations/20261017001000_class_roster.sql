@@ -0,0 +1,96 @@
+-- Class rosters live in class_members (left_at = null: current member).
+-- Homework targeting, submit_homework and student_homework_feed already read
+-- it; the classes API used to write class_students instead, so rosters edited
+-- there never reached homework. Copy those memberships over once; from now on
+-- every roster write goes through apply_class_roster.
+
+insert into public.class_members (class_id, student_id)
+select cs.class_id, cs.student_id
+  from public.class_students cs
+ where not exists (
+     select 1 from public.class_members m
+      where m.class_id = cs.class_id
+        and m.student_id = cs.student_id
+        and m.left_at is null);
+
+
+-- 반 명단 일괄 변경 (한 트랜잭션)
+-- p_mode: 'add' (없는 학생 추가) / 'remove' (있는 학생 제거) / 'replace' (명단을 p_student_ids 로 맞춤)
+-- 제거는 left_at 기록 (이력 유지), 다시 추가하면 새 행
+-- 학원 소속이 아닌 학생은 invalid 로 반환하고 건너뜀; 반이 없으면 P0002
+create or replace function public.apply_class_roster(
+    p_academy_id uuid,
+    p_class_id uuid,
+    p_student_ids uuid[],
+    p_mode text
+)
+returns json
+language plpgsql
+as $$
+declare
+    v_requested uuid[];
+    v_valid uuid[];
+    v_current uuid[];
+    v_add uuid[];
+    v_remove uuid[];
+begin
+    if p_mode not in ('add', 'remove', 'replace') then
+        raise exception 'unknown roster mode: %', p_mode using errcode = '22023';
+    end if;
+
+    -- Row lock: concurrent roster changes of one class are serialized
+    perform 1 from public.classes
+     where id = p_class_id and academy_id = p_academy_id
+       for update;
+    if not found then
+        raise exception '반을 찾을 수 없습니다' using errcode = 'P0002';
+    end if;
+
+    -- Requested ids, de-duplicated in request order
+    select coalesce(array_agg(id order by ord), '{}')
+      into v_requested
+      from (select id, min(ord) as ord
+              from unnest(p_student_ids) with ordinality as r(id, ord)
+             group by id) r;
+
+    if p_mode = 'remove' then
+        v_valid := v_requested;
+    else
+        select coalesce(array_agg(r.id order by r.ord), '{}')
+          into v_valid
+          from unnest(v_requested) with ordinality as r(id, ord)
+          join public.students s on s.id = r.id and s.academy_id = p_academy_id;
+    end if;
+
+    select coalesce(array_agg(student_id), '{}')
+      into v_current
+      from public.class_members
+     where class_id = p_class_id and left_at is null;
+
+    v_add := case when p_mode = 'remove' then '{}'::uuid[] else
+        array(select id from unnest(v_valid) with ordinality as r(id, ord)
+               where id <> all(v_current) order by ord) end;
+    v_remove := case p_mode
+        when 'add' then '{}'::uuid[]
+        when 'remove' then array(select id from unnest(v_valid) as r(id) where id = any(v_current))
+        else array(select id from unnest(v_current) as r(id) where id <> all(v_valid) order by id)
+    end;
+
+    update public.class_members
+       set left_at = now()
+     where class_id = p_class_id
+       and student_id = any(v_remove)
+       and left_at is null;
+
+    insert into public.class_members (class_id, student_id)
+    select p_class_id, id from unnest(v_add) as r(id);
+
+    return json_build_object(
+        'added', to_json(v_add),
+        'removed', to_json(v_remove),
+        'invalid', to_json(array(
+            select id from unnest(v_requested) as r(id) where id <> all(v_valid))),
+        'student_count', cardinality(v_current) + cardinality(v_add) - cardinality(v_remove)
+    );
+end;
+$$;
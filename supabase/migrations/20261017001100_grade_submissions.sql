@@ -0,0 +1,29 @@
+-- 제출물 일괄 채점: UPDATE ... FROM unnest(...) 한 번
+-- p_ids / p_grades / p_feedbacks: 같은 길이의 병렬 배열 (i 번째 제출 = i 번째 점수/피드백)
+-- 학원 소속 숙제의 제출만 갱신하고, 갱신된 제출 id 목록을 반환 (나머지는 호출 측에서 "없음" 처리)
+create or replace function public.grade_submissions(
+    p_academy_id uuid,
+    p_graded_by uuid,
+    p_ids uuid[],
+    p_grades text[],
+    p_feedbacks text[]
+)
+returns json
+language sql
+as $$
+    with graded as (
+        update public.homework_submissions sub
+           set grade = g.grade,
+               feedback = g.feedback,
+               status = 'graded',
+               graded_at = now(),
+               graded_by = p_graded_by
+          from unnest(p_ids, p_grades, p_feedbacks) as g(id, grade, feedback),
+               public.homework h
+         where sub.id = g.id
+           and h.id = sub.homework_id
+           and h.academy_id = p_academy_id
+        returning sub.id
+    )
+    select coalesce(json_agg(id), '[]'::json) from graded;
+$$;
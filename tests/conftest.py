@@ -0,0 +1,74 @@
+"""
+Shared fixtures: the whole app on the in-memory PostgREST backend
+
+Every test gets an empty database seeded with one academy (scripts/bench.py
+``seed``), a TestClient running the app lifespan and bearer headers for
+the academy's admin and first student. File uploads land under a per-test
+working directory (``static/uploads`` is relative to the CWD).
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import bench  # noqa: E402  (adds the project root and configures the env)
+
+bench.configure_env(argparse.Namespace(latency_ms=0.0, jitter_ms=0.0))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.auth.utils import create_access_token  # noqa: E402
+from app.main import app  # noqa: E402
+from app.memory_backend import get_memory_database  # noqa: E402
+from app.membership import invalidate_membership  # noqa: E402
+
+
+class Academy:
+    """Ids of the seeded academy"""
+
+    def __init__(self, academy_id: str, admin_id: str, student_id: str):
+        self.id = academy_id
+        self.admin_id = admin_id
+        self.student_id = student_id
+
+
+@pytest.fixture
+def db():
+    database = get_memory_database()
+    database.reset()
+    invalidate_membership()
+    yield database
+    database.reset()
+
+
+@pytest.fixture
+def academy(db) -> Academy:
+    return Academy(*bench.seed(db, students=6, classes=2, homeworks=2))
+
+
+@pytest.fixture
+def client(db, tmp_path, monkeypatch):
+    (tmp_path / "static" / "uploads").mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _headers(user_id: str, role: str, academy_id: str) -> dict:
+    token = create_access_token({"sub": user_id, "role": role, "academy_id": academy_id})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def admin(academy) -> dict:
+    return _headers(academy.admin_id, "admin", academy.id)
+
+
+@pytest.fixture
+def student(academy) -> dict:
+    return _headers(academy.student_id, "student", academy.id)
@@ -0,0 +1,84 @@
+from datetime import datetime
+
+
+def _class_members(db, class_name="1반"):
+    class_row = next(c for c in db.table("classes") if c["name"] == class_name)
+    members = [m["student_id"] for m in db.table("class_members") if m["class_id"] == class_row["id"] and m.get("left_at") is None]
+    return class_row["id"], members
+
+
+def _today_present(client, admin):
+    return client.get("/api/dashboard/stats", headers=admin).json()["stats"]["todayAttendance"]
+
+
+def test_marking_twice_on_one_day_overwrites(client, db, academy, admin):
+    student_id = db.table("students")[-1]["id"]  # not seeded as present
+    before = _today_present(client, admin)
+
+    first = client.post("/api/attendance/", headers=admin, json={"student_id": student_id, "status": "present"})
+    second = client.post("/api/attendance/", headers=admin, json={"student_id": student_id, "status": "late"})
+    assert first.status_code == second.status_code == 200
+
+    rows = [r for r in db.table("attendance") if r["student_id"] == student_id]
+    assert len(rows) == 1
+    assert rows[0]["status"] == "late"
+    assert _today_present(client, admin) == before
+
+
+def test_bulk_marks_a_class_in_one_request(client, db, academy, admin):
+    class_id, members = _class_members(db)
+    outsider = next(s["id"] for s in db.table("students") if s["id"] not in members)
+    today = datetime.now().date().isoformat()
+
+    response = client.post("/api/attendance/bulk", headers=admin, json={
+        "class_id": class_id,
+        "records": [
+            {"student_id": members[0], "date": today, "status": "present",
+             "check_in_time": f"{today}T09:00:00", "notes": "정시"},
+            {"student_id": members[1], "date": today, "status": "absent"},
+            {"student_id": members[1], "date": today, "status": "late"},
+            {"student_id": members[2], "date": today, "status": "sleeping"},
+            {"student_id": outsider, "date": today, "status": "present"},
+        ],
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["saved"], body["failed"]) == (2, 3)
+    assert [r["ok"] for r in body["results"]] == [True, True, False, False, False]
+    assert all(r["attendance_id"] for r in body["results"] if r["ok"])
+
+    saved = next(r for r in db.table("attendance") if r["student_id"] == members[0] and r["date"] == today)
+    assert saved["check_in_time"].startswith(f"{today}T09:00:00")
+    assert saved["notes"] == "정시"
+    assert saved["status"] == "present"
+
+
+def test_bulk_rows_default_to_today(client, db, academy, admin):
+    class_id, members = _class_members(db)
+    today = datetime.now().date().isoformat()
+
+    response = client.post("/api/attendance/bulk", headers=admin, json={
+        "class_id": class_id,
+        "records": [
+            {"student_id": members[0], "status": "late", "notes": "버스 지연"},
+            {"student_id": members[1], "status": "present", "memo": "옛 필드명"},
+        ],
+    })
+    assert response.status_code == 200
+    assert [r["date"] for r in response.json()["results"]] == [today, today]
+
+    notes = {r["student_id"]: r["notes"] for r in db.table("attendance") if r["date"] == today}
+    assert notes[members[0]] == "버스 지연"
+    assert notes[members[1]] == "옛 필드명"
+
+
+def test_bulk_rejects_empty_and_foreign_classes(client, db, admin):
+    class_id, _ = _class_members(db)
+    empty = client.post("/api/attendance/bulk", headers=admin, json={"class_id": class_id, "records": []})
+    assert empty.status_code == 422
+
+    missing = client.post("/api/attendance/bulk", headers=admin, json={
+        "class_id": "00000000-0000-0000-0000-000000000000",
+        "records": [{"student_id": "00000000-0000-0000-0000-000000000001", "date": "2026-10-01"}],
+    })
+    assert missing.status_code == 404
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+
+import anyio
+
+from app import blobstore, uploads
+from app.blobstore import register_blob, sweep
+
+
+async def _chunks(data: bytes):
+    yield data
+
+
+def _store(data: bytes) -> dict:
+    return anyio.run(lambda: uploads.store_blob(_chunks(data), ".png", max_bytes=1024, register=register_blob))
+
+
+def _age(db, file_key):
+    old = (datetime.now(timezone.utc) - timedelta(days=30)).isoformat()
+    for blob in db.table("upload_blobs"):
+        if blob["file_key"] == file_key:
+            blob["uploaded_at"] = old
+
+
+def _path(file_key):
+    return uploads.resolve_upload_path(file_key)
+
+
+def test_sweep_deletes_unreferenced_blobs(client, db):
+    blob = _store(b"orphan")
+    _age(db, blob["file_key"])
+
+    result = anyio.run(sweep, 3600)
+
+    assert result["blobs"] == 1
+    assert not _path(blob["file_key"]).exists()
+    assert not _path(f"{blobstore.TRASH_PREFIX}/{blob['file_key']}").exists()
+    assert not [b for b in db.table("upload_blobs") if b["file_key"] == blob["file_key"]]
+
+
+def test_upload_racing_the_sweep_keeps_its_file(client, db, monkeypatch):
+    """Same bytes uploaded after the row was claimed and the file trashed"""
+    data = b"photo"
+    blob = _store(data)
+    _age(db, blob["file_key"])
+
+    registered = blobstore._registered
+
+    async def upload_then_check(file_keys):
+        # Interleaving: claim -> trash -> (upload registers and places) -> re-check
+        assert not _path(blob["file_key"]).exists()
+        await uploads.store_blob(_chunks(data), ".png", max_bytes=1024, register=register_blob)
+        return await registered(file_keys)
+
+    monkeypatch.setattr(blobstore, "_registered", upload_then_check)
+    result = anyio.run(sweep, 3600)
+
+    assert result["blobs"] == 0
+    assert _path(blob["file_key"]).read_bytes() == data
+    assert [b for b in db.table("upload_blobs") if b["file_key"] == blob["file_key"]]
+
+
+def test_registration_during_the_sweep_restores_the_trashed_file(client, db, monkeypatch):
+    """Upload registered before the re-check but saw the file before it was trashed"""
+    data = b"worksheet"
+    blob = _store(data)
+    _age(db, blob["file_key"])
+
+    registered = blobstore._registered
+
+    async def register_then_check(file_keys):
+        await register_blob(blob)
+        return await registered(file_keys)
+
+    monkeypatch.setattr(blobstore, "_registered", register_then_check)
+    anyio.run(sweep, 3600)
+
+    assert _path(blob["file_key"]).read_bytes() == data
+    assert not _path(f"{blobstore.TRASH_PREFIX}/{blob['file_key']}").exists()
@@ -0,0 +1,87 @@
+import uuid
+
+
+def _class(db, name):
+    return next(c for c in db.table("classes") if c["name"] == name)
+
+
+def _active(db, class_id):
+    return {m["student_id"] for m in db.table("class_members")
+            if m["class_id"] == class_id and m.get("left_at") is None}
+
+
+def test_add_writes_class_members_and_reaches_class_homework(client, db, academy, admin):
+    first, second = _class(db, "1반"), _class(db, "2반")
+    newcomer = next(iter(_active(db, second["id"])))
+    homework = db.insert("homework", [{
+        "academy_id": academy.id, "title": "반 숙제", "class_ids": [first["id"]],
+        "target_mode": "class", "due_date": "2099-01-01",
+    }])[0]
+
+    response = client.post(
+        f"/api/classes/{first['id']}/students", headers=admin,
+        json={"student_ids": [newcomer]},
+    )
+    assert response.status_code == 200
+    assert response.json()["added"] == [newcomer]
+    assert newcomer in _active(db, first["id"])
+
+    submitted = client.post(
+        f"/api/homeworks/{homework['id']}/submit",
+        params={"student_id": newcomer},
+        json={"content": "풀이", "files": []},
+    )
+    assert submitted.status_code == 200
+
+
+def test_remove_sets_left_at(client, db, academy, admin):
+    first = _class(db, "1반")
+    response = client.post(
+        f"/api/classes/{first['id']}/students/remove", headers=admin,
+        json={"student_ids": [academy.student_id]},
+    )
+    assert response.json()["removed"] == [academy.student_id]
+
+    rows = [m for m in db.table("class_members")
+            if m["class_id"] == first["id"] and m["student_id"] == academy.student_id]
+    assert len(rows) == 1 and rows[0]["left_at"] is not None
+
+    listed = client.get("/api/classes/", headers=admin).json()
+    assert next(c for c in listed if c["id"] == first["id"])["student_count"] == 2
+
+
+def test_replace_applies_only_the_difference(client, db, academy, admin):
+    first, second = _class(db, "1반"), _class(db, "2반")
+    current = _active(db, first["id"])
+    keep = sorted(current - {academy.student_id})
+    newcomer = sorted(_active(db, second["id"]))[0]
+    unknown = str(uuid.uuid4())
+
+    response = client.put(
+        f"/api/classes/{first['id']}/students", headers=admin,
+        json={"student_ids": keep + [newcomer, unknown]},
+    )
+    body = response.json()
+    assert body["added"] == [newcomer]
+    assert body["removed"] == [academy.student_id]
+    assert body["invalid"] == [unknown]
+    assert body["student_count"] == 3
+    assert _active(db, first["id"]) == set(keep) | {newcomer}
+    # 남은 학생은 기존 행 그대로 (새 행 없음)
+    assert len([m for m in db.table("class_members") if m["class_id"] == first["id"]]) == 4
+
+
+def test_roster_of_another_academy_is_not_found(client, db, admin):
+    other = db.insert("classes", [{"academy_id": str(uuid.uuid4()), "name": "남의 반"}])[0]
+    response = client.put(
+        f"/api/classes/{other['id']}/students", headers=admin, json={"student_ids": []},
+    )
+    assert response.status_code == 404
+
+
+def test_malformed_ids_are_rejected_not_missing(client, db, academy, admin):
+    class_id = next(c["id"] for c in db.table("classes") if c["academy_id"] == academy.id)
+    bad_class = client.post(f"/api/classes/not-a-uuid/students/{academy.student_id}", headers=admin)
+    assert bad_class.status_code == 422
+    bad_student = client.delete(f"/api/classes/{class_id}/students/not-a-uuid", headers=admin)
+    assert bad_student.status_code == 422
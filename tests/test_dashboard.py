@@ -0,0 +1,78 @@
+from datetime import datetime
+
+
+def _stats(client, admin):
+    response = client.get("/api/dashboard/stats", headers=admin)
+    assert response.status_code == 200
+    return response.json()["stats"]
+
+
+def _recomputed(client, admin):
+    return client.post("/api/dashboard/summary/recompute", headers=admin).json()["stats"]
+
+
+def test_summary_follows_creates(client, db, academy, admin):
+    before = _stats(client, admin)
+    assert before == {"totalStudents": 6, "todayAttendance": 3, "monthlyRevenue": 0}
+
+    created = client.post("/api/students/", headers=admin, json={"name": "신입"})
+    assert created.status_code == 200
+    new_id = created.json()["id"]
+
+    marked = client.post("/api/attendance/", headers=admin, json={"student_id": new_id, "status": "present"})
+    assert marked.status_code == 200
+
+    paid = client.post("/api/billing/payments", headers=admin, json={
+        "student_id": new_id, "amount": 120000, "payment_method": "card"
+    })
+    assert paid.status_code == 200
+
+    after = _stats(client, admin)
+    assert after == {"totalStudents": 7, "todayAttendance": 4, "monthlyRevenue": 120000}
+    # Incremental counters agree with a full rebuild
+    assert _recomputed(client, admin) == after
+
+
+def test_status_change_moves_student_count(client, academy, admin):
+    _stats(client, admin)
+
+    paused = client.patch(f"/api/students/{academy.student_id}", headers=admin, json={"status": "paused"})
+    assert paused.status_code == 200
+    assert _stats(client, admin)["totalStudents"] == 5
+
+    # Other field updates leave the count alone
+    client.patch(f"/api/students/{academy.student_id}", headers=admin, json={"memo": "휴원"})
+    assert _stats(client, admin)["totalStudents"] == 5
+
+    client.patch(f"/api/students/{academy.student_id}", headers=admin, json={"status": "active"})
+    assert _stats(client, admin)["totalStudents"] == 6
+    assert _recomputed(client, admin)["totalStudents"] == 6
+
+
+def test_recompute_repairs_drift(client, db, academy, admin):
+    _stats(client, admin)
+    db.insert("payments", [{"academy_id": academy.id, "student_id": academy.student_id,
+                            "amount": 5000, "status": "completed",
+                            "paid_at": datetime.utcnow().isoformat()}])
+    assert _stats(client, admin)["monthlyRevenue"] == 0
+    assert _recomputed(client, admin)["monthlyRevenue"] == 5000
+
+
+def test_attendance_and_summary_share_one_today(client, academy, admin, monkeypatch):
+    from app import dashboard_summary
+
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2030, 1, 1, 0, 30)
+
+    # 00:30 local is still the previous day in UTC on a +09:00 server
+    monkeypatch.setattr(dashboard_summary, "datetime", Clock)
+    assert _stats(client, admin)["todayAttendance"] == 0
+
+    marked = client.post("/api/attendance/", headers=admin,
+                         json={"student_id": academy.student_id, "status": "present"})
+    assert marked.status_code == 200
+    assert marked.json()["date"] == "2030-01-01"
+    assert _stats(client, admin)["todayAttendance"] == 1
+    assert _recomputed(client, admin)["todayAttendance"] == 1
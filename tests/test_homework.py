@@ -0,0 +1,158 @@
+import uuid
+
+
+def _homework(db, title="숙제 0"):
+    return next(h for h in db.table("homework") if h["title"] == title)
+
+
+def test_list_reports_progress_counts(client, db, academy, admin, student):
+    homework = _homework(db)
+    submitted = client.post(
+        f"/api/homeworks/{homework['id']}/submit",
+        params={"student_id": academy.student_id},
+        json={"content": "풀이", "files": []},
+    )
+    assert submitted.status_code == 200
+
+    items = client.get("/api/homeworks/", headers=admin, params={"limit": 10}).json()["items"]
+    listed = next(h for h in items if h["id"] == homework["id"])
+    assert listed["target_count"] == 3
+    assert listed["submission_counts"] == {
+        "targets": 3, "submitted": 1, "graded": 0, "pending": 2, "late": 0
+    }
+
+
+def _submit(client, homework, student_id, files=()):
+    response = client.post(
+        f"/api/homeworks/{homework['id']}/submit",
+        params={"student_id": student_id},
+        json={"content": "풀이", "files": list(files)},
+    )
+    assert response.status_code == 200
+
+
+def test_bulk_grade_updates_owned_submissions_in_one_call(client, db, academy, admin):
+    homework = _homework(db)
+    targets = [t["student_id"] for t in db.table("homework_targets") if t["homework_id"] == homework["id"]]
+    for student_id in targets[:2]:
+        _submit(client, homework, student_id)
+    submission_ids = [s["id"] for s in db.table("homework_submissions") if s["homework_id"] == homework["id"]]
+
+    foreign_homework = db.insert("homework", [{"academy_id": str(uuid.uuid4()), "title": "남의 숙제"}])[0]
+    foreign = db.insert("homework_submissions", [{
+        "homework_id": foreign_homework["id"], "student_id": str(uuid.uuid4()), "status": "submitted",
+    }])[0]
+
+    response = client.put("/api/homeworks/submissions/grade", headers=admin, json={"grades": [
+        {"submission_id": submission_ids[0], "grade": "A", "feedback": "좋아요"},
+        {"submission_id": submission_ids[1], "grade": "B"},
+        {"submission_id": submission_ids[0], "grade": "C"},
+        {"submission_id": foreign["id"], "grade": "A"},
+    ]})
+    body = response.json()
+    assert response.status_code == 200
+    assert body["graded"] == 2 and body["failed"] == 2
+    assert [r["ok"] for r in body["results"]] == [True, True, False, False]
+
+    rows = {s["id"]: s for s in db.table("homework_submissions")}
+    assert rows[submission_ids[0]]["grade"] == "A" and rows[submission_ids[0]]["status"] == "graded"
+    assert rows[submission_ids[0]]["graded_by"] == academy.admin_id
+    assert rows[submission_ids[1]]["grade"] == "B"
+    assert rows[foreign["id"]]["status"] == "submitted"
+
+
+def test_bulk_grade_rejects_empty_and_oversized_requests(client, admin):
+    assert client.put("/api/homeworks/submissions/grade", headers=admin, json={"grades": []}).status_code == 422
+    too_many = [{"submission_id": str(uuid.uuid4()), "grade": "A"} for _ in range(501)]
+    assert client.put("/api/homeworks/submissions/grade", headers=admin, json={"grades": too_many}).status_code == 422
+
+
+def test_create_defaults_to_snapshot_and_class_mode_is_opt_in(client, db, admin):
+    first = next(c for c in db.table("classes") if c["name"] == "1반")
+
+    snapshot = client.post("/api/homeworks/", headers=admin, json={"title": "고정", "class_ids": [first["id"]]})
+    assert snapshot.status_code == 200
+    assert snapshot.json()["target_mode"] == "snapshot"
+    assert snapshot.json()["target_count"] == 3
+    assert len([t for t in db.table("homework_targets") if t["homework_id"] == snapshot.json()["id"]]) == 3
+
+    by_class = client.post(
+        "/api/homeworks/", headers=admin,
+        json={"title": "반 기반", "class_ids": [first["id"]], "target_mode": "class"},
+    )
+    assert by_class.json()["target_mode"] == "class"
+    assert by_class.json()["target_count"] == 3
+    assert not [t for t in db.table("homework_targets") if t["homework_id"] == by_class.json()["id"]]
+
+    bad = client.post("/api/homeworks/", headers=admin, json={"title": "x", "target_mode": "everyone"})
+    assert bad.status_code == 422
+
+
+def test_roster_change_reaches_class_homework_count(client, db, admin):
+    first, second = (next(c for c in db.table("classes") if c["name"] == name) for name in ("1반", "2반"))
+    created = client.post(
+        "/api/homeworks/", headers=admin,
+        json={"title": "반 기반", "class_ids": [first["id"]], "target_mode": "class"},
+    ).json()
+    newcomer = next(m["student_id"] for m in db.table("class_members") if m["class_id"] == second["id"])
+
+    client.post(f"/api/classes/{first['id']}/students/{newcomer}", headers=admin)
+    again = client.post(
+        "/api/homeworks/", headers=admin,
+        json={"title": "반 기반 2", "class_ids": [first["id"]], "target_mode": "class"},
+    )
+    assert again.json()["target_count"] == 4
+
+    updated = client.put(f"/api/homeworks/{created['id']}", headers=admin, json={"title": "바뀐 제목"})
+    assert updated.status_code == 200
+    assert updated.json()["target_count"] == 4
+
+
+def test_update_reports_snapshot_target_count(client, db, admin):
+    homework = _homework(db)
+    updated = client.put(f"/api/homeworks/{homework['id']}", headers=admin, json={"title": "바뀐 제목"})
+    assert updated.json()["title"] == "바뀐 제목"
+    assert updated.json()["target_count"] == 3
+
+
+def _feed(client, student_id, **params):
+    response = client.get("/api/homeworks/student/list", params={"student_id": student_id, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_student_feed_nests_submission_and_files(client, db, academy, admin):
+    homework = _homework(db)
+    feed = _feed(client, academy.student_id)
+    assert [h["title"] for h in feed] == ["숙제 0"]
+    assert feed[0]["submission"] is None
+    assert [h["title"] for h in _feed(client, academy.student_id, filter="due_soon")] == ["숙제 0"]
+
+    files = [
+        client.post(f"/api/homeworks/uploads/file/homework/{name}", content=name.encode()).json()
+        for name in ("p1.png", "p2.png")
+    ]
+    _submit(client, homework, academy.student_id, files=files)
+
+    submission = _feed(client, academy.student_id)[0]["submission"]
+    assert submission["status"] == "submitted"
+    assert [f["file_key"] for f in submission["files"]] == [f["file_key"] for f in files]
+    assert _feed(client, academy.student_id, filter="due_soon") == []
+
+    client.put("/api/homeworks/submissions/grade", headers=admin, json={
+        "grades": [{"submission_id": submission["id"], "grade": "A"}]
+    })
+    assert [h["submission"]["grade"] for h in _feed(client, academy.student_id, filter="graded")] == ["A"]
+
+
+def test_student_feed_follows_class_membership_for_class_homework(client, db, academy, admin):
+    second = next(c for c in db.table("classes") if c["name"] == "2반")
+    client.post("/api/homeworks/", headers=admin, json={
+        "title": "2반 숙제", "class_ids": [second["id"]], "target_mode": "class", "due_date": "2099-01-01",
+    })
+    assert "2반 숙제" not in [h["title"] for h in _feed(client, academy.student_id)]
+
+    client.post(f"/api/classes/{second['id']}/students/{academy.student_id}", headers=admin)
+    titles = [h["title"] for h in _feed(client, academy.student_id)]
+    assert titles == ["숙제 0", "2반 숙제"]
+    assert [h["title"] for h in _feed(client, academy.student_id, order="-due_date")] == ["2반 숙제", "숙제 0"]
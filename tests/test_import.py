@@ -0,0 +1,91 @@
+import io
+
+import pytest
+
+import app.imports
+
+
+def _students(db, academy):
+    return [s for s in db.table("students") if s["academy_id"] == academy.id]
+
+
+def test_csv_import_creates_valid_rows_and_reports_the_rest(client, db, academy, admin):
+    before = len(_students(db, academy))
+    csv_body = "이름,학번,이메일\n김하나,S9001,\n,S9002,\n이둘,S9003,not-an-email\n박셋,S9004,park@test.com\n"
+
+    response = client.post(
+        "/api/students/import", headers=admin,
+        files={"file": ("students.csv", io.BytesIO(csv_body.encode("utf-8-sig")), "text/csv")},
+        params={"batch_size": 2},
+    )
+    body = response.json()
+    assert response.status_code == 200
+    assert body["total"] == 4
+    assert body["created"] == 2
+    assert [e["row"] for e in body["errors"]] == [3, 4]
+    assert len(_students(db, academy)) == before + 2
+    assert client.get("/api/dashboard/stats", headers=admin).json()["stats"]["totalStudents"] == before + 2
+
+
+def test_xlsx_import(client, db, academy, admin):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["이름", "학번"])
+    sheet.append(["김하나", 12])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+
+    response = client.post(
+        "/api/students/import", headers=admin,
+        files={"file": ("students.xlsx", buffer, app.imports.XLSX_CONTENT_TYPE)},
+    )
+    assert response.json()["created"] == 1
+    assert any(s["student_number"] == "12" for s in _students(db, academy))
+
+
+def test_xlsx_without_openpyxl_is_a_clear_400(client, admin, monkeypatch):
+    monkeypatch.setattr(app.imports, "openpyxl", None)
+    response = client.post(
+        "/api/students/import", headers=admin,
+        files={"file": ("students.xlsx", io.BytesIO(b"PK"), app.imports.XLSX_CONTENT_TYPE)},
+    )
+    assert response.status_code == 400
+    assert "CSV" in response.json()["detail"]
+
+
+def test_cp949_csv_from_korean_excel(client, db, academy, admin):
+    before = len(_students(db, academy))
+    csv_body = "이름,학번\n김하나,S9101\n이둘,S9102\n"
+
+    response = client.post(
+        "/api/students/import", headers=admin,
+        files={"file": ("students.csv", io.BytesIO(csv_body.encode("cp949")), "text/csv")},
+    )
+    assert response.status_code == 200
+    assert response.json()["created"] == 2
+    names = {s["name"] for s in _students(db, academy)}
+    assert {"김하나", "이둘"} <= names
+    assert len(_students(db, academy)) == before + 2
+
+
+def test_unreadable_csv_is_a_400_not_a_500(client, db, academy, admin):
+    before = len(_students(db, academy))
+    undecodable = "이름\n김하나\n".encode("utf-8") + b"\xff\xfe\n"
+    response = client.post(
+        "/api/students/import", headers=admin,
+        files={"file": ("students.csv", io.BytesIO(undecodable), "text/csv")},
+    )
+    assert response.status_code == 400
+    assert "인코딩" in response.json()["detail"]
+
+    oversized = "이름\n김하나\n" + "x" * (200 * 1024) + "\n"
+    response = client.post(
+        "/api/students/import", headers=admin,
+        files={"file": ("students.csv", io.BytesIO(oversized.encode("utf-8")), "text/csv")},
+        params={"batch_size": 1},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("3행")
+    assert len(_students(db, academy)) == before + 1
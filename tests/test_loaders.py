@@ -0,0 +1,30 @@
+import asyncio
+
+from app.loaders import DataLoader
+
+
+def test_loads_in_one_tick_share_one_batch():
+    calls = []
+
+    async def batch(keys):
+        calls.append(list(keys))
+        return {key: key.upper() for key in keys}
+
+    async def run():
+        loader = DataLoader(batch, max_batch_size=2)
+        return await asyncio.gather(loader.load("a"), loader.load("b"), loader.load("a"), loader.load("c"))
+
+    assert asyncio.run(run()) == ["A", "B", "A", "C"]
+    assert calls == [["a", "b"], ["c"]]
+
+
+def test_batch_error_reaches_every_waiter():
+    async def batch(keys):
+        raise RuntimeError("backend down")
+
+    async def run():
+        loader = DataLoader(batch)
+        return await asyncio.gather(loader.load("a"), loader.load("b"), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
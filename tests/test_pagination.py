@@ -0,0 +1,70 @@
+import pytest
+
+from app import pagination
+
+
+def test_without_cursor_or_limit_returns_a_bare_list(client, admin):
+    response = client.get("/api/students/", headers=admin)
+    assert response.status_code == 200
+    students = response.json()
+    assert isinstance(students, list)
+    assert len(students) == 6
+
+
+def test_limit_returns_pages_until_next_cursor_is_null(client, admin):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 4, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/students/", headers=admin, params=params).json()
+        seen.extend(s["id"] for s in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 6
+
+
+@pytest.mark.parametrize("fields", [None, "id,name"])
+def test_bare_list_is_capped_and_points_to_the_rest(client, admin, monkeypatch, fields):
+    monkeypatch.setattr(pagination.settings, "page_size_max", 4)
+    params = {"fields": fields} if fields else {}
+
+    first = client.get("/api/students/", headers=admin, params=params)
+    assert len(first.json()) == 4
+    cursor = first.headers["X-Next-Cursor"]
+
+    rest = client.get("/api/students/", headers=admin, params={**params, "cursor": cursor}).json()
+    assert rest["next_cursor"] is None
+    ids = [s["id"] for s in first.json()] + [s["id"] for s in rest["items"]]
+    assert len(ids) == len(set(ids)) == 6
+
+
+@pytest.mark.parametrize("path", [
+    "/api/homeworks/", "/api/attendance/", "/api/billing/payments",
+    "/api/counseling/", "/api/notices/",
+])
+def test_list_endpoints_keep_the_bare_list_shape(client, admin, path):
+    response = client.get(path, headers=admin)
+    assert response.status_code == 200
+    assert isinstance(response.json(), list)
+
+    paged = client.get(path, headers=admin, params={"limit": 1}).json()
+    assert set(paged) == {"items", "next_cursor"}
+
+
+def test_counseling_create_and_list(client, academy, admin):
+    created = client.post("/api/counseling/", headers=admin, json={
+        "student_id": academy.student_id, "counseling_date": "2026-10-01",
+        "counselor": "담임", "notes": "진로 상담",
+    })
+    assert created.status_code == 200
+    assert created.json()["created_by"] == academy.admin_id
+
+    listed = client.get("/api/counseling/", headers=admin, params={"fields": "notes"}).json()
+    assert listed == [{"id": created.json()["id"], "notes": "진로 상담"}]
+
+
+def test_notices_for_students_come_from_their_academy(client, admin, student):
+    client.post("/api/notices/", headers=admin, json={"title": "새 공지", "content": "내용"})
+    notices = client.get("/api/notices/", headers=student).json()
+    assert len(notices) == 11
+    assert notices[0]["title"] == "새 공지"
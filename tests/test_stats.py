@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+
+def _seed_activity(db, academy):
+    today = datetime.now().date()
+    month_start = today.replace(day=1)
+    students = [s["id"] for s in db.table("students")]
+    # Seed rows: half present today; add late/absent today and rows on other days
+    db.insert("attendance", [
+        {"academy_id": academy.id, "student_id": students[3], "date": today.isoformat(), "status": "late"},
+        {"academy_id": academy.id, "student_id": students[4], "date": today.isoformat(), "status": "absent"},
+        {"academy_id": academy.id, "student_id": students[5], "date": today.isoformat(), "status": "excused"},
+        {"academy_id": academy.id, "student_id": students[0],
+         "date": (today - timedelta(days=1)).isoformat(), "status": "present"},
+        {"academy_id": "other-academy", "student_id": students[0], "date": today.isoformat(), "status": "present"},
+    ])
+    db.insert("payments", [
+        {"academy_id": academy.id, "student_id": students[0], "amount": 150000,
+         "status": "completed", "paid_at": datetime.now().isoformat()},
+        {"academy_id": academy.id, "student_id": students[1], "amount": 90000,
+         "status": "completed", "paid_at": month_start.isoformat() + "T00:00:00"},
+        {"academy_id": academy.id, "student_id": students[2], "amount": 50000,
+         "status": "pending", "paid_at": datetime.now().isoformat()},
+        {"academy_id": academy.id, "student_id": students[2], "amount": 70000, "status": "completed",
+         "paid_at": (month_start - timedelta(days=1)).isoformat() + "T12:00:00"},
+    ])
+
+
+def test_attendance_stats_match_row_aggregation(client, db, academy, admin):
+    _seed_activity(db, academy)
+    today = datetime.now().date().isoformat()
+
+    # What the endpoint computed before the RPC: fetch today's rows and count in Python
+    rows = [r for r in db.table("attendance") if r["academy_id"] == academy.id and r["date"] == today]
+    present = sum(r["status"] == "present" for r in rows)
+    late = sum(r["status"] == "late" for r in rows)
+    absent = sum(r["status"] == "absent" for r in rows)
+
+    response = client.get("/api/attendance/stats", headers=admin)
+    assert response.status_code == 200
+    assert response.json() == {
+        "date": today,
+        "total": len(rows),
+        "present": present,
+        "late": late,
+        "absent": absent,
+        "attendance_rate": round((present + late) / len(rows) * 100, 1),
+    }
+
+
+def test_billing_stats_match_row_aggregation(client, db, academy, admin):
+    _seed_activity(db, academy)
+    since = datetime.now().strftime("%Y-%m") + "-01"
+
+    rows = [
+        p for p in db.table("payments")
+        if p["academy_id"] == academy.id and p["status"] == "completed" and p["paid_at"] >= since
+    ]
+
+    response = client.get("/api/billing/stats", headers=admin)
+    assert response.status_code == 200
+    assert response.json() == {
+        "monthly_revenue": sum(p["amount"] for p in rows),
+        "payment_count": len(rows),
+    }
+    assert response.json()["payment_count"] == 2
+
+
+def test_stats_require_admin(client, student):
+    assert client.get("/api/attendance/stats", headers=student).status_code == 403
+    assert client.get("/api/billing/stats", headers=student).status_code == 403
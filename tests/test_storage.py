@@ -0,0 +1,146 @@
+"""
+S3 presigned uploads, checked by a stub that verifies SigV4 query signatures
+the way S3/MinIO does (no network): a PUT is accepted only when the headers
+it actually sends match the ones signed into the URL.
+"""
+import base64
+import hashlib
+import hmac
+from types import SimpleNamespace
+from urllib.parse import parse_qsl, quote, urlsplit
+
+import pytest
+
+pytest.importorskip("boto3")
+
+from app.storage import S3Storage  # noqa: E402
+
+ACCESS_KEY, SECRET_KEY, REGION = "minio", "minio-secret", "us-east-1"
+
+
+def _storage() -> S3Storage:
+    return S3Storage(SimpleNamespace(
+        s3_bucket="uploads", s3_endpoint_url="http://localhost:9000", s3_region=REGION,
+        s3_access_key_id=ACCESS_KEY, s3_secret_access_key=SECRET_KEY, storage_url_ttl_seconds=900,
+    ))
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+def stub_s3_accepts(method: str, url: str, headers: dict) -> bool:
+    """Recompute the query-string SigV4 signature from the request S3 would receive"""
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    signature = query.pop("X-Amz-Signature")
+    sent = {k.lower(): str(v).strip() for k, v in headers.items()}
+    sent["host"] = parts.netloc
+
+    signed = query["X-Amz-SignedHeaders"].split(";")
+    if any(name not in sent for name in signed):
+        return False
+    canonical_request = "\n".join([
+        method,
+        parts.path,
+        "&".join(f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}" for k, v in sorted(query.items())),
+        "".join(f"{name}:{sent[name]}\n" for name in signed),
+        query["X-Amz-SignedHeaders"],
+        "UNSIGNED-PAYLOAD",
+    ])
+    amz_date = query["X-Amz-Date"]
+    scope = query["X-Amz-Credential"].split("/", 1)[1]
+    string_to_sign = "\n".join([
+        "AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest()
+    ])
+    key = ("AWS4" + SECRET_KEY).encode()
+    for part in (amz_date[:8], REGION, "s3", "aws4_request"):
+        key = _hmac(key, part)
+    return hmac.compare_digest(hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest(), signature)
+
+
+def _target(data: bytes) -> dict:
+    return _storage().upload_target(
+        "blobs/ab/photo.png", "image/png", len(data), hashlib.sha256(data).hexdigest()
+    )
+
+
+def test_presigned_put_signs_length_type_and_checksum():
+    target = _target(b"scan bytes")
+    signed = dict(parse_qsl(urlsplit(target["upload_url"]).query))["X-Amz-SignedHeaders"].split(";")
+    assert {"content-length", "content-type", "x-amz-checksum-sha256"} <= set(signed)
+    assert target["method"] == "PUT" and target["resumable"] is False
+
+
+def test_stub_accepts_the_declared_upload():
+    data = b"scan bytes"
+    target = _target(data)
+    headers = {**target["headers"], "Content-Length": str(len(data))}
+    assert stub_s3_accepts("PUT", target["upload_url"], headers)
+
+
+def test_stub_rejects_a_different_length():
+    data = b"scan bytes"
+    target = _target(data)
+    headers = {**target["headers"], "Content-Length": str(len(data) + 1)}
+    assert not stub_s3_accepts("PUT", target["upload_url"], headers)
+
+
+def test_stub_rejects_a_different_or_missing_checksum():
+    data = b"scan bytes"
+    target = _target(data)
+    other = base64.b64encode(hashlib.sha256(b"other bytes").digest()).decode()
+    headers = {**target["headers"], "Content-Length": str(len(data))}
+
+    assert not stub_s3_accepts("PUT", target["upload_url"], {**headers, "x-amz-checksum-sha256": other})
+    without = {k: v for k, v in headers.items() if k != "x-amz-checksum-sha256"}
+    assert not stub_s3_accepts("PUT", target["upload_url"], without)
+
+
+def test_presign_endpoint_on_s3_reserves_blob_and_returns_signed_put(client, db, monkeypatch):
+    from botocore.stub import Stubber
+
+    import app.routers.homework as homework_router
+
+    storage = _storage()
+    stubber = Stubber(storage.client)
+    stubber.add_client_error("head_object", service_error_code="404", http_status_code=404)
+    monkeypatch.setattr(homework_router, "get_storage", lambda: storage)
+
+    data = b"scan bytes"
+    with stubber:
+        response = client.post("/api/homeworks/uploads/presign", json={
+            "file_name": "photo.PNG", "content_type": "image/png",
+            "file_size": len(data), "sha256": hashlib.sha256(data).hexdigest(),
+        })
+    body = response.json()
+
+    assert response.status_code == 200
+    assert body["exists"] is False
+    assert body["file_key"] == f"blobs/{hashlib.sha256(data).hexdigest()[:2]}/{hashlib.sha256(data).hexdigest()}.png"
+    assert body["public_url"] == f"/api/homeworks/files/{body['file_key']}"
+    assert stub_s3_accepts(body["method"], body["upload_url"], {**body["headers"], "Content-Length": str(len(data))})
+    # The claimed size is only signed, not recorded: the row stays unverified
+    assert [b["file_size"] for b in db.table("upload_blobs") if b["file_key"] == body["file_key"]] == [None]
+
+
+def test_presign_on_s3_requires_sha256(client, monkeypatch):
+    import app.routers.homework as homework_router
+
+    monkeypatch.setattr(homework_router, "get_storage", _storage)
+    response = client.post("/api/homeworks/uploads/presign", json={
+        "file_name": "photo.png", "content_type": "image/png", "file_size": 10,
+    })
+    assert response.status_code == 400
+
+
+def test_size_reads_content_length_and_none_for_missing():
+    from botocore.stub import Stubber
+
+    storage = _storage()
+    stubber = Stubber(storage.client)
+    stubber.add_response("head_object", {"ContentLength": 80}, {"Bucket": storage.bucket, "Key": "blobs/ab/x.png"})
+    stubber.add_client_error("head_object", service_error_code="404", http_status_code=404)
+    with stubber:
+        assert storage.size("blobs/ab/x.png") == 80
+        assert storage.size("blobs/ab/missing.png") is None
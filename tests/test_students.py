@@ -0,0 +1,20 @@
+def test_profile_for_student(client, academy, student):
+    response = client.get("/api/students/me", headers=student)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["name"] == "학생0"
+    assert body["academy_name"] == "벤치마크 학원"
+    assert body["degraded"] is False
+
+
+def test_profile_requires_student_role(client, admin):
+    assert client.get("/api/students/me", headers=admin).status_code == 403
+
+
+def test_create_and_get_student(client, admin):
+    created = client.post("/api/students/", headers=admin, json={"name": "새 학생"})
+    assert created.status_code == 200
+    student_id = created.json()["id"]
+
+    fetched = client.get(f"/api/students/{student_id}", headers=admin, params={"fields": "name,status"})
+    assert fetched.json() == {"id": student_id, "name": "새 학생", "status": "active"}
@@ -0,0 +1,160 @@
+import hashlib
+
+import app.routers.homework as homework_router
+from app import uploads
+
+
+def _homework(db, title="숙제 0"):
+    return next(h for h in db.table("homework") if h["title"] == title)
+
+
+def _upload(client, data: bytes, name="page.png"):
+    response = client.post(f"/api/homeworks/uploads/file/homework/{name}", content=data)
+    assert response.status_code == 200
+    return response.json()
+
+
+def _submit(client, homework, student_id, files):
+    return client.post(
+        f"/api/homeworks/{homework['id']}/submit",
+        params={"student_id": student_id},
+        json={"content": "풀이", "files": files},
+    )
+
+
+def test_upload_is_content_addressed_and_registered(client, db):
+    data = b"same bytes"
+    first = _upload(client, data)
+    second = _upload(client, data, name="copy.png")
+
+    assert first["file_key"] == second["file_key"]
+    assert hashlib.sha256(data).hexdigest() in first["file_key"]
+    blobs = [b for b in db.table("upload_blobs") if b["file_key"] == first["file_key"]]
+    assert len(blobs) == 1 and blobs[0]["file_size"] == len(data)
+
+
+def test_submission_size_uses_stored_blob_sizes(client, db, academy, monkeypatch):
+    monkeypatch.setattr(homework_router.settings, "upload_max_submission_bytes", 100)
+    homework = _homework(db)
+    big = _upload(client, b"x" * 80)
+    other = _upload(client, b"y" * 80)
+
+    # 요청의 file_size 를 작게 적어도 저장된 크기로 계산
+    files = [{**f, "file_size": 1} for f in (big, other)]
+    assert _submit(client, homework, academy.student_id, files).status_code == 413
+
+    response = _submit(client, homework, academy.student_id, [{**big, "file_size": 1}])
+    assert response.status_code == 200
+    stored = next(f for f in db.table("submission_files") if f["file_key"] == big["file_key"])
+    assert stored["file_size"] == 80
+
+
+def test_submission_rejects_unregistered_file_keys(client, db, academy):
+    homework = _homework(db)
+    files = [{"file_key": "blobs/00/not-uploaded.png", "file_name": "a.png", "file_size": 1}]
+    response = _submit(client, homework, academy.student_id, files)
+    assert response.status_code == 400
+    assert not db.table("homework_submissions")
+
+
+def _open_session(client, headers, data: bytes):
+    response = client.post(
+        "/api/homeworks/uploads/sessions", headers=headers,
+        json={"file_name": "scan.png", "content_type": "image/png", "file_size": len(data)},
+    )
+    return response
+
+
+def test_resumable_session_grows_with_chunks_and_completes(client, db, student, monkeypatch):
+    monkeypatch.setattr(homework_router.settings, "upload_chunk_bytes", 4)
+    data = b"0123456789"
+    session = _open_session(client, student, data).json()
+    assert session["chunk_count"] == 3
+    part = uploads.SESSION_ROOT / session["session_id"] / "data.part"
+    assert part.stat().st_size == 0
+
+    url = f"/api/homeworks/uploads/sessions/{session['session_id']}"
+    assert client.put(f"{url}/chunks/1", headers=student, content=data[4:8]).status_code == 200
+    assert part.stat().st_size == 8
+    assert client.post(f"{url}/complete", headers=student).status_code == 409
+
+    for index in (0, 2):
+        client.put(f"{url}/chunks/{index}", headers=student, content=data[index * 4:index * 4 + 4])
+    assert client.get(url, headers=student).json()["received"] == [0, 1, 2]
+
+    completed = client.post(f"{url}/complete", headers=student).json()
+    assert hashlib.sha256(data).hexdigest() in completed["file_key"]
+    assert completed["file_size"] == len(data)
+
+
+def test_sessions_require_auth_and_belong_to_their_owner(client, student, admin):
+    assert _open_session(client, {}, b"abc").status_code in (401, 403)
+
+    session = _open_session(client, student, b"abc").json()
+    url = f"/api/homeworks/uploads/sessions/{session['session_id']}"
+    assert client.get(url, headers=admin).status_code == 404
+    assert client.put(f"{url}/chunks/0", headers=admin, content=b"abc").status_code == 404
+    assert client.get(url).status_code in (401, 403)
+
+
+def test_open_sessions_per_user_are_limited(client, student, admin, monkeypatch):
+    monkeypatch.setattr(homework_router.settings, "upload_max_open_sessions", 2)
+    assert _open_session(client, student, b"a").status_code == 200
+    assert _open_session(client, student, b"b").status_code == 200
+    assert _open_session(client, student, b"c").status_code == 429
+    # 다른 사용자는 별도
+    assert _open_session(client, admin, b"d").status_code == 200
+
+
+def test_presign_reports_existing_blobs(client, db):
+    data = b"worksheet scan"
+    digest = hashlib.sha256(data).hexdigest()
+    request = {"file_name": "scan.png", "content_type": "image/png", "file_size": len(data), "sha256": digest}
+
+    first = client.post("/api/homeworks/uploads/presign", json=request).json()
+    assert first["exists"] is False and first["resumable"] is True
+    assert [b["file_key"] for b in db.table("upload_blobs")] == [first["file_key"]]
+
+    uploaded = client.post(first["upload_url"], content=data).json()
+    assert uploaded["file_key"] == first["file_key"]
+
+    again = client.post("/api/homeworks/uploads/presign", json=request).json()
+    assert again["exists"] is True and again["file_key"] == first["file_key"]
+
+
+def test_presign_never_overwrites_the_stored_size(client, db):
+    data = b"full page scan" * 100
+    digest = hashlib.sha256(data).hexdigest()
+    request = {"file_name": "scan.png", "content_type": "image/png", "file_size": len(data), "sha256": digest}
+
+    first = client.post("/api/homeworks/uploads/presign", json=request).json()
+    client.post(first["upload_url"], content=data)
+
+    client.post("/api/homeworks/uploads/presign", json={**request, "file_size": 1})
+    assert [b["file_size"] for b in db.table("upload_blobs")] == [len(data)]
+
+
+def test_presigned_keys_are_checked_in_storage_on_submit(client, db, academy, monkeypatch):
+    monkeypatch.setattr(homework_router.settings, "upload_max_submission_bytes", 100)
+    homework = _homework(db)
+    data = b"z" * 80
+    presigned = client.post("/api/homeworks/uploads/presign", json={
+        "file_name": "scan.png", "content_type": "image/png",
+        "file_size": 1, "sha256": hashlib.sha256(data).hexdigest(),
+    }).json()
+    file = {"file_key": presigned["file_key"], "file_name": "scan.png", "file_size": 1}
+
+    # Presigned but never uploaded
+    response = _submit(client, homework, academy.student_id, [file])
+    assert response.status_code == 400
+
+    # Bytes placed directly in storage (as a presigned S3 PUT would) count at their real size
+    path = uploads.resolve_upload_path(presigned["file_key"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    other = _upload(client, b"w" * 80)
+    response = _submit(client, homework, academy.student_id, [file, {**other, "file_name": "b.png"}])
+    assert response.status_code == 413
+    assert [b["file_size"] for b in db.table("upload_blobs") if b["file_key"] == file["file_key"]] == [80]
+
+    assert _submit(client, homework, academy.student_id, [file]).status_code == 200